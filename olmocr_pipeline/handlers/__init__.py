@@ -3,16 +3,28 @@ Document processing handlers for Phase 2 multi-format ingestion.
 """
 
 from .pdf_digital import process_digital_pdf
-from .pdf_scanned import process_scanned_pdf, process_scanned_pdf_batch
+from .pdf_scanned import (
+    process_scanned_pdf,
+    process_scanned_pdf_batch,
+    run_scanned_ocr_batch,
+    postprocess_scanned_output
+)
+from .pdf_mixed import process_mixed_pdf, process_mixed_pdf_batch
 from .docx import process_docx
 from .xlsx import process_xlsx
-from .image import process_image
+from .image import process_image, process_image_batch, postprocess_image_output
 
 __all__ = [
     'process_digital_pdf',
     'process_scanned_pdf',
     'process_scanned_pdf_batch',
+    'run_scanned_ocr_batch',
+    'postprocess_scanned_output',
+    'process_mixed_pdf',
+    'process_mixed_pdf_batch',
     'process_docx',
     'process_xlsx',
-    'process_image'
+    'process_image',
+    'process_image_batch',
+    'postprocess_image_output'
 ]
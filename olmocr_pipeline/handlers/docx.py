@@ -20,7 +20,8 @@ def process_docx(
     output_dir: Path,
     config: Dict,
     batch_id: str,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process DOCX file using Docling with fallback to python-docx.
@@ -30,6 +31,7 @@ def process_docx(
         output_dir: Base output directory
         config: Configuration dictionary
         batch_id: Unique batch identifier
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Processing result dictionary with metadata:
@@ -68,7 +70,7 @@ def process_docx(
     # Try Docling first
     try:
         print(f"   🔄 Converting with Docling: {docx_path.name}")
-        result = _process_with_docling(docx_path, markdown_path, jsonl_path, config, batch_id, skip_enrichment)
+        result = _process_with_docling(docx_path, markdown_path, jsonl_path, config, batch_id, skip_enrichment, context)
 
         if result["success"]:
             duration_ms = int((time.time() - start_time) * 1000)
@@ -86,7 +88,7 @@ def process_docx(
     # Fallback to python-docx
     print(f"   🔄 Attempting fallback to python-docx...")
     try:
-        result = _process_with_python_docx(docx_path, markdown_path, jsonl_path, config, batch_id, skip_enrichment)
+        result = _process_with_python_docx(docx_path, markdown_path, jsonl_path, config, batch_id, skip_enrichment, context)
 
         if result["success"]:
             duration_ms = int((time.time() - start_time) * 1000)
@@ -123,7 +125,8 @@ def _process_with_docling(
     jsonl_path: Path,
     config: Dict,
     batch_id: str,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process DOCX using Docling converter.
@@ -134,6 +137,7 @@ def _process_with_docling(
         jsonl_path: Output JSONL path
         config: Configuration dictionary
         batch_id: Batch identifier
+        context: Document context (passed through to _convert_to_jsonl)
 
     Returns:
         Processing result dictionary
@@ -172,7 +176,8 @@ def _process_with_docling(
         config,
         batch_id,
         processor="docling",
-        file_type="docx"
+        file_type="docx",
+        context=context
     )
 
     # Add entity extraction and embeddings (unless skipped for ingest-only mode)
@@ -226,7 +231,8 @@ def _process_with_python_docx(
     jsonl_path: Path,
     config: Dict,
     batch_id: str,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Fallback processing using python-docx library.
@@ -237,6 +243,7 @@ def _process_with_python_docx(
         jsonl_path: Output JSONL path
         config: Configuration dictionary
         batch_id: Batch identifier
+        context: Document context (passed through to _convert_to_jsonl)
 
     Returns:
         Processing result dictionary
@@ -298,7 +305,8 @@ def _process_with_python_docx(
         config,
         batch_id,
         processor="python-docx",
-        file_type="docx"
+        file_type="docx",
+        context=context
     )
 
     # Add entity extraction and embeddings (unless skipped for ingest-only mode)
@@ -352,7 +360,8 @@ def _convert_to_jsonl(
     config: Dict,
     batch_id: str,
     processor: str,
-    file_type: str
+    file_type: str,
+    context: Optional[Dict] = None
 ) -> list[Dict]:
     """
     Convert markdown text to JSONL chunks following unified schema.
@@ -364,62 +373,33 @@ def _convert_to_jsonl(
         batch_id: Batch identifier
         processor: Name of processor used
         file_type: Type of source file (docx, pdf, etc.)
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         List of JSONL record dictionaries
     """
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from utils_classify import compute_file_hash, get_mime_type
+    from utils_chunking import chunk_paragraphs, get_chunk_limits
+    from utils_context import get_or_build_context
 
-    # Compute source file hash
-    file_hash = compute_file_hash(source_path)
-    mime_type = get_mime_type(source_path)
-
-    # Generate doc_id from hash (first 16 chars)
-    doc_id = file_hash[:16]
+    # Hash, MIME type and doc_id come from the document context (computed once per file)
+    context = get_or_build_context(context, source_path, config)
+    file_hash = context["hash_sha256"]
+    mime_type = context["mime_type"]
+    doc_id = context["doc_id"]
 
     # Simple chunking by paragraphs
-    paragraphs = [p.strip() for p in markdown_text.split('\n\n') if p.strip()]
-
-    # Get chunking config
-    chunking_config = config.get("chunking", {})
-    token_target = chunking_config.get("token_target", 1400)
-    token_max = chunking_config.get("token_max", 2000)
-
-    # Combine paragraphs into chunks within token limits
-    chunks = []
-    current_chunk = []
-    current_tokens = 0
-
-    for para in paragraphs:
-        para_tokens = len(para.split())
-
-        # If adding this paragraph exceeds max, finalize current chunk
-        if current_tokens + para_tokens > token_max and current_chunk:
-            chunks.append("\n\n".join(current_chunk))
-            current_chunk = [para]
-            current_tokens = para_tokens
-        else:
-            current_chunk.append(para)
-            current_tokens += para_tokens
-
-            # If we've reached target size, finalize chunk
-            if current_tokens >= token_target:
-                chunks.append("\n\n".join(current_chunk))
-                current_chunk = []
-                current_tokens = 0
-
-    # Add remaining chunk
-    if current_chunk:
-        chunks.append("\n\n".join(current_chunk))
+    token_target, token_max = get_chunk_limits(config)
+    chunks = chunk_paragraphs(markdown_text, token_target, token_max)
 
     # Convert to JSONL records
     schema_version = config.get("schema", {}).get("version", "2.2.0")
     processed_at = datetime.utcnow().isoformat() + "Z"
 
     jsonl_records = []
-    for idx, chunk_text in enumerate(chunks):
+    for idx, chunk in enumerate(chunks):
+        chunk_text = chunk.text
         chunk_tokens = len(chunk_text.split())
 
         record = {
@@ -434,7 +414,7 @@ def _convert_to_jsonl(
                 "token_count": chunk_tokens
             },
             "source": {
-                "file_path": str(source_path.resolve()),
+                "file_path": context["resolved_path"],
                 "file_name": source_path.name,
                 "file_type": file_type,
                 "mime_type": mime_type
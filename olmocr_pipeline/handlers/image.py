@@ -8,19 +8,28 @@ Reuses olmOCR logic from utils_olmocr.py for composability.
 
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils_olmocr import run_olmocr_batch, get_olmocr_jsonl_path, olmocr_jsonl_to_markdown, olmocr_to_jsonl
+from utils_olmocr import (
+    run_olmocr_batch,
+    run_olmocr_batch_with_salvage,
+    demux_olmocr_results,
+    olmocr_records_to_markdown_with_pages,
+    olmocr_to_jsonl
+)
+from utils_ocr_progress import ocr_file_metrics
 
 
 def process_image(
     image_path: Path,
     output_dir: Path,
     config: Dict,
-    batch_id: str
+    batch_id: str,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process image file using OlmOCR-2 OCR.
@@ -32,6 +41,7 @@ def process_image(
         output_dir: Base output directory
         config: Configuration dictionary
         batch_id: Unique batch identifier
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Processing result dictionary with metadata:
@@ -59,15 +69,12 @@ def process_image(
 
     # Prepare output directories
     olmocr_staging = output_dir / "olmocr_staging"
-    markdown_dir = output_dir / "markdown"
-    jsonl_dir = output_dir / "jsonl"
     log_dir = output_dir / "logs"
 
-    for d in [olmocr_staging, markdown_dir, jsonl_dir, log_dir]:
+    for d in [olmocr_staging, log_dir]:
         d.mkdir(parents=True, exist_ok=True)
 
-    stem = image_path.stem
-    log_file = log_dir / f"olmocr_{stem}.log"
+    log_file = log_dir / f"olmocr_{image_path.stem}.log"
 
     try:
         print(f"   🔄 Processing with OlmOCR-2: {image_path.name}")
@@ -80,15 +87,148 @@ def process_image(
             log_file=log_file
         )
 
-        # Get OlmOCR JSONL output (v0.4.2+ format)
-        jsonl_path_olmocr = get_olmocr_jsonl_path(image_path, olmocr_staging)
+    except Exception as e:
+        duration_ms = int((time.time() - start_time) * 1000)
+        return _failure_result(f"OlmOCR-2 failed: {str(e)}", duration_ms, warnings)
+
+    return postprocess_image_output(image_path, output_dir, config, batch_id, context=context, start_time=start_time)
+
+
+def process_image_batch(
+    image_paths: List[Path],
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    contexts: Optional[Dict[Path, Dict]] = None
+) -> List[Dict]:
+    """
+    Process multiple images in a single OlmOCR run.
+
+    Same file-level batching as process_scanned_pdf_batch: model load and
+    vLLM startup are paid once per batch instead of once per image. Results
+    are demultiplexed per image by the Source-File metadata in OlmOCR's output.
+
+    Args:
+        image_paths: Image paths to process
+        output_dir: Base output directory
+        config: Configuration dictionary
+        batch_id: Unique batch identifier
+        contexts: Optional mapping of image path to document context
+
+    Returns:
+        List of result dictionaries (one per image, in input order), each
+        including file_path/file_name/file_type
+    """
+    start_time = time.time()
+
+    olmocr_staging = output_dir / "olmocr_staging"
+    log_dir = output_dir / "logs"
+
+    for d in [olmocr_staging, log_dir]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    log_file = log_dir / f"olmocr_images_{batch_id}_{len(image_paths)}files.log"
+
+    print(f"   🔄 Processing {len(image_paths)} images with OlmOCR-2 batch")
+
+    try:
+        # Salvages completed images and retries only the missing ones if the run fails
+        failures, ocr_metrics = run_olmocr_batch_with_salvage(
+            file_paths=image_paths,
+            output_dir=olmocr_staging,
+            config=config,
+            log_file=log_file
+        )
+    except Exception as e:
+        print(f"   ❌ Batch processing failed: {e}")
+        results = []
+        for image_path in image_paths:
+            result = _failure_result(f"Batch processing failed: {e}", 0, [])
+            result["quarantined"] = True
+            results.append(_with_file_metadata(result, image_path))
+        return results
+
+    # Read the shared results once, then post-process images in parallel
+    records = demux_olmocr_results([p for p in image_paths if p not in failures], olmocr_staging)
+
+    def postprocess(image_path: Path) -> Dict:
+        if image_path in failures:
+            result = _failure_result(f"Batch processing failed: {failures[image_path]}", 0, [])
+        else:
+            result = postprocess_image_output(
+                image_path,
+                output_dir,
+                config,
+                batch_id,
+                context=(contexts or {}).get(image_path),
+                records=records[image_path]
+            )
+        if not result["success"]:
+            result["quarantined"] = True
+        result.update(ocr_file_metrics(ocr_metrics, image_path))
+        return _with_file_metadata(result, image_path)
+
+    workers = config.get("processors", {}).get("olmocr", {}).get("postprocess_workers", 4)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(postprocess, image_paths))
 
-        # Check if JSONL was created
-        if not jsonl_path_olmocr or not jsonl_path_olmocr.exists():
+    batch_duration = time.time() - start_time
+    print(f"   ✅ Image batch complete: {len(image_paths)} files in {batch_duration:.1f}s ({batch_duration/len(image_paths):.1f}s/file avg)")
+
+    return results
+
+
+def postprocess_image_output(
+    image_path: Path,
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    context: Optional[Dict] = None,
+    start_time: Optional[float] = None,
+    records: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    Turn one image's OlmOCR output into markdown + JSONL.
+
+    Works for single-image and batched runs: only the JSONL records whose
+    Source-File is this image are used.
+
+    Args:
+        image_path: Path to input image file
+        output_dir: Base output directory (holds olmocr_staging/)
+        config: Configuration dictionary
+        batch_id: Unique batch identifier
+        context: Document context from build_document_context() (built if None)
+        start_time: When processing of this image started (default: now)
+        records: This image's OlmOCR records from demux_olmocr_results()
+                 (looked up in the staging results if None)
+
+    Returns:
+        Processing result dictionary (see process_image)
+    """
+    start_time = start_time or time.time()
+    warnings = []
+
+    olmocr_staging = output_dir / "olmocr_staging"
+    markdown_dir = output_dir / "markdown"
+    jsonl_dir = output_dir / "jsonl"
+
+    for d in [markdown_dir, jsonl_dir]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    stem = image_path.stem
+
+    try:
+        # Get this image's OlmOCR records (v0.4.2+ JSONL format)
+        if records is None:
+            records = demux_olmocr_results([image_path], olmocr_staging)[image_path]
+
+        # Check if OlmOCR produced output
+        if not records:
             raise FileNotFoundError(f"OlmOCR did not produce JSONL output")
 
-        # Convert JSONL to markdown
-        markdown_content = olmocr_jsonl_to_markdown(jsonl_path_olmocr)
+        # Convert records to markdown
+        markdown_content, _ = olmocr_records_to_markdown_with_pages(records, image_path.name)
         char_count = len(markdown_content)
 
         # Check for low yield
@@ -100,7 +240,7 @@ def process_image(
         final_md_path.write_text(markdown_content, encoding="utf-8")
 
         # Convert to JSONL
-        chunks = olmocr_to_jsonl(markdown_content, image_path, config, batch_id)
+        chunks = olmocr_to_jsonl(markdown_content, image_path, config, batch_id, context=context)
 
         # Write JSONL
         jsonl_path = jsonl_dir / f"{stem}.jsonl"
@@ -111,7 +251,7 @@ def process_image(
         # Compute duration
         duration_ms = int((time.time() - start_time) * 1000)
 
-        print(f"   ✅ OlmOCR-2 processing complete")
+        print(f"   ✅ OlmOCR-2 processing complete: {image_path.name}")
         print(f"      Output: {char_count:,} chars (~{len(markdown_content.split()):,} tokens)")
         print(f"      Duration: {duration_ms/1000:.1f}s")
         print(f"      Chunks: {len(chunks)}")
@@ -136,18 +276,30 @@ def process_image(
 
     except Exception as e:
         duration_ms = int((time.time() - start_time) * 1000)
-        error_msg = f"OlmOCR-2 failed: {str(e)}"
-        print(f"   ❌ {error_msg}")
+        return _failure_result(f"OlmOCR-2 failed: {str(e)}", duration_ms, warnings)
 
-        return {
-            "success": False,
-            "processor": None,
-            "markdown_path": None,
-            "jsonl_path": None,
-            "processing_duration_ms": duration_ms,
-            "char_count": 0,
-            "estimated_tokens": 0,
-            "chunk_count": 0,
-            "warnings": warnings,
-            "error": error_msg
-        }
+
+def _failure_result(error_msg: str, duration_ms: int, warnings: List[str]) -> Dict:
+    """Failure result in the process_image() shape."""
+    print(f"   ❌ {error_msg}")
+
+    return {
+        "success": False,
+        "processor": None,
+        "markdown_path": None,
+        "jsonl_path": None,
+        "processing_duration_ms": duration_ms,
+        "char_count": 0,
+        "estimated_tokens": 0,
+        "chunk_count": 0,
+        "warnings": warnings,
+        "error": error_msg
+    }
+
+
+def _with_file_metadata(result: Dict, image_path: Path) -> Dict:
+    """Add the file fields batch callers use to match results to inputs."""
+    result["file_path"] = str(image_path)
+    result["file_name"] = image_path.name
+    result["file_type"] = image_path.suffix.lower().lstrip('.')
+    return result
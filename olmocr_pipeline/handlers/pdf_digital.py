@@ -11,7 +11,7 @@ import time
 import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.base_models import InputFormat
@@ -20,6 +20,9 @@ from docling.datamodel.pipeline_options import PdfPipelineOptions
 # Thread-local storage for reusing expensive resources across multiple PDF processing calls
 _thread_local = threading.local()
 
+# Docling text labels that are page furniture, not document body
+_FURNITURE_LABELS = {"page_header", "page_footer"}
+
 
 def get_docling_converter() -> DocumentConverter:
     """
@@ -66,24 +69,33 @@ def get_embedding_generator(model_name: str):
     return getattr(_thread_local, cache_key)
 
 
-def extract_bbox_from_docling(result) -> Dict:
+def extract_bbox_from_docling(result) -> List[Dict]:
     """
     Extract bounding box information from Docling result.
 
-    Returns dict mapping text content to bbox + page info:
-    {
-        "text_content": {
+    Returns body text elements in document order (repeated text is kept, so
+    each occurrence can be matched to its own position in the markdown).
+    Page headers/footers and other furniture are skipped: the markdown export
+    leaves them out, and their repeated text would only mislead the matching.
+    [
+        {
+            "text": "text_content",
             "page": 1,
             "bbox": {"x0": 72.0, "y0": 600.0, "x1": 500.0, "y1": 650.0}
         }
-    }
+    ]
     """
-    bbox_map = {}
+    bbox_elements = []
 
     try:
         doc_dict = result.document.export_to_dict()
 
         for text_elem in doc_dict.get("texts", []):
+            if text_elem.get("label") in _FURNITURE_LABELS:
+                continue
+            if text_elem.get("content_layer", "body") != "body":
+                continue
+
             text_content = text_elem.get("text", "").strip()
             if not text_content:
                 continue
@@ -98,7 +110,8 @@ def extract_bbox_from_docling(result) -> Dict:
                     # Map Docling bbox format to our schema
                     # Docling: {l, t, r, b, coord_origin}
                     # Our schema: {x0, y0, x1, y1} (BOTTOMLEFT origin)
-                    bbox_map[text_content] = {
+                    bbox_elements.append({
+                        "text": text_content,
                         "page": page_no,
                         "bbox": {
                             "x0": bbox_data.get("l", 0),
@@ -106,11 +119,11 @@ def extract_bbox_from_docling(result) -> Dict:
                             "x1": bbox_data.get("r", 0),
                             "y1": bbox_data.get("t", 0)
                         }
-                    }
+                    })
     except Exception as e:
         print(f"      ⚠️  Bbox extraction warning: {e}")
 
-    return bbox_map
+    return bbox_elements
 
 
 def process_digital_pdf(
@@ -118,7 +131,8 @@ def process_digital_pdf(
     output_dir: Path,
     config: Dict,
     batch_id: str,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process digital PDF using Docling with fallback to OlmOCR-2.
@@ -128,6 +142,7 @@ def process_digital_pdf(
         output_dir: Base output directory
         config: Configuration dictionary
         batch_id: Unique batch identifier
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Processing result dictionary with metadata:
@@ -174,8 +189,8 @@ def process_digital_pdf(
         result = converter.convert(str(pdf_path))
 
         # Extract bbox information
-        bbox_map = extract_bbox_from_docling(result)
-        print(f"      📍 Extracted bbox for {len(bbox_map)} text elements")
+        bbox_elements = extract_bbox_from_docling(result)
+        print(f"      📍 Extracted bbox for {len(bbox_elements)} text elements")
 
         # Extract markdown
         markdown_content = result.document.export_to_markdown()
@@ -202,7 +217,8 @@ def process_digital_pdf(
             config,
             batch_id,
             processor="docling",
-            bbox_map=bbox_map
+            bbox_elements=bbox_elements,
+            context=context
         )
 
         # Add entity extraction and embeddings (unless skipped for ingest-only mode)
@@ -285,7 +301,8 @@ def convert_to_jsonl(
     config: Dict,
     batch_id: str,
     processor: str,
-    bbox_map: Optional[Dict] = None
+    bbox_elements: Optional[List[Dict]] = None,
+    context: Optional[Dict] = None
 ) -> list[Dict]:
     """
     Convert markdown text to JSONL chunks following unified schema v2.3.0.
@@ -296,7 +313,9 @@ def convert_to_jsonl(
         config: Configuration dictionary
         batch_id: Batch identifier
         processor: Name of processor used
-        bbox_map: Optional dict mapping text content to bbox info
+        bbox_elements: Optional text elements with bbox/page, in document
+                       order (from extract_bbox_from_docling)
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         List of JSONL record dictionaries (schema v2.3.0 with bbox)
@@ -304,69 +323,39 @@ def convert_to_jsonl(
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from utils_classify import compute_file_hash, get_mime_type
-
-    # Compute source file hash
-    file_hash = compute_file_hash(source_path)
-    mime_type = get_mime_type(source_path)
-
-    # Generate doc_id from hash (first 16 chars)
-    doc_id = file_hash[:16]
-
-    # Simple chunking by paragraphs for now
-    # TODO: Implement smart chunking with heading detection and token limits
-    paragraphs = [p.strip() for p in markdown_text.split('\n\n') if p.strip()]
-
-    # Get chunking config
-    chunking_config = config.get("chunking", {})
-    token_target = chunking_config.get("token_target", 1400)
-    token_min = chunking_config.get("token_min", 800)
-    token_max = chunking_config.get("token_max", 2000)
-
-    # Combine paragraphs into chunks within token limits
-    chunks = []
-    current_chunk = []
-    current_tokens = 0
-
-    for para in paragraphs:
-        para_tokens = len(para.split())
-
-        # If adding this paragraph exceeds max, finalize current chunk
-        if current_tokens + para_tokens > token_max and current_chunk:
-            chunks.append("\n\n".join(current_chunk))
-            current_chunk = [para]
-            current_tokens = para_tokens
-        else:
-            current_chunk.append(para)
-            current_tokens += para_tokens
-
-            # If we've reached target size, finalize chunk
-            if current_tokens >= token_target:
-                chunks.append("\n\n".join(current_chunk))
-                current_chunk = []
-                current_tokens = 0
-
-    # Add remaining chunk
-    if current_chunk:
-        chunks.append("\n\n".join(current_chunk))
+    from utils_chunking import chunk_paragraphs, get_chunk_limits, locate_in_order
+    from utils_context import get_or_build_context
+
+    # Hash, MIME type and doc_id come from the document context (computed once per file)
+    context = get_or_build_context(context, source_path, config)
+    file_hash = context["hash_sha256"]
+    mime_type = context["mime_type"]
+    doc_id = context["doc_id"]
+
+    # Simple chunking by paragraphs, with exact source offsets per chunk
+    # TODO: Implement smart chunking with heading detection
+    token_target, token_max = get_chunk_limits(config)
+    chunks = chunk_paragraphs(markdown_text, token_target, token_max)
+
+    # Locate bbox elements in the markdown once (single forward pass)
+    bbox_index = locate_in_order(
+        markdown_text,
+        [(element["text"], element) for element in (bbox_elements or [])]
+    )
 
     # Convert to JSONL records (schema v2.3.0)
     schema_version = config.get("schema", {}).get("version", "2.3.0")
     processed_at = datetime.utcnow().isoformat() + "Z"
-    bbox_map = bbox_map or {}
 
     jsonl_records = []
-    for idx, chunk_text in enumerate(chunks):
+    for idx, chunk in enumerate(chunks):
+        chunk_text = chunk.text
         chunk_tokens = len(chunk_text.split())
 
-        # Try to find bbox for this chunk (fuzzy match)
-        chunk_bbox = None
-        if bbox_map:
-            # Simple strategy: look for exact or partial text match
-            for text_key, bbox_info in bbox_map.items():
-                if text_key in chunk_text or chunk_text[:100] in text_key:
-                    chunk_bbox = bbox_info.get("bbox")
-                    break
+        # Bbox and pages of the elements that start inside this chunk
+        chunk_elements = bbox_index.items_in(chunk.start, chunk.end)
+        chunk_bbox = chunk_elements[0]["bbox"] if chunk_elements else None
+        page_span = sorted({element["page"] for element in chunk_elements}) or None
 
         record = {
             "id": f"{doc_id}_{idx:04d}",
@@ -374,14 +363,14 @@ def convert_to_jsonl(
             "chunk_index": idx,
             "text": chunk_text,
             "attrs": {
-                "page_span": None,  # TODO: Track page numbers
+                "page_span": page_span,
                 "sections": [],     # TODO: Extract section headers
                 "table": False,     # TODO: Detect if chunk contains table
                 "token_count": chunk_tokens,
                 "bbox": chunk_bbox  # NEW in v2.3.0: bounding box coordinates
             },
             "source": {
-                "file_path": str(source_path.resolve()),
+                "file_path": context["resolved_path"],
                 "file_name": source_path.name,
                 "file_type": "pdf",
                 "mime_type": mime_type
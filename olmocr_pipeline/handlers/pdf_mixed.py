@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+pdf_mixed.py - Page-level routing for mixed digital/scanned PDFs
+
+Splits a PDF by per-page classification: scanned pages go to OlmOCR-2,
+pages with a good text layer go through Docling. Each side is chunked with
+its own converter (Docling chunks keep their bboxes), page numbers are
+mapped back to the original PDF and the chunks are merged in page order.
+
+Processing is split into steps so several mixed PDFs share one OlmOCR run:
+
+    prepare_mixed_pdf()        split into page subsets (+ preprocessing)
+    run_olmocr_batch_with_salvage() over every scanned subset of the batch
+    postprocess_mixed_output() Docling + chunking + merge + JSONL
+    cleanup_mixed_pdf()        remove the temporary subsets
+
+process_mixed_pdf_batch() runs all of them; process_mixed_pdf() is the
+single-file form.
+"""
+
+import hashlib
+import heapq
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import fitz  # PyMuPDF for page splitting
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils_olmocr import (
+    run_olmocr_batch_with_salvage,
+    demux_olmocr_results,
+    olmocr_records_to_markdown_with_pages,
+    olmocr_to_jsonl,
+    PageIndex
+)
+from utils_ocr_progress import ocr_file_metrics
+from .pdf_digital import (
+    get_docling_converter,
+    get_embedding_generator,
+    extract_bbox_from_docling,
+    convert_to_jsonl
+)
+
+PROCESSOR_NAME = "docling+olmocr-2"
+
+
+def split_pdf_pages(pdf_path: Path, page_numbers: List[int], output_path: Path) -> Path:
+    """
+    Write a new PDF containing only the given pages (in order).
+
+    Args:
+        pdf_path: Source PDF
+        page_numbers: 1-based page numbers to keep
+        output_path: Destination PDF path
+
+    Returns:
+        output_path
+    """
+    src = fitz.open(pdf_path)
+    subset = fitz.open()
+
+    try:
+        for page_num in page_numbers:
+            subset.insert_pdf(src, from_page=page_num - 1, to_page=page_num - 1)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        subset.save(output_path, garbage=3, deflate=True)
+    finally:
+        subset.close()
+        src.close()
+
+    return output_path
+
+
+def merge_chunks_by_page(digital_chunks: List[Dict], scanned_chunks: List[Dict]) -> List[Dict]:
+    """
+    Interleave the Docling and OlmOCR chunks of one PDF in original page order.
+
+    Both lists are already in document order; a chunk without page_span
+    stays behind its predecessor. On the same page, digital chunks come
+    first. chunk_index and id are renumbered over the merged list.
+
+    Args:
+        digital_chunks: JSONL records from convert_to_jsonl()
+        scanned_chunks: JSONL records from olmocr_to_jsonl()
+
+    Returns:
+        Merged list of records
+    """
+    def keyed(chunks: List[Dict]):
+        page = 0
+        for chunk in chunks:
+            page_span = chunk["attrs"].get("page_span")
+            if page_span:
+                page = max(page, page_span[0])
+            yield page, chunk
+
+    merged = [
+        chunk for _, chunk in
+        heapq.merge(keyed(digital_chunks), keyed(scanned_chunks), key=lambda item: item[0])
+    ]
+
+    for idx, chunk in enumerate(merged):
+        chunk["chunk_index"] = idx
+        chunk["id"] = f"{chunk['doc_id']}_{idx:04d}"
+
+    return merged
+
+
+def prepare_mixed_pdf(
+    pdf_path: Path,
+    output_dir: Path,
+    classification: Dict,
+    apply_preprocessing: bool = False
+) -> Dict:
+    """
+    Split a mixed PDF into its digital and scanned page subsets.
+
+    Every file written here is listed in plan["temp_files"] before it is
+    created, so cleanup_mixed_pdf() also removes partial leftovers.
+
+    Args:
+        pdf_path: Path to input PDF
+        output_dir: Base output directory
+        classification: classify_pdf() result with "scanned_pages"
+        apply_preprocessing: If True, apply image cleanup to the scanned subset
+
+    Returns:
+        Plan dictionary:
+        {
+            "pdf_path": Path,
+            "total_pages": int,
+            "digital_pages": list[int],   # 1-based original page numbers
+            "scanned_pages": list[int],
+            "digital_subset": Path | None,
+            "ocr_input": Path | None,     # Scanned subset as passed to OlmOCR
+            "temp_files": list[Path],
+            "warnings": list[str]
+        }
+    """
+    total_pages = classification["total_pages"]
+    scanned_pages = sorted(classification.get("scanned_pages", []))
+    scanned_set = set(scanned_pages)
+    digital_pages = [p for p in range(1, total_pages + 1) if p not in scanned_set]
+
+    mixed_staging = output_dir / "mixed_staging"
+    mixed_staging.mkdir(parents=True, exist_ok=True)
+
+    # Same-named PDFs from different folders can share a batch
+    tag = hashlib.sha256(str(pdf_path.resolve()).encode()).hexdigest()[:8]
+    prefix = f"{pdf_path.stem}_{tag}"
+
+    plan = {
+        "pdf_path": pdf_path,
+        "total_pages": total_pages,
+        "digital_pages": digital_pages,
+        "scanned_pages": scanned_pages,
+        "digital_subset": None,
+        "ocr_input": None,
+        "temp_files": [],
+        "warnings": []
+    }
+
+    if digital_pages:
+        digital_subset = mixed_staging / f"{prefix}__digital_pages.pdf"
+        plan["temp_files"].append(digital_subset)
+        plan["digital_subset"] = split_pdf_pages(pdf_path, digital_pages, digital_subset)
+
+    if scanned_pages:
+        scanned_subset = mixed_staging / f"{prefix}__scanned_pages.pdf"
+        # OlmOCR may write markdown next to an absolute input path
+        plan["temp_files"] += [scanned_subset, scanned_subset.with_suffix('.md')]
+        plan["ocr_input"] = split_pdf_pages(pdf_path, scanned_pages, scanned_subset)
+
+        if apply_preprocessing:
+            preprocessed = scanned_subset.parent / f"{scanned_subset.stem}_preprocessed.pdf"
+            plan["temp_files"] += [preprocessed, preprocessed.with_suffix('.md')]
+            try:
+                from utils_preprocess import preprocess_pdf
+                plan["ocr_input"] = preprocess_pdf(scanned_subset)
+            except Exception as e:
+                plan["warnings"].append(f"Preprocessing failed: {e}")
+
+    return plan
+
+
+def cleanup_mixed_pdf(plan: Dict) -> None:
+    """Remove the temporary page subsets (and OlmOCR markdown) of a plan."""
+    for leftover in plan["temp_files"]:
+        try:
+            leftover.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def postprocess_mixed_output(
+    plan: Dict,
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    records: Optional[List[Dict]] = None,
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
+) -> Dict:
+    """
+    Turn one mixed PDF's page subsets into markdown + JSONL.
+
+    The digital subset is converted with Docling and chunked by
+    convert_to_jsonl() with its bbox elements; the OlmOCR records of the
+    scanned subset are chunked by olmocr_to_jsonl(). Page numbers on both
+    sides are mapped from subset to original pages before chunking.
+
+    Args:
+        plan: Plan from prepare_mixed_pdf()
+        output_dir: Base output directory
+        config: Configuration dictionary
+        batch_id: Batch identifier
+        records: OlmOCR records of plan["ocr_input"] (from demux_olmocr_results)
+        skip_enrichment: Skip entity extraction and embeddings
+        context: Document context from build_document_context() (built if None)
+
+    Returns:
+        Result dictionary (same shape as process_digital_pdf(), plus file
+        metadata and digital_page_count / scanned_page_count)
+    """
+    from utils_context import get_or_build_context
+
+    pdf_path = plan["pdf_path"]
+    start_time = time.time()
+    warnings = list(plan["warnings"])
+    total_pages = plan["total_pages"]
+    digital_pages = plan["digital_pages"]
+    scanned_pages = plan["scanned_pages"]
+
+    markdown_dir = output_dir / "markdown"
+    jsonl_dir = output_dir / "jsonl"
+    for d in [markdown_dir, jsonl_dir]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    try:
+        context = get_or_build_context(context, pdf_path, config)
+
+        # Digital pages → Docling (bboxes kept, pages mapped back to the original PDF)
+        digital_chunks = []
+        if digital_pages:
+            print(f"   🔄 Converting {len(digital_pages)} page(s) of {pdf_path.name} with Docling")
+            result = get_docling_converter().convert(str(plan["digital_subset"]))
+
+            bbox_elements = []
+            for element in extract_bbox_from_docling(result):
+                if 1 <= element["page"] <= len(digital_pages):
+                    bbox_elements.append({**element, "page": digital_pages[element["page"] - 1]})
+
+            digital_chunks = convert_to_jsonl(
+                result.document.export_to_markdown(),
+                pdf_path,
+                config,
+                batch_id,
+                processor=PROCESSOR_NAME,
+                bbox_elements=bbox_elements,
+                context=context
+            )
+
+        # Scanned pages → OlmOCR-2 output
+        scanned_chunks = []
+        if scanned_pages:
+            if not records:
+                raise FileNotFoundError(f"OlmOCR did not produce JSONL output for scanned pages of: {pdf_path.name}")
+
+            ocr_text, subset_page_map = olmocr_records_to_markdown_with_pages(records, pdf_path.name)
+            page_map = PageIndex(
+                (start, end, scanned_pages[page_num - 1])
+                for start, end, page_num in subset_page_map.ranges()
+                if 1 <= page_num <= len(scanned_pages)
+            )
+
+            empty_pages = set(scanned_pages) - set(page_map.page_nums)
+            if empty_pages:
+                warnings.append(f"No text extracted for {len(empty_pages)} scanned page(s)")
+
+            scanned_chunks = olmocr_to_jsonl(
+                ocr_text,
+                pdf_path,
+                config,
+                batch_id,
+                page_mapping=page_map,
+                processor=PROCESSOR_NAME,
+                file_type="pdf_mixed",
+                context=context
+            )
+
+        chunks = merge_chunks_by_page(digital_chunks, scanned_chunks)
+        for chunk in chunks:
+            chunk["metadata"]["file_type"] = "pdf_mixed"
+
+        markdown_content = "\n\n".join(chunk["text"] for chunk in chunks)
+        char_count = len(markdown_content)
+
+        chars_per_page = char_count / total_pages if total_pages > 0 else 0
+        if chars_per_page < 100:
+            warnings.append(f"Low text yield: {chars_per_page:.0f} chars/page")
+
+        # Write markdown
+        final_md_path = markdown_dir / f"{pdf_path.stem}.md"
+        final_md_path.write_text(markdown_content, encoding="utf-8")
+
+        # Add entity extraction and embeddings (unless skipped for ingest-only mode)
+        if not skip_enrichment:
+            import os
+            enable_entities = config.get("entity_extraction", {}).get("enabled", False)
+            if enable_entities:
+                from utils_entity_integration import add_entities_to_chunks, format_entity_stats
+                api_key = config.get("entity_extraction", {}).get("openai_api_key") or os.getenv("OPENAI_API_KEY")
+                print(f"   🔍 Extracting entities...")
+                chunks, entity_stats = add_entities_to_chunks(
+                    chunks,
+                    enable_entities=True,
+                    api_key=api_key
+                )
+                print(format_entity_stats(entity_stats))
+
+            enable_embeddings = config.get("embeddings", {}).get("enabled", False)
+            if enable_embeddings:
+                from utils_embeddings import format_embedding_stats
+                print(f"   🔢 Generating embeddings...")
+                model_name = config.get("embeddings", {}).get("model", "all-mpnet-base-v2")
+                embedding_gen = get_embedding_generator(model_name)
+                chunks = embedding_gen.add_embeddings_to_chunks(chunks, show_progress=False)
+                print(f"   {format_embedding_stats(chunks)}")
+
+        # Write JSONL
+        jsonl_path = jsonl_dir / f"{pdf_path.stem}.jsonl"
+        with jsonl_path.open("w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+
+        duration_ms = int((time.time() - start_time) * 1000)
+
+        print(f"      ✅ {pdf_path.name}: {len(digital_pages)} Docling + {len(scanned_pages)} OlmOCR page(s), "
+              f"{char_count:,} chars, {len(chunks)} chunks ({duration_ms/1000:.1f}s)")
+        for warning in warnings:
+            print(f"      ⚠️  {warning}")
+
+        return {
+            "success": True,
+            "file_path": str(pdf_path),
+            "file_name": pdf_path.name,
+            "file_type": "pdf",
+            "processor": PROCESSOR_NAME,
+            "markdown_path": final_md_path,
+            "jsonl_path": jsonl_path,
+            "processing_duration_ms": duration_ms,
+            "page_count": total_pages,
+            "digital_page_count": len(digital_pages),
+            "scanned_page_count": len(scanned_pages),
+            "char_count": char_count,
+            "estimated_tokens": len(markdown_content.split()),
+            "chunk_count": len(chunks),
+            "warnings": warnings,
+            "error": None
+        }
+
+    except Exception as e:
+        duration_ms = int((time.time() - start_time) * 1000)
+        result = _mixed_failure_result(pdf_path, f"Mixed PDF processing failed: {e}")
+        result["processing_duration_ms"] = duration_ms
+        result["warnings"] = warnings
+        return result
+
+
+def _mixed_failure_result(pdf_path: Path, error_msg: str) -> Dict:
+    """Failure result for a mixed PDF (quarantined by the caller)."""
+    print(f"      ❌ {pdf_path.name}: {error_msg}")
+    return {
+        "success": False,
+        "file_path": str(pdf_path),
+        "file_name": pdf_path.name,
+        "file_type": "pdf",
+        "processor": PROCESSOR_NAME,
+        "markdown_path": None,
+        "jsonl_path": None,
+        "char_count": 0,
+        "estimated_tokens": 0,
+        "chunk_count": 0,
+        "error": error_msg,
+        "quarantined": True,
+        "retry_count": 0
+    }
+
+
+def process_mixed_pdf_batch(
+    pdf_paths: List[Path],
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    classifications: Dict[Path, Dict],
+    apply_preprocessing: bool = False,
+    skip_enrichment: bool = False,
+    contexts: Optional[Dict[Path, Dict]] = None
+) -> List[Dict]:
+    """
+    Process several mixed PDFs with one shared OlmOCR run.
+
+    The scanned-page subsets of all PDFs go to OlmOCR together (model and
+    vLLM startup paid once, failed runs salvaged per file); the digital
+    subsets are converted with Docling afterwards
+    (processors.digital_pdf_workers threads).
+    Temporary subsets are always removed.
+
+    Args:
+        pdf_paths: Mixed PDF paths
+        output_dir: Base output directory
+        config: Configuration dictionary
+        batch_id: Batch identifier
+        classifications: classify_pdf() result (with "scanned_pages") per PDF
+        apply_preprocessing: Apply image cleanup to scanned pages before OCR
+        skip_enrichment: Skip entity extraction and embeddings
+        contexts: Optional mapping of PDF path to document context
+
+    Returns:
+        List of result dictionaries (one per PDF, in input order)
+    """
+    olmocr_staging = output_dir / "olmocr_staging"
+    log_dir = output_dir / "logs"
+    for d in [olmocr_staging, log_dir]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    start_time = time.time()
+    plans: Dict[Path, Dict] = {}
+    results: Dict[Path, Dict] = {}
+
+    try:
+        for pdf_path in pdf_paths:
+            try:
+                plans[pdf_path] = prepare_mixed_pdf(
+                    pdf_path, output_dir, classifications[pdf_path], apply_preprocessing
+                )
+                plan = plans[pdf_path]
+                print(f"   🔀 {pdf_path.name}: {len(plan['digital_pages'])} digital page(s) → Docling, "
+                      f"{len(plan['scanned_pages'])} scanned page(s) → OlmOCR-2")
+            except Exception as e:
+                results[pdf_path] = _mixed_failure_result(pdf_path, f"Page split failed: {e}")
+
+        # Scanned pages of every PDF → one OlmOCR-2 run
+        ocr_inputs = [plan["ocr_input"] for plan in plans.values() if plan["ocr_input"]]
+        failures: Dict[Path, str] = {}
+        ocr_metrics = None
+        if ocr_inputs:
+            log_file = log_dir / f"olmocr_mixed_{batch_id}_{len(ocr_inputs)}files.log"
+            print(f"   🔄 Processing scanned pages of {len(ocr_inputs)} mixed PDF(s) with OlmOCR-2")
+            try:
+                failures, ocr_metrics = run_olmocr_batch_with_salvage(ocr_inputs, olmocr_staging, config, log_file)
+            except Exception as e:
+                print(f"   ❌ OlmOCR run failed: {e}")
+                failures = {ocr_input: str(e) for ocr_input in ocr_inputs}
+
+        records = demux_olmocr_results([p for p in ocr_inputs if p not in failures], olmocr_staging)
+
+        def postprocess(pdf_path: Path) -> Dict:
+            plan = plans[pdf_path]
+            ocr_input = plan["ocr_input"]
+            if ocr_input in failures:
+                result = _mixed_failure_result(pdf_path, f"Batch processing failed: {failures[ocr_input]}")
+            else:
+                result = postprocess_mixed_output(
+                    plan,
+                    output_dir,
+                    config,
+                    batch_id,
+                    records=records.get(ocr_input),
+                    skip_enrichment=skip_enrichment,
+                    context=(contexts or {}).get(pdf_path)
+                )
+            if ocr_input:
+                result.update(ocr_file_metrics(ocr_metrics, ocr_input))
+            return result
+
+        # Post-processing is dominated by Docling: size it like the digital PDF pool
+        planned = list(plans)
+        workers = config.get("processors", {}).get("digital_pdf_workers", 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results.update(zip(planned, executor.map(postprocess, planned)))
+
+    finally:
+        for plan in plans.values():
+            cleanup_mixed_pdf(plan)
+
+    batch_duration = time.time() - start_time
+    print(f"   ✅ Mixed batch complete: {len(pdf_paths)} files in {batch_duration:.1f}s")
+
+    return [results[pdf_path] for pdf_path in pdf_paths]
+
+
+def process_mixed_pdf(
+    pdf_path: Path,
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    classification: Dict,
+    apply_preprocessing: bool = False,
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
+) -> Dict:
+    """
+    Process a mixed digital/scanned PDF with page-level routing.
+
+    Only the pages listed in classification["scanned_pages"] are sent to
+    OlmOCR-2; all other pages go through Docling. Batches should use
+    process_mixed_pdf_batch(), which shares one OlmOCR run.
+
+    Args:
+        pdf_path: Path to input PDF
+        output_dir: Base output directory
+        config: Configuration dictionary
+        batch_id: Unique batch identifier
+        classification: classify_pdf() result with "scanned_pages"
+        apply_preprocessing: If True, apply image cleanup to scanned pages before OCR
+        skip_enrichment: Skip entity extraction and embeddings
+        context: Document context from build_document_context() (built if None)
+
+    Returns:
+        Processing result dictionary (see postprocess_mixed_output())
+
+    Raises:
+        FileNotFoundError: If PDF doesn't exist
+    """
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    return process_mixed_pdf_batch(
+        [pdf_path],
+        output_dir,
+        config,
+        batch_id,
+        {pdf_path: classification},
+        apply_preprocessing=apply_preprocessing,
+        skip_enrichment=skip_enrichment,
+        contexts={pdf_path: context} if context is not None else None
+    )[0]
@@ -10,18 +10,48 @@ Reuses OlmOCR logic from utils_olmocr.py.
 import json
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-import fitz  # PyMuPDF for page count
+from typing import Dict, List, Optional, Tuple
+import fitz  # PyMuPDF for page count (fallback when no document context)
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils_olmocr import (
     run_olmocr_batch,
+    run_olmocr_batch_with_salvage,
     get_olmocr_jsonl_path,
+    demux_olmocr_results,
     olmocr_jsonl_to_markdown_with_pages,
+    olmocr_records_to_markdown_with_pages,
     olmocr_to_jsonl
 )
+from utils_ocr_progress import ocr_file_metrics
+
+
+def _get_page_count(pdf_path: Path, context: Optional[Dict], warnings: List[str]) -> int:
+    """
+    Get page count from the document context, opening the PDF only as a fallback.
+
+    Args:
+        pdf_path: Original PDF path
+        context: Document context (page_count comes from classification)
+        warnings: Warning list to append to if the PDF can't be opened
+
+    Returns:
+        Page count (1 if it can't be determined)
+    """
+    if context and context.get("page_count"):
+        return context["page_count"]
+
+    try:
+        doc = fitz.open(pdf_path)
+        page_count = len(doc)
+        doc.close()
+        return page_count
+    except Exception:
+        warnings.append("Could not determine page count from PDF")
+        return 1
 
 
 def process_scanned_pdf(
@@ -30,7 +60,8 @@ def process_scanned_pdf(
     config: Dict,
     batch_id: str,
     apply_preprocessing: bool = False,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process scanned PDF using OlmOCR-2 OCR.
@@ -41,6 +72,7 @@ def process_scanned_pdf(
         config: Configuration dictionary
         batch_id: Unique batch identifier
         apply_preprocessing: If True, apply image cleanup before OCR
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Processing result dictionary with metadata:
@@ -136,14 +168,8 @@ def process_scanned_pdf(
             char_count = len(markdown_content)
             print(f"      📍 Extracted page info for {len(page_map)} text blocks")
 
-        # Get page count from PDF
-        try:
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
-        except Exception:
-            page_count = 1  # Fallback if PDF can't be opened
-            warnings.append("Could not determine page count from PDF")
+        # Get page count (from classification via context; no PDF reopen)
+        page_count = _get_page_count(pdf_path, context, warnings)
 
         # Check for low yield (OCR might have failed on some pages)
         chars_per_page = char_count / page_count if page_count > 0 else 0
@@ -160,7 +186,8 @@ def process_scanned_pdf(
             pdf_path,
             config,
             batch_id,
-            page_mapping=page_map
+            page_mapping=page_map,
+            context=context
         )
 
         # Add entity extraction and embeddings (unless skipped for ingest-only mode)
@@ -245,7 +272,8 @@ def process_scanned_pdf_batch(
     config: Dict,
     batch_id: str,
     apply_preprocessing: bool = False,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    contexts: Optional[Dict[Path, Dict]] = None
 ) -> List[Dict]:
     """
     Process multiple scanned PDFs in a single OlmOCR batch for 2-3x speedup.
@@ -260,19 +288,92 @@ def process_scanned_pdf_batch(
         batch_id: Batch identifier
         apply_preprocessing: Whether to apply preprocessing
         skip_enrichment: Whether to skip enrichment
+        contexts: Optional mapping of PDF path to document context
 
     Returns:
         List of result dictionaries (one per PDF)
     """
     start_time = time.time()
 
-    # Prepare output directories
+    try:
+        failures, ocr_metrics = run_scanned_ocr_batch(pdf_paths, output_dir, config, batch_id, apply_preprocessing)
+
+        # Read the shared results once, then post-process files in parallel
+        # (only files OlmOCR gave up on fail)
+        ok_paths = [pdf_path for pdf_path in pdf_paths if pdf_path not in failures]
+        records = demux_olmocr_results(ok_paths, output_dir / "olmocr_staging")
+
+        def postprocess(pdf_path: Path) -> Dict:
+            if pdf_path in failures:
+                result = _batch_failure_result(pdf_path, failures[pdf_path])
+            else:
+                result = postprocess_scanned_output(
+                    pdf_path,
+                    output_dir,
+                    config,
+                    batch_id,
+                    skip_enrichment=skip_enrichment,
+                    context=(contexts or {}).get(pdf_path),
+                    records=records[pdf_path]
+                )
+            result.update(ocr_file_metrics(ocr_metrics, pdf_path))
+            return result
+
+        workers = config.get("processors", {}).get("olmocr", {}).get("postprocess_workers", 4)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(postprocess, pdf_paths))
+
+        batch_duration = time.time() - start_time
+        print(f"   ✅ Batch complete: {len(pdf_paths)} files in {batch_duration:.1f}s ({batch_duration/len(pdf_paths):.1f}s/file avg)")
+
+        return results
+
+    except Exception as e:
+        # Handle batch failure - return failure results for all files
+        print(f"   ❌ Batch processing failed: {e}")
+        return [_batch_failure_result(pdf_path, e) for pdf_path in pdf_paths]
+
+
+def run_scanned_ocr_batch(
+    pdf_paths: List[Path],
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    apply_preprocessing: bool = False
+) -> Tuple[Dict[Path, str], Dict]:
+    """
+    Run OlmOCR once over a group of scanned PDFs (GPU stage only).
+
+    Post-processing of each PDF is done separately with
+    postprocess_scanned_output(), so a pipeline can start the next OCR batch
+    while the previous one is chunked and enriched on the CPU.
+
+    Images may be included in the same run (see handlers/image.py,
+    postprocess_image_output); preprocessing is applied to PDFs only.
+
+    If the OlmOCR run fails, completed files are salvaged and only the
+    missing ones are retried (see run_olmocr_batch_with_salvage).
+
+    Args:
+        pdf_paths: Scanned PDF (and image) paths to OCR together
+        output_dir: Output directory
+        config: Configuration dictionary
+        batch_id: Batch identifier
+        apply_preprocessing: Whether to apply preprocessing
+
+    Returns:
+        Tuple of (mapping of input path to error for files that got no OCR
+        output, empty if all succeeded; OCR throughput metrics with per-file
+        counts keyed by original path, see utils_ocr_progress.ocr_file_metrics).
+        Results are in output_dir/olmocr_staging
+
+    Raises:
+        Exception: If OlmOCR cannot be run at all
+    """
     olmocr_staging = output_dir / "olmocr_staging"
-    markdown_dir = output_dir / "markdown"
-    jsonl_dir = output_dir / "jsonl"
     log_dir = output_dir / "logs"
 
-    for d in [olmocr_staging, markdown_dir, jsonl_dir, log_dir]:
+    for d in [olmocr_staging, log_dir]:
         d.mkdir(parents=True, exist_ok=True)
 
     # Create batch log file
@@ -280,10 +381,10 @@ def process_scanned_pdf_batch(
 
     print(f"   🔄 Processing {len(pdf_paths)} scanned PDFs with OlmOCR-2 batch")
 
-    # Apply preprocessing if needed (for all files)
+    # Apply preprocessing if needed (PDFs only; images may share the batch)
     processed_paths = []
     for pdf_path in pdf_paths:
-        if apply_preprocessing:
+        if apply_preprocessing and pdf_path.suffix.lower() == ".pdf":
             try:
                 from utils_preprocess import preprocess_pdf
                 processed_path = preprocess_pdf(pdf_path)
@@ -294,50 +395,84 @@ def process_scanned_pdf_batch(
             processed_path = pdf_path
         processed_paths.append(processed_path)
 
-    try:
-        # ✨ KEY CHANGE: Pass ALL files to OlmOCR at once!
-        run_olmocr_batch(
-            file_paths=processed_paths,  # ← MULTIPLE FILES!
-            output_dir=olmocr_staging,
-            config=config,
-            log_file=log_file
-        )
+    # ✨ KEY CHANGE: Pass ALL files to OlmOCR at once!
+    failures, metrics = run_olmocr_batch_with_salvage(
+        file_paths=processed_paths,  # ← MULTIPLE FILES!
+        output_dir=olmocr_staging,
+        config=config,
+        log_file=log_file
+    )
+
+    # Report failures and per-file OCR counts by original path
+    per_file = metrics.get("per_file", {})
+    metrics["per_file"] = {
+        str(pdf_path.resolve()): per_file[str(processed_path.resolve())]
+        for pdf_path, processed_path in zip(pdf_paths, processed_paths)
+        if str(processed_path.resolve()) in per_file
+    }
+    return {
+        pdf_path: failures[processed_path]
+        for pdf_path, processed_path in zip(pdf_paths, processed_paths)
+        if processed_path in failures
+    }, metrics
+
+
+def postprocess_scanned_output(
+    pdf_path: Path,
+    output_dir: Path,
+    config: Dict,
+    batch_id: str,
+    skip_enrichment: bool = False,
+    context: Optional[Dict] = None,
+    records: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    Turn one PDF's OlmOCR batch output into markdown + JSONL (CPU stage).
 
-        # Process results for each file
-        results = []
-        for pdf_path in pdf_paths:
-            result = _process_single_olmocr_output(
-                pdf_path=pdf_path,
-                olmocr_staging=olmocr_staging,
-                markdown_dir=markdown_dir,
-                jsonl_dir=jsonl_dir,
-                config=config,
-                batch_id=batch_id,
-                skip_enrichment=skip_enrichment
-            )
-            results.append(result)
+    Args:
+        pdf_path: Original PDF path
+        output_dir: Output directory (same as passed to run_scanned_ocr_batch)
+        config: Configuration dictionary
+        batch_id: Batch identifier
+        skip_enrichment: Whether to skip enrichment
+        context: Document context (page count, hash, MIME type)
+        records: This PDF's OlmOCR records from demux_olmocr_results()
+                 (looked up in the staging results if None)
 
-        batch_duration = time.time() - start_time
-        print(f"   ✅ Batch complete: {len(pdf_paths)} files in {batch_duration:.1f}s ({batch_duration/len(pdf_paths):.1f}s/file avg)")
+    Returns:
+        Result dictionary for this PDF
+    """
+    markdown_dir = output_dir / "markdown"
+    jsonl_dir = output_dir / "jsonl"
 
-        return results
+    for d in [markdown_dir, jsonl_dir]:
+        d.mkdir(parents=True, exist_ok=True)
 
-    except Exception as e:
-        # Handle batch failure - return failure results for all files
-        print(f"   ❌ Batch processing failed: {e}")
-        return [
-            {
-                "success": False,
-                "file_path": str(pdf_path),
-                "file_name": pdf_path.name,
-                "file_type": "pdf",
-                "processor": "olmocr",
-                "error": f"Batch processing failed: {e}",
-                "quarantined": True,
-                "retry_count": 0
-            }
-            for pdf_path in pdf_paths
-        ]
+    return _process_single_olmocr_output(
+        pdf_path=pdf_path,
+        olmocr_staging=output_dir / "olmocr_staging",
+        markdown_dir=markdown_dir,
+        jsonl_dir=jsonl_dir,
+        config=config,
+        batch_id=batch_id,
+        skip_enrichment=skip_enrichment,
+        context=context,
+        records=records
+    )
+
+
+def _batch_failure_result(pdf_path: Path, error) -> Dict:
+    """Failure result for a PDF whose OlmOCR batch failed (error: exception or message)."""
+    return {
+        "success": False,
+        "file_path": str(pdf_path),
+        "file_name": pdf_path.name,
+        "file_type": "pdf",
+        "processor": "olmocr",
+        "error": f"Batch processing failed: {error}",
+        "quarantined": True,
+        "retry_count": 0
+    }
 
 
 def _process_single_olmocr_output(
@@ -347,7 +482,9 @@ def _process_single_olmocr_output(
     jsonl_dir: Path,
     config: Dict,
     batch_id: str,
-    skip_enrichment: bool
+    skip_enrichment: bool,
+    context: Optional[Dict] = None,
+    records: Optional[List[Dict]] = None
 ) -> Dict:
     """
     Extract and process OlmOCR output for a single PDF from batch results.
@@ -363,19 +500,24 @@ def _process_single_olmocr_output(
         config: Configuration dictionary
         batch_id: Batch identifier
         skip_enrichment: Whether to skip enrichment
+        context: Document context (page count, hash, MIME type)
+        records: This PDF's OlmOCR records (demultiplexed by the caller);
+                 if None, they are read from the staging results
 
     Returns:
-        Result dictionary for this PDF
+        Result dictionary for this PDF (same shape as process_scanned_pdf,
+        plus file metadata, so the caller can commit processing state)
     """
     start_time = time.time()
     stem = pdf_path.stem
     warnings = []
 
     try:
-        # Get OlmOCR JSONL output
-        jsonl_path_olmocr = get_olmocr_jsonl_path(pdf_path, olmocr_staging)
+        # Get this PDF's OlmOCR records (one pass over the shared results)
+        if records is None:
+            records = demux_olmocr_results([pdf_path], olmocr_staging)[pdf_path]
 
-        if jsonl_path_olmocr is None or not jsonl_path_olmocr.exists():
+        if not records:
             raise FileNotFoundError(f"OlmOCR did not produce JSONL output for: {pdf_path.name}")
 
         # Get OlmOCR markdown output
@@ -388,22 +530,16 @@ def _process_single_olmocr_output(
             markdown_content = olmocr_md_path.read_text(encoding="utf-8")
             char_count = len(markdown_content)
 
-            # Extract page mapping from JSONL (filter by this file for batched results)
-            _, page_map = olmocr_jsonl_to_markdown_with_pages(jsonl_path_olmocr, filter_source_file=pdf_path)
+            # Extract page mapping from this file's records
+            _, page_map = olmocr_records_to_markdown_with_pages(records, pdf_path.name)
         else:
-            # Fallback: Convert JSONL to markdown (filter by this file for batched results)
-            markdown_content, page_map = olmocr_jsonl_to_markdown_with_pages(jsonl_path_olmocr, filter_source_file=pdf_path)
+            # Fallback: Convert records to markdown
+            markdown_content, page_map = olmocr_records_to_markdown_with_pages(records, pdf_path.name)
             char_count = len(markdown_content)
             warnings.append("No markdown file found, used JSONL text")
 
-        # Get page count from PDF
-        try:
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
-        except Exception:
-            page_count = 1
-            warnings.append("Could not determine page count from PDF")
+        # Get page count (from classification via context; no PDF reopen)
+        page_count = _get_page_count(pdf_path, context, warnings)
 
         # Check for low yield
         chars_per_page = char_count / page_count if page_count > 0 else 0
@@ -420,7 +556,8 @@ def _process_single_olmocr_output(
             pdf_path,
             config,
             batch_id,
-            page_mapping=page_map
+            page_mapping=page_map,
+            context=context
         )
 
         # Add entity extraction and embeddings (unless skipped)
@@ -460,8 +597,8 @@ def _process_single_olmocr_output(
             "file_name": pdf_path.name,
             "file_type": "pdf",
             "processor": "olmocr-2",
-            "output_markdown": str(final_md_path),
-            "output_jsonl": str(jsonl_path),
+            "markdown_path": final_md_path,
+            "jsonl_path": jsonl_path,
             "page_count": page_count,
             "char_count": char_count,
             "estimated_tokens": len(markdown_content.split()),
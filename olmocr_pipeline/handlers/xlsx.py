@@ -10,7 +10,7 @@ import json
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import openpyxl
 import pandas as pd
@@ -20,7 +20,8 @@ def process_xlsx(
     xlsx_path: Path,
     output_dir: Path,
     config: Dict,
-    batch_id: str
+    batch_id: str,
+    context: Optional[Dict] = None
 ) -> Dict:
     """
     Process Excel or CSV file with smart table chunking.
@@ -30,6 +31,7 @@ def process_xlsx(
         output_dir: Base output directory
         config: Configuration dictionary
         batch_id: Unique batch identifier
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Processing result dictionary with metadata
@@ -53,11 +55,15 @@ def process_xlsx(
     try:
         print(f"   🔄 Processing Excel file: {xlsx_path.name}")
 
+        # Hash once per file; shared by all table chunks
+        from utils_context import get_or_build_context
+        context = get_or_build_context(context, xlsx_path, config)
+
         # Route based on extension
         if xlsx_path.suffix.lower() == '.csv':
-            markdown_content, chunks = _process_csv(xlsx_path, config, batch_id)
+            markdown_content, chunks = _process_csv(xlsx_path, config, batch_id, context)
         else:
-            markdown_content, chunks = _process_xlsx(xlsx_path, config, batch_id)
+            markdown_content, chunks = _process_xlsx(xlsx_path, config, batch_id, context)
 
         char_count = len(markdown_content)
 
@@ -109,7 +115,7 @@ def process_xlsx(
         }
 
 
-def _process_xlsx(xlsx_path: Path, config: Dict, batch_id: str) -> Tuple[str, List[Dict]]:
+def _process_xlsx(xlsx_path: Path, config: Dict, batch_id: str, context: Dict) -> Tuple[str, List[Dict]]:
     """
     Process XLSX file with multiple sheets.
 
@@ -150,7 +156,8 @@ def _process_xlsx(xlsx_path: Path, config: Dict, batch_id: str) -> Tuple[str, Li
                 sheet_name,
                 xlsx_path,
                 config,
-                batch_id
+                batch_id,
+                context=context
             )
             all_markdown.append(md)
             all_chunks.extend(jsonl)
@@ -162,7 +169,7 @@ def _process_xlsx(xlsx_path: Path, config: Dict, batch_id: str) -> Tuple[str, Li
     return combined_markdown, all_chunks
 
 
-def _process_csv(csv_path: Path, config: Dict, batch_id: str) -> Tuple[str, List[Dict]]:
+def _process_csv(csv_path: Path, config: Dict, batch_id: str, context: Dict) -> Tuple[str, List[Dict]]:
     """
     Process CSV file as single table.
 
@@ -188,7 +195,8 @@ def _process_csv(csv_path: Path, config: Dict, batch_id: str) -> Tuple[str, List
             "CSV",
             csv_path,
             config,
-            batch_id
+            batch_id,
+            context=context
         )
         all_markdown.append(md)
         all_chunks.extend(jsonl)
@@ -311,7 +319,8 @@ def _table_to_markdown_and_jsonl(
     sheet_name: str,
     source_path: Path,
     config: Dict,
-    batch_id: str
+    batch_id: str,
+    context: Optional[Dict] = None
 ) -> Tuple[str, List[Dict]]:
     """
     Convert table chunk to markdown and JSONL records.
@@ -322,12 +331,11 @@ def _table_to_markdown_and_jsonl(
         source_path: Original file path
         config: Configuration
         batch_id: Batch ID
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         Tuple of (markdown_text, jsonl_records)
     """
-    from utils_classify import compute_file_hash, get_mime_type
-
     rows = chunk_info["rows"]
     if not rows:
         return "", []
@@ -352,9 +360,13 @@ def _table_to_markdown_and_jsonl(
     markdown_text = "\n".join(markdown_lines)
 
     # Create JSONL record
-    file_hash = compute_file_hash(source_path)
-    mime_type = get_mime_type(source_path)
-    doc_id = file_hash[:16]
+    from utils_context import get_or_build_context
+
+    # Hash, MIME type and doc_id come from the document context (computed once per file)
+    context = get_or_build_context(context, source_path, config)
+    file_hash = context["hash_sha256"]
+    mime_type = context["mime_type"]
+    doc_id = context["doc_id"]
 
     schema_version = config.get("schema", {}).get("version", "2.2.0")
     processed_at = datetime.utcnow().isoformat() + "Z"
@@ -379,7 +391,7 @@ def _table_to_markdown_and_jsonl(
             "token_count": chunk_tokens
         },
         "source": {
-            "file_path": str(source_path.resolve()),
+            "file_path": context["resolved_path"],
             "file_name": source_path.name,
             "file_type": source_path.suffix.lstrip('.'),
             "mime_type": mime_type
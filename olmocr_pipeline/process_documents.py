@@ -205,15 +205,19 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
 
         # Handle reprocessing flags
         if args.reprocess_all or args.reprocess_hash:
-            from utils_state import clear_processed_state
+            from utils_state import clear_processed_state, get_ledger_for_config
 
             if args.reprocess_all:
                 print("🔄 Clearing all success markers for reprocessing...\n")
-                cleared = clear_processed_state(paths["jsonl_output"])
+                cleared = clear_processed_state(paths["jsonl_output"], ledger=get_ledger_for_config(config))
                 print(f"   Cleared {cleared} success marker(s)\n")
             elif args.reprocess_hash:
                 print(f"🔄 Clearing success marker for hash {args.reprocess_hash}...\n")
-                cleared = clear_processed_state(paths["jsonl_output"], hash_sha256=args.reprocess_hash)
+                cleared = clear_processed_state(
+                    paths["jsonl_output"],
+                    hash_sha256=args.reprocess_hash,
+                    ledger=get_ledger_for_config(config)
+                )
                 if cleared > 0:
                     print(f"   Cleared {cleared} success marker(s)\n")
                 else:
@@ -250,12 +254,13 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
 
             # Filter out already-processed files (unless disabled)
             if args.skip_processed and not args.reprocess_all:
-                from utils_state import get_processed_hashes, filter_unprocessed_files
+                from utils_state import get_processed_hashes, filter_unprocessed_files, get_ledger_for_config
 
                 processed_hashes = get_processed_hashes(
                     jsonl_dir=paths["jsonl_output"],
                     use_cache=True,
-                    cache_path=paths["gcs_mount_base"] / "state" / "processed_hashes.json"
+                    cache_path=paths["gcs_mount_base"] / "state" / "processed_hashes.json",
+                    ledger=get_ledger_for_config(config)
                 )
 
                 original_count = len(inventory)
@@ -279,7 +284,7 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
             file_paths = file_paths[:args.limit]
             print(f"   Limited to first {args.limit} file(s)")
 
-        if not file_paths:
+        if not file_paths and not args.watch:
             print("❌ No valid files to process. Exiting.")
             return
 
@@ -299,35 +304,47 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
             print(f"Batches ({args.batch_size} files each): {(len(file_paths) + args.batch_size - 1) // args.batch_size}")
             return
 
-        # TODO: Implement watch mode
-        if args.watch:
-            print("⚠️  Watch mode not yet implemented (deferred to production)")
-            return
-
         # Process files using unified batch processor
         from utils_processor import process_batch
         from utils_batch import generate_batch_id
 
-        batch_id = generate_batch_id()
-
-        # Process batch
-        batch_result = process_batch(
-            file_paths,
-            config,
-            batch_id,
-            apply_preprocessing=args.preprocess
-        )
-
-        # Print summary
-        from utils_manifest import generate_batch_summary, print_batch_summary
-        summary = generate_batch_summary(batch_result["manifest_path"])
-        print_batch_summary(summary)
-
-        # Print quarantine summary if any
-        if batch_result.get("quarantine_csv_path"):
-            from utils_quarantine import get_quarantine_stats, print_quarantine_summary
-            quar_stats = get_quarantine_stats(batch_result["quarantine_csv_path"])
-            print_quarantine_summary(quar_stats)
+        def run_batch(batch_files, batch_id):
+            batch_result = process_batch(
+                batch_files,
+                config,
+                batch_id,
+                apply_preprocessing=args.preprocess
+            )
+
+            # Print summary
+            from utils_manifest import generate_batch_summary, print_batch_summary
+            summary = generate_batch_summary(batch_result["manifest_path"])
+            print_batch_summary(summary)
+
+            # Print quarantine summary if any
+            if batch_result.get("quarantine_csv_path"):
+                from utils_quarantine import get_quarantine_stats, print_quarantine_summary
+                quar_stats = get_quarantine_stats(batch_result["quarantine_csv_path"])
+                print_quarantine_summary(quar_stats)
+
+            return batch_result
+
+        if args.watch:
+            # Watch mode: the startup batch runs inside the watcher, which lists the
+            # tree first so nothing uploaded meanwhile is missed (process lock stays held)
+            from utils_watch import get_watch_filters, run_watch
+            extensions, file_filter = get_watch_filters(args.file_types, None, config)
+            run_watch(
+                paths["input_bucket"],
+                config,
+                run_batch,
+                interval_seconds=args.watch_interval,
+                extensions=extensions,
+                initial_files=file_paths,
+                file_filter=file_filter
+            )
+        elif file_paths:
+            run_batch(file_paths, generate_batch_id())
 
         elapsed = time.time() - start_time
         print(f"\n⏱️  Total elapsed: {elapsed:.1f}s")
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+utils_catalog.py - Indexed SQLite catalog of the inventory and processing state
+
+inventory.csv stays the portable source of truth (it is written by
+build_inventory); the catalog is a derived index built from it, with typed
+columns and indexes on hash, file_type, classification_type, allowed,
+total_pages and processed status. Filtering, page-count sorting and
+"unprocessed" selection become indexed queries instead of full scans of the CSV.
+
+The catalog lives on local disk by default (SQLite locking is unreliable on
+gcsfuse) and is rebuilt automatically when inventory.csv changes.
+
+Records are returned in the same shape as utils_inventory.load_inventory()
+(string values, "True"/"False" for allowed), so existing consumers work unchanged.
+"""
+
+import csv
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils_inventory import INVENTORY_FIELDS
+
+
+DEFAULT_CATALOG_PATH = Path.home() / ".cache" / "olmocr_pipeline" / "catalog.sqlite"
+
+# Typed columns (everything not listed here is TEXT)
+_INTEGER_COLUMNS = {"size_bytes", "mtime_ns", "total_pages", "digital_pages"}
+_REAL_COLUMNS = {"percent_digital"}
+_BOOLEAN_COLUMNS = {"allowed"}
+
+_INDEXED_COLUMNS = [
+    "hash_sha256",
+    "file_type",
+    "classification_type",
+    "allowed",
+    "total_pages",
+    "processed"
+]
+
+
+def get_catalog_path(config: Dict) -> Path:
+    """
+    Resolve the catalog database path.
+
+    Uses catalog.path if set, otherwise ~/.cache/olmocr_pipeline/catalog.sqlite.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Path to catalog database (not created)
+    """
+    catalog_path = config.get("catalog", {}).get("path")
+    return Path(catalog_path).expanduser() if catalog_path else DEFAULT_CATALOG_PATH
+
+
+def is_catalog_enabled(config: Dict) -> bool:
+    """Check whether the SQLite catalog is enabled."""
+    return config.get("catalog", {}).get("enabled", True)
+
+
+def _connect(catalog_path: Path) -> sqlite3.Connection:
+    """Open a catalog connection with rows accessible by column name."""
+    conn = sqlite3.connect(str(catalog_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _inventory_signature(inventory_path: Path) -> str:
+    """Signature of inventory.csv used to detect when the catalog is stale."""
+    st = inventory_path.stat()
+    return f"{inventory_path.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _to_typed(column: str, value: Optional[str]):
+    """Convert a CSV string value to its typed catalog value."""
+    if value is None or value == "":
+        return None
+
+    try:
+        if column in _INTEGER_COLUMNS:
+            return int(value)
+        if column in _REAL_COLUMNS:
+            return float(value)
+    except ValueError:
+        return None
+
+    if column in _BOOLEAN_COLUMNS:
+        return 1 if str(value) == "True" else 0
+
+    return value
+
+
+def _to_record(row: sqlite3.Row) -> Dict:
+    """Convert a catalog row back to a load_inventory()-shaped record."""
+    record = {}
+    for column in INVENTORY_FIELDS:
+        value = row[column]
+        if value is None:
+            record[column] = ""
+        elif column in _BOOLEAN_COLUMNS:
+            record[column] = "True" if value else "False"
+        elif column in _REAL_COLUMNS:
+            record[column] = f"{value:.4f}"
+        else:
+            record[column] = str(value)
+    return record
+
+
+def build_catalog(inventory_path: Path, catalog_path: Path) -> Path:
+    """
+    Build the catalog from inventory.csv.
+
+    Builds into a temp file next to the target and renames it into place, so a
+    crash mid-build never leaves a truncated catalog behind.
+
+    Args:
+        inventory_path: Path to inventory.csv
+        catalog_path: Destination catalog database
+
+    Returns:
+        catalog_path
+
+    Raises:
+        FileNotFoundError: If inventory file doesn't exist
+    """
+    if not inventory_path.exists():
+        raise FileNotFoundError(f"Inventory not found: {inventory_path}")
+
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = catalog_path.with_name(f".{catalog_path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    column_defs = []
+    for column in INVENTORY_FIELDS:
+        if column in _INTEGER_COLUMNS or column in _BOOLEAN_COLUMNS:
+            column_defs.append(f"{column} INTEGER")
+        elif column in _REAL_COLUMNS:
+            column_defs.append(f"{column} REAL")
+        else:
+            column_defs.append(f"{column} TEXT")
+
+    conn = _connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")  # Single writer, temp file: no journal needed
+        conn.execute(
+            f"""
+            CREATE TABLE inventory (
+                row_order INTEGER PRIMARY KEY,
+                {', '.join(column_defs)},
+                processed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        placeholders = ", ".join("?" for _ in INVENTORY_FIELDS)
+        insert_sql = f"INSERT INTO inventory (row_order, {', '.join(INVENTORY_FIELDS)}) VALUES (?, {placeholders})"
+
+        with inventory_path.open("r", encoding="utf-8") as csvfile:
+            reader = csv.DictReader(csvfile)
+            conn.executemany(
+                insert_sql,
+                (
+                    (idx, *(_to_typed(column, record.get(column)) for column in INVENTORY_FIELDS))
+                    for idx, record in enumerate(reader)
+                )
+            )
+
+        # Create indexes after the bulk insert (much faster than maintaining them per row)
+        for column in _INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX idx_inventory_{column} ON inventory ({column})")
+
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('inventory_signature', ?)",
+            (_inventory_signature(inventory_path),)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, catalog_path)
+    return catalog_path
+
+
+def ensure_catalog(inventory_path: Path, config: Dict) -> Path:
+    """
+    Return an up-to-date catalog for inventory.csv, rebuilding only if it changed.
+
+    Args:
+        inventory_path: Path to inventory.csv
+        config: Configuration dictionary
+
+    Returns:
+        Path to catalog database
+    """
+    catalog_path = get_catalog_path(config)
+
+    if catalog_path.exists():
+        try:
+            conn = _connect(catalog_path)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'inventory_signature'").fetchone()
+            finally:
+                conn.close()
+
+            if row is not None and row["value"] == _inventory_signature(inventory_path):
+                return catalog_path
+        except sqlite3.Error:
+            pass  # Corrupted/old catalog: rebuild
+
+    print(f"🗂️  Building inventory catalog: {catalog_path}")
+    return build_catalog(inventory_path, catalog_path)
+
+
+def load_catalog(catalog_path: Path) -> List[Dict]:
+    """
+    Load all catalog records in inventory order.
+
+    Args:
+        catalog_path: Path to catalog database
+
+    Returns:
+        List of inventory records (same shape as load_inventory())
+    """
+    return filter_catalog(catalog_path, allowed_only=False)
+
+
+def _build_where(
+    file_types: Optional[List[str]] = None,
+    allowed_only: bool = True,
+    classification_type: Optional[str] = None,
+    unprocessed_only: bool = False
+) -> Tuple[str, List]:
+    """Build the WHERE clause and parameters shared by filter/count queries."""
+    clauses = []
+    params = []
+
+    if allowed_only:
+        clauses.append("allowed = 1")
+
+    if file_types:
+        clauses.append(f"file_type IN ({', '.join('?' for _ in file_types)})")
+        params.extend(file_types)
+
+    if classification_type:
+        clauses.append("classification_type = ?")
+        params.append(classification_type)
+
+    if unprocessed_only:
+        clauses.append("processed = 0")
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def filter_catalog(
+    catalog_path: Path,
+    file_types: Optional[List[str]] = None,
+    allowed_only: bool = True,
+    classification_type: Optional[str] = None,
+    unprocessed_only: bool = False,
+    sort_by: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Dict]:
+    """
+    Query catalog records by criteria (indexed equivalent of filter_inventory()).
+
+    Results are grouped by file type in the order given in file_types (matching
+    the per-type filtering in process_documents.py), then ordered by sort_by.
+
+    Args:
+        catalog_path: Path to catalog database
+        file_types: Only these file types (pdf, docx, xlsx, etc.)
+        allowed_only: If True, only return allowed files
+        classification_type: For PDFs, filter by classification (pdf_digital, pdf_scanned)
+        unprocessed_only: Only files not marked processed (see sync_processed_hashes())
+        sort_by: "pages" (smallest first) or "pages_desc" (largest first);
+                 anything else keeps inventory order
+        limit: Maximum number of records
+
+    Returns:
+        List of inventory records (same shape as load_inventory())
+    """
+    where, params = _build_where(file_types, allowed_only, classification_type, unprocessed_only)
+
+    order_terms = []
+    if file_types and len(file_types) > 1:
+        cases = " ".join(f"WHEN ? THEN {idx}" for idx in range(len(file_types)))
+        order_terms.append(f"CASE file_type {cases} END")
+        params.extend(file_types)
+
+    if sort_by == "pages":
+        order_terms.append("total_pages IS NULL, total_pages ASC")
+    elif sort_by == "pages_desc":
+        order_terms.append("total_pages IS NULL, total_pages DESC")
+
+    order_terms.append("row_order")
+
+    sql = f"SELECT * FROM inventory {where} ORDER BY {', '.join(order_terms)}"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    conn = _connect(catalog_path)
+    try:
+        return [_to_record(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def count_catalog(
+    catalog_path: Path,
+    file_types: Optional[List[str]] = None,
+    allowed_only: bool = True,
+    classification_type: Optional[str] = None,
+    unprocessed_only: bool = False
+) -> int:
+    """
+    Count catalog records matching the same criteria as filter_catalog().
+
+    Returns:
+        Number of matching records
+    """
+    where, params = _build_where(file_types, allowed_only, classification_type, unprocessed_only)
+
+    conn = _connect(catalog_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM inventory {where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def get_catalog_stats(catalog_path: Path) -> Dict:
+    """
+    Compute summary statistics (same shape as get_inventory_stats()).
+
+    Args:
+        catalog_path: Path to catalog database
+
+    Returns:
+        Dictionary with statistics
+    """
+    conn = _connect(catalog_path)
+    try:
+        total, allowed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(allowed = 1), 0) FROM inventory"
+        ).fetchone()
+
+        file_types = {
+            (row["file_type"] or "unknown"): row["n"]
+            for row in conn.execute("SELECT file_type, COUNT(*) AS n FROM inventory GROUP BY file_type")
+        }
+
+        pdf_counts = {
+            row["classification_type"]: row["n"]
+            for row in conn.execute(
+                "SELECT classification_type, COUNT(*) AS n FROM inventory "
+                "WHERE file_type = 'pdf' GROUP BY classification_type"
+            )
+        }
+    finally:
+        conn.close()
+
+    return {
+        "total_files": total,
+        "allowed": allowed,
+        "rejected": total - allowed,
+        "file_types": file_types,
+        "pdf_digital": pdf_counts.get("pdf_digital", 0),
+        "pdf_scanned": pdf_counts.get("pdf_scanned", 0)
+    }
+
+
+def sync_processed_hashes(catalog_path: Path, processed_hashes: Set[str]) -> int:
+    """
+    Mark catalog records processed/unprocessed from the success-marker hash set.
+
+    Args:
+        catalog_path: Path to catalog database
+        processed_hashes: Set of processed file hashes (from get_processed_hashes)
+
+    Returns:
+        Number of catalog records marked processed
+    """
+    conn = _connect(catalog_path)
+    try:
+        conn.execute("CREATE TEMP TABLE processed_hashes (hash TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT OR IGNORE INTO processed_hashes (hash) VALUES (?)",
+            ((h,) for h in processed_hashes)
+        )
+        conn.execute(
+            "UPDATE inventory SET processed = "
+            "(hash_sha256 IN (SELECT hash FROM processed_hashes))"
+        )
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM inventory WHERE processed = 1").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+utils_chunking.py - Offset-tracking text chunker
+
+Shared by the Docling (pdf_digital), DOCX and OlmOCR (scanned, mixed, image)
+JSONL converters. Every chunk records the exact [start, end) character
+offsets of the text it covers in the source markdown, so page and bbox
+assignment are direct lookups (PageIndex, OffsetIndex) instead of searching
+the document for the chunk text, which is quadratic and picks the wrong
+occurrence when legal boilerplate repeats.
+
+Chunk text is unchanged from the previous chunkers: pieces (paragraphs or
+sentences) stripped and re-joined with "\n\n" / " ".
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Chunk(NamedTuple):
+    """A chunk of text and the span of the source it came from."""
+    text: str
+    start: int  # Offset of the first character of the first piece
+    end: int    # Offset just past the last character of the last piece
+
+
+_PARAGRAPH_SEPARATOR = re.compile(r"\n\n")
+_SENTENCE_SEPARATOR = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_with_offsets(text: str, separator: re.Pattern) -> List[Tuple[str, int, int]]:
+    """Split text on separator into stripped, non-empty (piece, start, end)."""
+    pieces = []
+    pos = 0
+    for match in separator.finditer(text):
+        pieces.append((pos, match.start()))
+        pos = match.end()
+    pieces.append((pos, len(text)))
+
+    result = []
+    for start, end in pieces:
+        raw = text[start:end]
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        piece_start = start + (len(raw) - len(raw.lstrip()))
+        result.append((stripped, piece_start, piece_start + len(stripped)))
+    return result
+
+
+def _pack(pieces: List[Tuple[str, int, int]], token_target: int, token_max: int, joiner: str) -> List[Chunk]:
+    """Greedily combine pieces into chunks of about token_target (never above token_max unless one piece is)."""
+    chunks = []
+    current: List[Tuple[str, int, int]] = []
+    current_tokens = 0
+
+    def flush():
+        chunks.append(Chunk(joiner.join(p[0] for p in current), current[0][1], current[-1][2]))
+
+    for piece in pieces:
+        piece_tokens = len(piece[0].split())
+
+        # If adding this piece exceeds max, finalize current chunk
+        if current_tokens + piece_tokens > token_max and current:
+            flush()
+            current = [piece]
+            current_tokens = piece_tokens
+        else:
+            current.append(piece)
+            current_tokens += piece_tokens
+
+            # If we've reached target size, finalize chunk
+            if current_tokens >= token_target:
+                flush()
+                current = []
+                current_tokens = 0
+
+    # Add remaining chunk
+    if current:
+        flush()
+
+    return chunks
+
+
+def chunk_paragraphs(text: str, token_target: int = 1400, token_max: int = 2000) -> List[Chunk]:
+    """
+    Chunk markdown by paragraphs ("\\n\\n"-separated blocks).
+
+    Args:
+        text: Markdown content
+        token_target: Close a chunk once it reaches this many tokens (words)
+        token_max: Never grow a chunk past this many tokens
+
+    Returns:
+        Chunks with source offsets, in document order
+    """
+    return _pack(_split_with_offsets(text, _PARAGRAPH_SEPARATOR), token_target, token_max, "\n\n")
+
+
+def chunk_sentences(text: str, token_target: int = 1400, token_max: int = 2000) -> List[Chunk]:
+    """
+    Chunk continuous text (OlmOCR output) by sentences.
+
+    Args:
+        text: Text content
+        token_target: Close a chunk once it reaches this many tokens (words)
+        token_max: Never grow a chunk past this many tokens
+
+    Returns:
+        Chunks with source offsets, in document order
+    """
+    return _pack(_split_with_offsets(text, _SENTENCE_SEPARATOR), token_target, token_max, " ")
+
+
+def get_chunk_limits(config: Dict) -> Tuple[int, int]:
+    """
+    Get (token_target, token_max) from the chunking config.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Tuple of (token_target, token_max)
+    """
+    chunking_config = config.get("chunking", {})
+    return chunking_config.get("token_target", 1400), chunking_config.get("token_max", 2000)
+
+
+class OffsetIndex:
+    """
+    Items located at character spans of a document, searchable by offset.
+
+    Built in one forward pass (locate_in_order), then each chunk's items
+    are found with bisect over the sorted span starts.
+
+    Args:
+        spans: (start, end, item) tuples
+    """
+
+    def __init__(self, spans: Iterable[Tuple[int, int, Dict]] = ()):
+        ordered = sorted(spans, key=lambda s: (s[0], s[1]))
+        self.starts = [s[0] for s in ordered]
+        self.ends = [s[1] for s in ordered]
+        self.items = [s[2] for s in ordered]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def items_in(self, start: int, end: int) -> List[Dict]:
+        """Items whose span starts inside [start, end), in document order."""
+        return self.items[bisect.bisect_left(self.starts, start):bisect.bisect_left(self.starts, end)]
+
+    def first_in(self, start: int, end: int) -> Optional[Dict]:
+        """First item whose span starts inside [start, end), or None."""
+        i = bisect.bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.items[i]
+        return None
+
+
+def locate_in_order(text: str, elements: List[Tuple[str, Dict]], window: int = 5000) -> OffsetIndex:
+    """
+    Find each element's span in text, assuming elements appear in document order.
+
+    Each search continues from the end of the previous match and only looks
+    `window` characters ahead, so the whole document is scanned once and
+    repeated passages map to their own occurrence. An element that isn't
+    found near the cursor (reformatted by the markdown export, or text that
+    the export left out) is skipped without moving the cursor, so it can't
+    jump to a later repeat of the same text and lose everything in between.
+
+    Args:
+        text: Document text (e.g. Docling markdown)
+        elements: (element_text, item) pairs in document order
+        window: Maximum characters between the cursor and an element's match
+
+    Returns:
+        OffsetIndex of the located items
+    """
+    spans = []
+    cursor = 0
+    for element_text, item in elements:
+        pos = text.find(element_text, cursor, cursor + window + len(element_text))
+        if pos == -1:
+            continue
+        spans.append((pos, pos + len(element_text), item))
+        cursor = pos + len(element_text)
+    return OffsetIndex(spans)
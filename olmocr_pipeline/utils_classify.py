@@ -6,14 +6,143 @@ Classifies PDFs as scanned vs digital using PyMuPDF text layer detection.
 Enforces hard page limits and routing confidence thresholds.
 """
 
-import hashlib
 import random
+import re
 from pathlib import Path
 from typing import Dict, Literal, Optional
 import fitz  # PyMuPDF
 
 
-def has_full_page_image(page: fitz.Page) -> bool:
+# Bump whenever classification logic changes so cached results are invalidated
+# (see utils_classify_cache.py)
+CLASSIFIER_VERSION = "2.6.0"
+
+# Text-showing operators in a decompressed content stream: "(abc) Tj", "[(a) 12 (b)] TJ", "<0041>Tj"
+_TEXT_SHOW_OPERATORS = re.compile(rb"[\)\]>\s](?:Tj|TJ)(?![A-Za-z0-9])")
+
+
+def get_probe_mode(config: Dict) -> str:
+    """
+    Get the classification probe mode from config.
+
+    - "fast": Content-stream / xref metadata probes (no text extraction, no pixmap decoding)
+    - "full": Original get_text() + Pixmap based checks
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        "fast" or "full"
+    """
+    return config.get("classification", {}).get("probe_mode", "fast")
+
+
+def page_has_text_layer(page: fitz.Page, fast: bool = True) -> bool:
+    """
+    Check whether a page has a text layer.
+
+    Fast mode avoids full text extraction: pages without any fonts cannot
+    render text, and pages whose content stream contains text-showing
+    operators (Tj/TJ) have a text layer. Only ambiguous pages (fonts present
+    but text drawn from Form XObjects or rare operators) fall back to get_text().
+
+    Args:
+        page: PyMuPDF Page object
+        fast: Use content-stream probe instead of text extraction
+
+    Returns:
+        bool: True if page has extractable text
+    """
+    if fast:
+        try:
+            if not page.get_fonts(full=False):
+                return False  # No fonts = no renderable text
+
+            if _TEXT_SHOW_OPERATORS.search(page.read_contents()):
+                return True
+        except Exception:
+            pass  # Fall through to text extraction
+
+    return bool(page.get_text().strip())
+
+
+def _is_scan_sized_image(img_width: int, img_height: int, page_rect: fitz.Rect) -> bool:
+    """
+    Pixel dimension heuristics: does an image look like a full-page scan?
+
+    Args:
+        img_width: Image width in pixels
+        img_height: Image height in pixels
+        page_rect: Page rectangle (points)
+
+    Returns:
+        bool: True if dimensions match a scanned page
+    """
+    # Get page dimensions in points (1 point = 1/72 inch)
+    page_width_pts = page_rect.width
+    page_height_pts = page_rect.height
+
+    # Convert page points to inches
+    page_width_inches = page_width_pts / 72.0
+    page_height_inches = page_height_pts / 72.0
+
+    # Calculate image DPI
+    img_dpi_x = img_width / page_width_inches if page_width_inches > 0 else 0
+    img_dpi_y = img_height / page_height_inches if page_height_inches > 0 else 0
+    avg_dpi = (img_dpi_x + img_dpi_y) / 2.0
+
+    # Detection heuristics
+    is_scan_resolution = avg_dpi >= 50  # Scan quality (50+ DPI)
+    min_dimension = min(img_width, img_height)
+    is_substantial_image = min_dimension >= 500  # At least 500px
+
+    # Check aspect ratio matches page
+    img_aspect = img_height / img_width if img_width > 0 else 0
+    page_aspect = page_height_pts / page_width_pts if page_width_pts > 0 else 0
+    aspect_diff = abs(img_aspect - page_aspect)
+    has_matching_aspect = aspect_diff < 0.2  # Within 20%
+
+    # Additional: Check if image is page-sized (for very low DPI scans)
+    page_w_px_at_72dpi = page_width_pts
+    page_h_px_at_72dpi = page_height_pts
+    is_page_sized = (
+        (0.8 * page_w_px_at_72dpi <= img_width <= 5 * page_w_px_at_72dpi) and
+        (0.8 * page_h_px_at_72dpi <= img_height <= 5 * page_h_px_at_72dpi)
+    )
+
+    # Detect if: (High quality scan) OR (Page-sized image with matching aspect)
+    return (is_scan_resolution and is_substantial_image and has_matching_aspect) or \
+           (is_page_sized and has_matching_aspect)
+
+
+def _has_full_page_image_fast(page: fitz.Page, page_area: float) -> bool:
+    """
+    Fast full-page image check using image metadata only.
+
+    page.get_image_info() walks the content stream once and reports every
+    image's placement rect plus its pixel dimensions from the xref dictionary,
+    so neither per-xref rect lookups nor pixmap decoding are needed.
+    """
+    image_infos = page.get_image_info()
+
+    if not image_infos:
+        return False  # No images at all
+
+    # PRIMARY METHOD: Area coverage (DPI-independent)
+    for info in image_infos:
+        bbox = fitz.Rect(info["bbox"])
+        if abs(bbox.width * bbox.height) / page_area >= 0.80:
+            return True
+
+    # BACKUP METHOD: Pixel dimension heuristics (from xref metadata, no decoding)
+    for info in image_infos:
+        if _is_scan_sized_image(info.get("width", 0), info.get("height", 0), page.rect):
+            return True
+
+    return False
+
+
+def has_full_page_image(page: fitz.Page, fast: bool = False) -> bool:
     """
     Check if a single page has a full-page scanned image.
 
@@ -22,6 +151,7 @@ def has_full_page_image(page: fitz.Page) -> bool:
 
     Args:
         page: PyMuPDF Page object
+        fast: Read image dimensions/placement from metadata instead of decoding pixmaps
 
     Returns:
         bool: True if page contains a full-page scan (>80% coverage)
@@ -32,6 +162,12 @@ def has_full_page_image(page: fitz.Page) -> bool:
     if page_area == 0:
         return False  # Degenerate case
 
+    if fast:
+        try:
+            return _has_full_page_image_fast(page, page_area)
+        except Exception:
+            pass  # Fall back to the full check
+
     # ⚡ OPTIMIZATION 3: Lightweight Image Detection
     # Use full=False to avoid extracting image bytes (faster)
     image_list = page.get_images(full=False)
@@ -67,44 +203,10 @@ def has_full_page_image(page: fitz.Page) -> bool:
 
         try:
             pix = fitz.Pixmap(page.parent, xref)
-
-            # Get page dimensions in points (1 point = 1/72 inch)
-            page_width_pts = page_rect.width
-            page_height_pts = page_rect.height
-
-            # Convert page points to inches
-            page_width_inches = page_width_pts / 72.0
-            page_height_inches = page_height_pts / 72.0
-
-            # Calculate image DPI
-            img_dpi_x = pix.width / page_width_inches if page_width_inches > 0 else 0
-            img_dpi_y = pix.height / page_height_inches if page_height_inches > 0 else 0
-            avg_dpi = (img_dpi_x + img_dpi_y) / 2.0
-
-            # Detection heuristics
-            is_scan_resolution = avg_dpi >= 50  # Scan quality (50+ DPI)
-            min_dimension = min(pix.width, pix.height)
-            is_substantial_image = min_dimension >= 500  # At least 500px
-
-            # Check aspect ratio matches page
-            img_aspect = pix.height / pix.width if pix.width > 0 else 0
-            page_aspect = page_height_pts / page_width_pts if page_width_pts > 0 else 0
-            aspect_diff = abs(img_aspect - page_aspect)
-            has_matching_aspect = aspect_diff < 0.2  # Within 20%
-
-            # Additional: Check if image is page-sized (for very low DPI scans)
-            page_w_px_at_72dpi = page_width_pts
-            page_h_px_at_72dpi = page_height_pts
-            is_page_sized = (
-                (0.8 * page_w_px_at_72dpi <= pix.width <= 5 * page_w_px_at_72dpi) and
-                (0.8 * page_h_px_at_72dpi <= pix.height <= 5 * page_h_px_at_72dpi)
-            )
-
+            img_width, img_height = pix.width, pix.height
             pix = None  # Free memory immediately
 
-            # Detect if: (High quality scan) OR (Page-sized image with matching aspect)
-            if (is_scan_resolution and is_substantial_image and has_matching_aspect) or \
-               (is_page_sized and has_matching_aspect):
+            if _is_scan_sized_image(img_width, img_height, page_rect):
                 return True
 
         except Exception:
@@ -114,7 +216,7 @@ def has_full_page_image(page: fitz.Page) -> bool:
     return False
 
 
-def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
+def detect_full_page_images(pdf_path: Path, config: Dict, doc: Optional[fitz.Document] = None) -> Dict:
     """
     Check for full-page scanned images using stratified random sampling.
 
@@ -127,6 +229,7 @@ def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
     Args:
         pdf_path: Path to PDF file
         config: Configuration dict with image_detection settings
+        doc: Already-open document to reuse (not closed here); opened from pdf_path if None
 
     Returns:
         Dict with:
@@ -135,17 +238,21 @@ def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
             - scan_pages: int
             - scan_percentage: float
     """
-    try:
-        doc = fitz.open(pdf_path)
-    except Exception:
-        return {
-            'has_full_page_scans': False,
-            'sampled_pages': 0,
-            'scan_pages': 0,
-            'scan_percentage': 0.0
-        }
+    owns_doc = doc is None
+
+    if owns_doc:
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception:
+            return {
+                'has_full_page_scans': False,
+                'sampled_pages': 0,
+                'scan_pages': 0,
+                'scan_percentage': 0.0
+            }
 
     total_pages = len(doc)
+    fast = get_probe_mode(config) == "fast"
 
     # Get config settings
     img_config = config.get("classification", {}).get("image_detection", {})
@@ -181,13 +288,14 @@ def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
     # ⚡ OPTIMIZATION 4: Early Exit Once Confident
     for page_num in pages_to_check:
         try:
-            if has_full_page_image(doc[page_num]):
+            if has_full_page_image(doc[page_num], fast=fast):
                 full_page_scan_count += 1
             checked_pages += 1
 
             # Early exit if we've found enough scans to be confident
             if full_page_scan_count >= early_exit_threshold:
-                doc.close()
+                if owns_doc:
+                    doc.close()
                 return {
                     'has_full_page_scans': True,
                     'sampled_pages': checked_pages,
@@ -199,7 +307,8 @@ def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
             # Don't let one bad page break classification
             continue
 
-    doc.close()
+    if owns_doc:
+        doc.close()
 
     # Conservative threshold: If >50% of sampled pages have scans
     threshold = img_config.get("sample_threshold", 0.50)
@@ -215,14 +324,22 @@ def detect_full_page_images(pdf_path: Path, config: Dict) -> Dict:
 
 def classify_pdf(
     pdf_path: Path,
-    config: Dict
+    config: Dict,
+    file_hash: Optional[str] = None,
+    use_cache: bool = True
 ) -> Dict:
     """
     Classify PDF as scanned or digital using PyMuPDF text layer analysis.
 
+    Results are cached on disk keyed by content hash + classification config
+    fingerprint (see utils_classify_cache.py), so each PDF is only opened and
+    page-scanned once across inventory builds and processing runs.
+
     Args:
         pdf_path: Path to PDF file
         config: Configuration dict with classification thresholds
+        file_hash: Precomputed SHA256 of the file (computed if omitted and cache enabled)
+        use_cache: Consult/populate the persistent classification cache
 
     Returns:
         Dictionary with classification results:
@@ -233,7 +350,8 @@ def classify_pdf(
             "total_pages": int,
             "digital_pages": int,
             "allowed": bool,
-            "rejection_reason": str | None
+            "rejection_reason": str | None,
+            "scanned_pages": list[int]  # 1-based, only with page_routing enabled
         }
 
     Raises:
@@ -243,6 +361,32 @@ def classify_pdf(
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
+    from utils_classify_cache import (
+        is_classification_cache_enabled,
+        load_cached_classification,
+        store_cached_classification
+    )
+
+    if not (use_cache and is_classification_cache_enabled(config)):
+        return _classify_pdf_uncached(pdf_path, config)
+
+    if file_hash is None:
+        file_hash = compute_file_hash(pdf_path)
+
+    cached = load_cached_classification(file_hash, config)
+    if cached is not None:
+        return cached
+
+    result = _classify_pdf_uncached(pdf_path, config)
+    store_cached_classification(file_hash, config, result)
+
+    return result
+
+
+def _classify_pdf_uncached(pdf_path: Path, config: Dict) -> Dict:
+    """
+    Run the actual PyMuPDF classification (no cache). See classify_pdf().
+    """
     # Extract config thresholds
     percent_cutoff = config.get("classification", {}).get("percent_digital_cutoff", 0.75)
     confidence_low_min = config.get("classification", {}).get("confidence_low_min", 0.65)
@@ -270,6 +414,10 @@ def classify_pdf(
             "rejection_reason": f"Exceeds {max_pages}-page limit ({total_pages} pages)"
         }
 
+    # ⚡ Fast probe: content-stream text operators instead of full text extraction
+    fast = get_probe_mode(config) == "fast"
+    page_has_text = {}  # page_num -> bool (each page probed at most once)
+
     # ⚡ OPTIMIZATION 1: Metadata Pre-Scan (Early Exit)
     # Check first 2-3 pages for text before full analysis
     prescan_pages = min(3, total_pages)
@@ -277,17 +425,21 @@ def classify_pdf(
 
     for page_num in range(prescan_pages):
         try:
-            page = doc[page_num]
-            text = page.get_text().strip()
-            if text:
+            page_has_text[page_num] = page_has_text_layer(doc[page_num], fast=fast)
+            if page_has_text[page_num]:
                 prescan_digital += 1
         except Exception:
+            page_has_text[page_num] = False
             continue
 
     prescan_pct = prescan_digital / prescan_pages if prescan_pages > 0 else 0.0
 
+    # Page-level routing needs every page's text flag, so the pre-scan early exit
+    # is skipped (a scanned cover sheet must not hide the digital pages behind it)
+    page_routing = config.get("classification", {}).get("page_routing", {}).get("enabled", False)
+
     # Early exit if clearly scanned (<5% text in first pages)
-    if prescan_pct < 0.05:
+    if prescan_pct < 0.05 and not page_routing:
         doc.close()
         return {
             "type": "pdf_scanned",
@@ -300,20 +452,18 @@ def classify_pdf(
             "classification_reason": f"Low text yield in pre-scan ({prescan_pct:.1%})"
         }
 
-    # Full text analysis (only if pre-scan indicates some text)
+    # Full text analysis (only if pre-scan indicates some text, or page routing is enabled)
     digital_pages = 0
     for page_num in range(total_pages):
         try:
-            page = doc[page_num]
-            text = page.get_text().strip()
-            if text:
+            if page_num not in page_has_text:  # Reuse pre-scan results
+                page_has_text[page_num] = page_has_text_layer(doc[page_num], fast=fast)
+            if page_has_text[page_num]:
                 digital_pages += 1
         except Exception:
             # Skip pages that fail to extract (treat as scanned)
             continue
 
-    doc.close()
-
     # Calculate digital percentage
     pct_digital = digital_pages / total_pages if total_pages > 0 else 0.0
 
@@ -332,7 +482,8 @@ def classify_pdf(
         image_config = config.get("classification", {}).get("image_detection", {})
 
         if image_config.get("enabled", True):
-            image_result = detect_full_page_images(pdf_path, config)
+            # Reuse the open document (no second open/parse of the PDF)
+            image_result = detect_full_page_images(pdf_path, config, doc=doc)
 
             if image_result['has_full_page_scans']:
                 # Override: This is a pre-OCR'd scan, needs real OCR
@@ -351,6 +502,28 @@ def classify_pdf(
         classification_type = "pdf_scanned"
         classification_reason = f"Low text yield ({pct_digital:.1%})"
 
+    # 📄 STAGE 3: Per-page classification for mixed digital/scanned documents
+    # A page needs OCR if it carries a full-page scan: either an image-only page,
+    # or text sitting on top of a scan (pre-OCR'd page). A page with neither text
+    # nor a full-page image is blank and stays on the digital side. Text pages are
+    # only image-checked when Stage 2 sampling found scans, so a plain digital PDF
+    # costs no per-page image analysis. Used by the page router in utils_processor.py.
+    scanned_pages = None
+    if page_routing:
+        check_text_pages = bool(image_result and image_result['scan_pages'] > 0)
+        scanned_pages = []
+
+        for page_num in range(total_pages):
+            if page_has_text.get(page_num, False) and not check_text_pages:
+                continue
+            try:
+                if has_full_page_image(doc[page_num], fast=fast):
+                    scanned_pages.append(page_num + 1)
+            except Exception:
+                continue
+
+    doc.close()
+
     # Build result dict
     result = {
         "type": classification_type,
@@ -363,6 +536,10 @@ def classify_pdf(
         "classification_reason": classification_reason
     }
 
+    # Add per-page routing details (1-based page numbers that need OCR)
+    if scanned_pages is not None:
+        result["scanned_pages"] = scanned_pages
+
     # Add image detection details if available
     if image_result:
         result["image_detection"] = {
@@ -413,6 +590,9 @@ def compute_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
     """
     Compute hash of input file for deduplication and provenance.
 
+    Delegates to utils_hash, which reuses cached digests for files whose
+    path, size, mtime and inode are unchanged.
+
     Args:
         file_path: Path to file
         algorithm: Hash algorithm (default: sha256)
@@ -423,16 +603,8 @@ def compute_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
     Raises:
         FileNotFoundError: If file doesn't exist
     """
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-
-    hash_obj = hashlib.new(algorithm)
-
-    with file_path.open("rb") as f:
-        while chunk := f.read(8192):
-            hash_obj.update(chunk)
-
-    return hash_obj.hexdigest()
+    from utils_hash import compute_file_hash as _compute_file_hash
+    return _compute_file_hash(Path(file_path), algorithm)
 
 
 def validate_file_type(
@@ -514,3 +686,9 @@ FILE_TYPE_HANDLERS = {
     'tif': 'image_handler',
     'tiff': 'image_handler'
 }
+
+# Extensions handled by OlmOCR as single-page images (batched like scanned PDFs)
+IMAGE_EXTENSIONS = {f".{ext}" for ext, handler in FILE_TYPE_HANDLERS.items() if handler == 'image_handler'}
+
+# CPU-only office formats (DOCX via Docling/python-docx, XLSX/CSV via openpyxl)
+OFFICE_EXTENSIONS = {f".{ext}" for ext, handler in FILE_TYPE_HANDLERS.items() if handler in ('docx_handler', 'xlsx_handler')}
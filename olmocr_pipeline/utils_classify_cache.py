@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+utils_classify_cache.py - Persistent PDF classification cache
+
+Stores classify_pdf() results on disk keyed by the input file's content hash
+plus a fingerprint of the `classification` config section, so a PDF is opened
+and page-scanned at most once across inventory builds and processing runs.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils_classify import CLASSIFIER_VERSION
+
+
+# Classification config keys that never affect a classification result
+# (changing them must not invalidate the cache)
+_FINGERPRINT_EXCLUDED_KEYS = {"parallel_workers", "cache"}
+
+# Cache write failures are reported once per process (e.g. read-only or full mount)
+_write_failure_reported = False
+
+
+def get_classification_fingerprint(config: Dict) -> str:
+    """
+    Compute a stable fingerprint of the classification settings.
+
+    Any change to thresholds, image detection settings, or CLASSIFIER_VERSION
+    produces a new fingerprint, so stale cache entries are simply never hit.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        16-char hex fingerprint
+    """
+    section = {
+        key: value
+        for key, value in config.get("classification", {}).items()
+        if key not in _FINGERPRINT_EXCLUDED_KEYS
+    }
+    payload = json.dumps(
+        {"classifier_version": CLASSIFIER_VERSION, "classification": section},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def get_classification_cache_dir(config: Dict) -> Path:
+    """
+    Resolve the classification cache directory.
+
+    Uses classification.cache.dir if set, otherwise {state_dir}/classification_cache.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Path to cache directory (not created)
+    """
+    cache_config = config.get("classification", {}).get("cache", {})
+    if cache_config.get("dir"):
+        return Path(cache_config["dir"])
+
+    from utils_config import get_storage_paths
+    return get_storage_paths(config)["state_dir"] / "classification_cache"
+
+
+def is_classification_cache_enabled(config: Dict) -> bool:
+    """Check whether the persistent classification cache is enabled."""
+    return config.get("classification", {}).get("cache", {}).get("enabled", True)
+
+
+def _cache_entry_path(file_hash: str, config: Dict) -> Path:
+    """Path of the cache entry for a file hash under the current fingerprint."""
+    fingerprint = get_classification_fingerprint(config)
+    # Shard by hash prefix to keep directory listings small on GCS mounts
+    return get_classification_cache_dir(config) / file_hash[:2] / f"{file_hash}_{fingerprint}.json"
+
+
+def load_cached_classification(file_hash: str, config: Dict) -> Optional[Dict]:
+    """
+    Load a cached classification result.
+
+    Args:
+        file_hash: SHA256 of the PDF contents
+        config: Configuration dictionary
+
+    Returns:
+        Classification dict (same shape as classify_pdf()), or None on miss
+    """
+    if not file_hash:
+        return None
+
+    entry_path = _cache_entry_path(file_hash, config)
+
+    try:
+        data = json.loads(entry_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return None
+
+    result = data.get("result")
+    if not isinstance(result, dict) or "type" not in result:
+        return None
+
+    return result
+
+
+def store_cached_classification(file_hash: str, config: Dict, result: Dict) -> None:
+    """
+    Store a classification result in the cache.
+
+    Uses atomic rename so concurrent inventory workers never see partial entries.
+    Cache write failures are non-fatal (classification just runs again next
+    time); the first one in a process is printed as a warning.
+
+    Args:
+        file_hash: SHA256 of the PDF contents
+        config: Configuration dictionary
+        result: Classification dict from classify_pdf()
+    """
+    if not file_hash:
+        return
+
+    entry_path = _cache_entry_path(file_hash, config)
+
+    try:
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        entry = {
+            "file_hash": file_hash,
+            "fingerprint": get_classification_fingerprint(config),
+            "result": result
+        }
+
+        # Atomic write (PID suffix avoids collisions between pool workers)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        os.replace(tmp_path, entry_path)
+
+    except Exception as e:
+        global _write_failure_reported
+        if not _write_failure_reported:
+            _write_failure_reported = True
+            print(f"   ⚠️  Classification cache write failed ({entry_path.parent}): {e} "
+                  f"- continuing without caching (further failures not reported)")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+utils_concurrency.py - Adaptive concurrency for digital PDF workers
+
+digital_pdf_workers is a static number that needs re-tuning per machine
+(GPU box vs CPU box) and per corpus (2-page letters vs 200-page exhibits);
+see WORKER_COUNT_ANALYSIS.md. The controller here replaces it with a limit
+that moves at runtime:
+
+- Starts conservative (initial_workers) and hill-climbs: +1 worker while
+  pages/sec keeps improving and CPU has headroom, -1 when throughput drops
+  after an increase or CPU is saturated
+- Backs off immediately under memory pressure (low available RAM or pipeline
+  RSS near the ceiling)
+- Hard memory ceiling: a file only starts if current RSS plus its estimated
+  footprint (pages x mb_per_page) fits; a file that is too big on its own
+  waits until it can run alone
+
+The executor is sized to max_workers; the controller gates how many files
+are in flight. Enabled with processors.adaptive_concurrency.enabled.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import psutil
+
+
+class AdaptiveConcurrencyController:
+    """
+    Gate concurrent work items by an adaptive limit and a memory ceiling.
+
+    Usage:
+        controller.acquire(pages)   # blocks until the file may start
+        ...process file...
+        controller.release(pages)
+    """
+
+    def __init__(
+        self,
+        min_workers: int = 1,
+        max_workers: int = 8,
+        initial_workers: int = 2,
+        memory_ceiling_mb: Optional[float] = None,
+        min_available_mb: float = 2048,
+        mb_per_page: float = 25,
+        cpu_target_percent: float = 85,
+        adjust_interval_seconds: float = 15
+    ):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = min(max(initial_workers, self.min_workers), self.max_workers)
+
+        total_mb = psutil.virtual_memory().total / (1024 * 1024)
+        self.memory_ceiling_mb = memory_ceiling_mb or total_mb * 0.85
+        self.min_available_mb = min_available_mb
+        self.mb_per_page = mb_per_page
+        self.cpu_target_percent = cpu_target_percent
+        self.adjust_interval_seconds = adjust_interval_seconds
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._reserved_mb = 0.0
+
+        # Throughput window for hill climbing
+        self._window_start = time.time()
+        self._window_pages = 0
+        self._last_throughput: Optional[float] = None
+        self._last_change = 0  # +1 / -1 / 0: direction of the previous adjustment
+        self._limit_hit = False  # Some file had to wait for the limit this window
+
+        self._process = psutil.Process()
+        psutil.cpu_percent(interval=None)  # Prime the CPU sampler
+
+    # -- Resource sampling ---------------------------------------------------
+
+    def _pipeline_rss_mb(self) -> float:
+        """RSS of this process plus its children (process-pool workers, OlmOCR)."""
+        rss = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+
+    def _estimate_mb(self, pages: Optional[int]) -> float:
+        return max(pages or 1, 1) * self.mb_per_page
+
+    # -- Gate ----------------------------------------------------------------
+
+    def acquire(self, pages: Optional[int] = None) -> None:
+        """
+        Block until a file with this many pages may start.
+
+        Args:
+            pages: Page count of the file (None if unknown; counted as 1)
+        """
+        estimate = self._estimate_mb(pages)
+
+        with self._cond:
+            while True:
+                if self._active == 0:
+                    break  # Always let one file run, however large
+                if self._active >= self.limit:
+                    self._limit_hit = True
+                else:
+                    # Running files' reservations count on top of RSS: conservative,
+                    # since a just-started file has not grown its RSS yet
+                    projected = self._pipeline_rss_mb() + self._reserved_mb + estimate
+                    if projected <= self.memory_ceiling_mb:
+                        break
+                self._cond.wait(timeout=1.0)
+
+            self._active += 1
+            self._reserved_mb += estimate
+
+    def release(self, pages: Optional[int] = None) -> None:
+        """
+        Mark a file as finished and record its pages for throughput.
+
+        Args:
+            pages: Page count passed to acquire()
+        """
+        with self._cond:
+            self._active -= 1
+            self._reserved_mb = max(0.0, self._reserved_mb - self._estimate_mb(pages))
+            self._window_pages += max(pages or 1, 1)
+
+            if time.time() - self._window_start >= self.adjust_interval_seconds:
+                self._adjust()
+
+            self._cond.notify_all()
+
+    # -- Control loop --------------------------------------------------------
+
+    def _adjust(self) -> None:
+        """Move the limit one step based on the last window (called with the lock held)."""
+        now = time.time()
+        throughput = self._window_pages / max(now - self._window_start, 1e-6)
+        cpu = psutil.cpu_percent(interval=None)
+        available_mb = psutil.virtual_memory().available / (1024 * 1024)
+        rss_mb = self._pipeline_rss_mb()
+
+        old_limit = self.limit
+        memory_pressure = (
+            available_mb < self.min_available_mb
+            or rss_mb > self.memory_ceiling_mb * 0.9
+        )
+
+        if memory_pressure:
+            self.limit = max(self.min_workers, self.limit - 1)
+            reason = f"memory pressure ({available_mb:.0f} MB free, RSS {rss_mb:.0f} MB)"
+        elif cpu > self.cpu_target_percent:
+            self.limit = max(self.min_workers, self.limit - 1)
+            reason = f"CPU saturated ({cpu:.0f}%)"
+        elif self._last_throughput is not None and throughput < self._last_throughput * 0.95 and self._last_change > 0:
+            # The last step up made things worse: step back
+            self.limit = max(self.min_workers, self.limit - 1)
+            reason = f"throughput fell to {throughput:.2f} pages/s"
+        elif self._limit_hit:
+            # Work is queuing, CPU has headroom, throughput holding: probe one more
+            self.limit = min(self.max_workers, self.limit + 1)
+            reason = f"CPU {cpu:.0f}%, {throughput:.2f} pages/s"
+        else:
+            reason = None
+
+        self._last_change = (self.limit > old_limit) - (self.limit < old_limit)
+        if self.limit != old_limit:
+            print(f"   🎚️  Workers {old_limit} → {self.limit}: {reason}")
+
+        self._last_throughput = throughput
+        self._window_start = now
+        self._window_pages = 0
+        self._limit_hit = False
+
+    def stats(self) -> Dict:
+        """Current limit and load (for progress output)."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "reserved_mb": round(self._reserved_mb),
+                "memory_ceiling_mb": round(self.memory_ceiling_mb)
+            }
+
+
+def create_concurrency_controller(config: Dict, max_workers: int) -> Optional[AdaptiveConcurrencyController]:
+    """
+    Create the digital PDF concurrency controller from config.
+
+    Args:
+        config: Configuration dictionary (processors.adaptive_concurrency)
+        max_workers: Upper bound (the executor size, digital_pdf_workers)
+
+    Returns:
+        AdaptiveConcurrencyController, or None if disabled
+    """
+    adaptive_config = config.get("processors", {}).get("adaptive_concurrency", {})
+    if not adaptive_config.get("enabled", False):
+        return None
+
+    controller = AdaptiveConcurrencyController(
+        min_workers=adaptive_config.get("min_workers", 1),
+        max_workers=adaptive_config.get("max_workers") or max_workers,
+        initial_workers=adaptive_config.get("initial_workers", 2),
+        memory_ceiling_mb=adaptive_config.get("memory_ceiling_mb"),
+        min_available_mb=adaptive_config.get("min_available_mb", 2048),
+        mb_per_page=adaptive_config.get("mb_per_page", 25),
+        cpu_target_percent=adaptive_config.get("cpu_target_percent", 85),
+        adjust_interval_seconds=adaptive_config.get("adjust_interval_seconds", 15)
+    )
+
+    print(f"   🎚️  Adaptive concurrency: start {controller.limit}, "
+          f"range {controller.min_workers}-{controller.max_workers}, "
+          f"memory ceiling {controller.memory_ceiling_mb:,.0f} MB")
+
+    return controller
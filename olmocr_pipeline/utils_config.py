@@ -10,6 +10,10 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any
 
+# Process pool start method (processors.process_pool.start_method). Not "fork":
+# forking a parent that already runs torch/OpenMP threads can deadlock workers.
+DEFAULT_START_METHOD = "forkserver"
+
 
 def load_config(config_path: Path | str = None) -> Dict[str, Any]:
     """
@@ -24,6 +28,7 @@ def load_config(config_path: Path | str = None) -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If config file doesn't exist
         yaml.YAMLError: If config is invalid YAML
+        ValueError: If processors.process_pool is invalid
     """
     if config_path is None:
         # Default to config/default.yaml relative to project root
@@ -48,9 +53,36 @@ def load_config(config_path: Path | str = None) -> Dict[str, Any]:
         config["metadata"] = {}
     config["metadata"]["config_hash"] = config_hash[:16]  # First 16 chars for brevity
 
+    validate_process_pool(config)
+
     return config
 
 
+def validate_process_pool(config: Dict) -> None:
+    """
+    Check processors.process_pool before any pool is created.
+
+    Args:
+        config: Configuration dictionary
+
+    Raises:
+        ValueError: If start_method is unknown, or max_tasks_per_child is
+            set with start_method "fork" (ProcessPoolExecutor refuses it)
+    """
+    pool_config = (config.get("processors") or {}).get("process_pool") or {}
+    start_method = pool_config.get("start_method", DEFAULT_START_METHOD)
+
+    if start_method not in ("fork", "forkserver", "spawn"):
+        raise ValueError(
+            f"processors.process_pool.start_method must be fork, forkserver or spawn, got {start_method!r}"
+        )
+    if start_method == "fork" and pool_config.get("max_tasks_per_child"):
+        raise ValueError(
+            "processors.process_pool.max_tasks_per_child cannot be used with start_method 'fork'; "
+            "use 'forkserver' or 'spawn'"
+        )
+
+
 def get_config_version(config: Dict) -> str:
     """
     Extract config version for logging.
@@ -147,6 +179,7 @@ def get_storage_paths(config: Dict) -> Dict[str, Path]:
         "manifest_dir": base / storage.get("manifest_dir", "manifests"),
         "inventory_dir": base / storage.get("inventory_dir", "inventory"),
         "quarantine_dir": base / storage.get("quarantine_dir", "quarantine"),
+        "state_dir": base / storage.get("state_dir", "state"),
         "lock_file": base / storage.get("lock_file", ".process_documents.lock")
     }
 
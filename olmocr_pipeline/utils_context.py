@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+utils_context.py - Per-document context shared across handlers
+
+Facts about an input file (content hash, doc_id, size, MIME type, page count,
+classification) are computed once in utils_processor and passed into the
+handlers and chunkers, so no handler reopens, re-stats or re-hashes the input.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils_classify import compute_file_hash, get_mime_type
+
+
+def build_document_context(
+    file_path: Path,
+    config: Dict,
+    file_hash: Optional[str] = None,
+    classification: Optional[Dict] = None,
+    size_bytes: Optional[int] = None
+) -> Dict:
+    """
+    Build the document context for one input file.
+
+    Args:
+        file_path: Path to input file
+        config: Configuration dictionary
+        file_hash: Precomputed SHA256 (computed if None)
+        classification: classify_pdf() result (PDFs only)
+        size_bytes: Precomputed file size (stat'd if None)
+
+    Returns:
+        Context dictionary:
+        {
+            "file_path": Path,
+            "file_name": str,
+            "resolved_path": str,      # Absolute path recorded in chunk "source"
+            "file_type": str,          # Extension without dot (e.g. "pdf")
+            "mime_type": str,
+            "size_bytes": int,
+            "hash_sha256": str,
+            "doc_id": str,             # First 16 chars of hash
+            "page_count": int | None,  # From classification (PDFs), else None
+            "classification": dict | None
+        }
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    file_path = Path(file_path)
+
+    if file_hash is None:
+        file_hash = compute_file_hash(file_path)
+
+    if size_bytes is None:
+        size_bytes = file_path.stat().st_size
+
+    page_count = None
+    if classification is not None:
+        page_count = classification.get("total_pages")
+
+    return {
+        "file_path": file_path,
+        "file_name": file_path.name,
+        "resolved_path": str(file_path.resolve()),
+        "file_type": file_path.suffix.lower().lstrip('.'),
+        "mime_type": get_mime_type(file_path),
+        "size_bytes": size_bytes,
+        "hash_sha256": file_hash,
+        "doc_id": file_hash[:16],
+        "page_count": page_count,
+        "classification": classification
+    }
+
+
+def get_or_build_context(
+    context: Optional[Dict],
+    file_path: Path,
+    config: Dict
+) -> Dict:
+    """
+    Return the given context, or build one for direct handler calls.
+
+    Handlers call this so they still work when invoked without a context
+    (scripts, tests); hashing is memoized, so the fallback is cheap.
+
+    Args:
+        context: Context from build_document_context(), or None
+        file_path: Path to input file
+        config: Configuration dictionary
+
+    Returns:
+        Context dictionary
+    """
+    if context is not None:
+        return context
+    return build_document_context(file_path, config)
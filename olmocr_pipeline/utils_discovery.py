@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+utils_discovery.py - Parallel scandir-based file discovery
+
+On gcsfuse every directory listing and stat() is a network round-trip.
+Path.rglob() + is_file() + stat() pays for each of them serially.
+
+This module:
+- Walks directories concurrently with os.scandir()
+- Filters by extension before any stat (is_file()/is_dir() use readdir's d_type)
+- Stats candidate files in parallel chunks, once, and carries size/mtime along
+- Yields files as a stream, so classification can start before the listing finishes
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set
+
+from utils_classify import SUPPORTED_EXTENSIONS
+
+
+# Candidate files per stat task (keeps huge flat directories parallel)
+_STAT_CHUNK_SIZE = 256
+
+
+class DiscoveredFile(NamedTuple):
+    """A discovered file with the stat fields the pipeline needs."""
+    path: Path
+    size_bytes: int
+    mtime_ns: int
+
+
+def _scan_directory(dir_path: str, extensions: Set[str]):
+    """
+    List one directory without stat'ing files.
+
+    Returns:
+        Tuple of (candidate_file_paths, subdirectory_paths)
+    """
+    candidates = []
+    subdirs = []
+
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                        candidates.append(entry.path)
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"   ⚠️  Could not list {dir_path}: {e}")
+
+    return candidates, subdirs
+
+
+def _stat_files(file_paths: List[str]) -> List[DiscoveredFile]:
+    """Stat a chunk of files (files that vanished meanwhile are skipped)."""
+    discovered = []
+    for file_path in file_paths:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        discovered.append(DiscoveredFile(Path(file_path), st.st_size, st.st_mtime_ns))
+    return discovered
+
+
+def iter_discovered_files(
+    input_dir: Path,
+    extensions: Optional[Set[str]] = None,
+    max_workers: int = 16
+) -> Iterator[DiscoveredFile]:
+    """
+    Recursively discover supported files, yielding them as they are found.
+
+    Order is not deterministic; sort the results if order matters.
+
+    Args:
+        input_dir: Directory to search
+        extensions: Lowercase extensions to keep, with dot (default: SUPPORTED_EXTENSIONS)
+        max_workers: Concurrent directory listings / stat chunks
+
+    Yields:
+        DiscoveredFile(path, size_bytes, mtime_ns) with absolute paths
+
+    Raises:
+        FileNotFoundError: If input_dir doesn't exist
+        NotADirectoryError: If input_dir is not a directory
+    """
+    if not input_dir.exists():
+        raise FileNotFoundError(f"Input directory not found: {input_dir}")
+
+    if not input_dir.is_dir():
+        raise NotADirectoryError(f"Not a directory: {input_dir}")
+
+    extensions = extensions or SUPPORTED_EXTENSIONS
+    root = str(input_dir.resolve())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scans = {executor.submit(_scan_directory, root, extensions)}
+        stats = set()
+
+        while scans or stats:
+            done, _ = wait(scans | stats, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future in scans:
+                    scans.discard(future)
+                    candidates, subdirs = future.result()
+
+                    for subdir in subdirs:
+                        scans.add(executor.submit(_scan_directory, subdir, extensions))
+
+                    for i in range(0, len(candidates), _STAT_CHUNK_SIZE):
+                        stats.add(executor.submit(_stat_files, candidates[i:i + _STAT_CHUNK_SIZE]))
+                else:
+                    stats.discard(future)
+                    yield from future.result()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+utils_hash.py - File hashing with a stat-keyed persistent cache
+
+Content hashes (SHA256) are used for deduplication, doc_ids, success markers
+and the classification cache. Input files live on a gcsfuse mount, so re-reading
+a multi-hundred-MB scan just to re-derive its hash is expensive.
+
+This module:
+- Reads files with large buffers (or mmap) instead of 8 KB chunks
+- Hashes many files in parallel (hashlib releases the GIL on large updates)
+- Persists digests in a local SQLite cache keyed by (path, size, mtime, inode),
+  so unchanged files are never re-read across runs
+- Memoizes digests in-process, so repeated calls within a run are free
+
+The cache lives on local disk by default (SQLite locking is unreliable on gcsfuse).
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+DEFAULT_HASH_CACHE_PATH = Path.home() / ".cache" / "olmocr_pipeline" / "file_hashes.sqlite"
+
+# Module-level settings (updated by configure_hashing())
+_settings = {
+    "cache_enabled": True,
+    "cache_path": DEFAULT_HASH_CACHE_PATH,
+    "read_buffer_bytes": 8 * 1024 * 1024,
+    "use_mmap": False,
+    "parallel_workers": 8,
+}
+
+# In-process memo: (abs_path, size, mtime_ns, inode, algorithm) → hex digest
+_memo: Dict[Tuple, str] = {}
+_memo_lock = threading.Lock()
+
+# One SQLite connection per process (connections must not cross fork())
+_db = {"pid": None, "conn": None}
+_db_lock = threading.Lock()
+
+
+def configure_hashing(config: Dict) -> None:
+    """
+    Apply the `hashing` config section.
+
+    Safe to call repeatedly; the persistent cache is reopened if its path changes.
+
+    Args:
+        config: Configuration dictionary
+    """
+    hashing_config = config.get("hashing", {})
+    cache_config = hashing_config.get("cache", {})
+
+    cache_path = Path(cache_config["path"]).expanduser() if cache_config.get("path") else DEFAULT_HASH_CACHE_PATH
+
+    with _db_lock:
+        if cache_path != _settings["cache_path"] and _db["conn"] is not None:
+            _close_db()
+
+        _settings.update({
+            "cache_enabled": cache_config.get("enabled", True),
+            "cache_path": cache_path,
+            "read_buffer_bytes": int(hashing_config.get("read_buffer_mb", 8) * 1024 * 1024),
+            "use_mmap": hashing_config.get("use_mmap", False),
+            "parallel_workers": hashing_config.get("parallel_workers", 8),
+        })
+
+
+def _close_db() -> None:
+    """Close this process's cache connection (caller holds _db_lock)."""
+    try:
+        if _db["conn"] is not None and _db["pid"] == os.getpid():
+            _db["conn"].close()
+    except sqlite3.Error:
+        pass
+    _db["pid"] = None
+    _db["conn"] = None
+
+
+def _get_db() -> Optional[sqlite3.Connection]:
+    """
+    Get this process's connection to the persistent hash cache (caller holds _db_lock).
+
+    Returns:
+        SQLite connection, or None if the cache is disabled or unavailable
+    """
+    if not _settings["cache_enabled"]:
+        return None
+
+    if _db["conn"] is not None and _db["pid"] == os.getpid():
+        return _db["conn"]
+
+    try:
+        cache_path = _settings["cache_path"]
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(str(cache_path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                hashed_at REAL NOT NULL,
+                PRIMARY KEY (path, algorithm)
+            )
+            """
+        )
+        conn.commit()
+
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️  Hash cache unavailable ({e}), hashing without persistence")
+        _settings["cache_enabled"] = False
+        return None
+
+    _db["pid"] = os.getpid()
+    _db["conn"] = conn
+    return conn
+
+
+def _stat_key(file_path: Path, algorithm: str) -> Tuple[Tuple, os.stat_result]:
+    """
+    Stat a file once and build its cache key.
+
+    Uses os.path.abspath (no syscalls) rather than Path.resolve(), which would
+    stat every path component on the GCS mount.
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns, st.st_ino, algorithm)
+    return key, st
+
+
+def _lookup_persistent(key: Tuple) -> Optional[str]:
+    """Look up a digest in the persistent cache; None on miss or stale entry."""
+    path, size, mtime_ns, inode, algorithm = key
+
+    with _db_lock:
+        conn = _get_db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, digest FROM file_hashes WHERE path = ? AND algorithm = ?",
+                (path, algorithm)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+    if row is None or tuple(row[:3]) != (size, mtime_ns, inode):
+        return None
+
+    return row[3]
+
+
+def _store_persistent(key: Tuple, digest: str) -> None:
+    """Store a digest in the persistent cache (failures are non-fatal)."""
+    path, size, mtime_ns, inode, algorithm = key
+
+    with _db_lock:
+        conn = _get_db()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO file_hashes "
+                "(path, algorithm, size, mtime_ns, inode, digest, hashed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, algorithm, size, mtime_ns, inode, digest, time.time())
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _hash_contents(file_path: Path, algorithm: str, size: int) -> str:
+    """
+    Hash file contents with large reads (or mmap when enabled).
+
+    Args:
+        file_path: Path to file
+        algorithm: hashlib algorithm name
+        size: File size from stat (0-byte files cannot be mmapped)
+
+    Returns:
+        Hex digest
+    """
+    hash_obj = hashlib.new(algorithm)
+
+    with open(file_path, "rb", buffering=0) as f:
+        if _settings["use_mmap"] and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hash_obj.update(mm)
+        else:
+            buffer = bytearray(min(_settings["read_buffer_bytes"], max(size, 1)))
+            view = memoryview(buffer)
+            while n := f.readinto(buffer):
+                hash_obj.update(view[:n])
+
+    return hash_obj.hexdigest()
+
+
+def compute_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
+    """
+    Compute hash of a file, reusing cached digests for unchanged files.
+
+    A digest is reused only if the file's path, size, mtime and inode all match
+    the cached entry; any modification forces a re-read.
+
+    Args:
+        file_path: Path to file
+        algorithm: Hash algorithm (default: sha256)
+
+    Returns:
+        Hex digest of file hash
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    key, st = _stat_key(file_path, algorithm)
+
+    with _memo_lock:
+        digest = _memo.get(key)
+    if digest is not None:
+        return digest
+
+    digest = _lookup_persistent(key)
+
+    if digest is None:
+        digest = _hash_contents(file_path, algorithm, st.st_size)
+        _store_persistent(key, digest)
+
+    with _memo_lock:
+        _memo[key] = digest
+
+    return digest
+
+
+def hash_files(
+    file_paths: Iterable[Path],
+    algorithm: str = "sha256",
+    max_workers: Optional[int] = None
+) -> Dict[Path, Optional[str]]:
+    """
+    Hash many files in parallel.
+
+    Threads are enough here: reads are I/O bound on the GCS mount and hashlib
+    releases the GIL while digesting large buffers.
+
+    Args:
+        file_paths: Files to hash
+        algorithm: Hash algorithm (default: sha256)
+        max_workers: Thread count (default: hashing.parallel_workers)
+
+    Returns:
+        Dict mapping each path to its hex digest (None if it could not be read)
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return {}
+
+    workers = max(1, min(max_workers or _settings["parallel_workers"], len(file_paths)))
+
+    def _safe_hash(path: Path) -> Optional[str]:
+        try:
+            return compute_file_hash(path, algorithm)
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = list(executor.map(_safe_hash, file_paths))
+
+    return dict(zip(file_paths, digests))
+
+
+def clear_hash_memo() -> None:
+    """Drop the in-process memo (the persistent cache is kept)."""
+    with _memo_lock:
+        _memo.clear()
@@ -43,6 +43,11 @@ def write_manifest_csv(
         - warnings: Comma-separated warnings
         - error: Error message (if failed)
         - confidence_score: Processing confidence (0.0-1.0)
+        - ocr_batch_id: OlmOCR batch the file was OCR'd in (OCR files only)
+        - ocr_pages_per_sec: OlmOCR throughput of the file's OCR batch (OCR files only)
+        - ocr_batch_seconds: OlmOCR wall time of the file's OCR batch, including retries
+        - ocr_page_retries: Failed page attempts OlmOCR retried for this file
+        - ocr_failed_pages: Pages OlmOCR gave up on (fallback text) for this file
     """
     # Ensure parent directory exists
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
@@ -65,7 +70,12 @@ def write_manifest_csv(
         "processed_at",
         "warnings",
         "error",
-        "confidence_score"
+        "confidence_score",
+        "ocr_batch_id",
+        "ocr_pages_per_sec",
+        "ocr_batch_seconds",
+        "ocr_page_retries",
+        "ocr_failed_pages"
     ]
 
     # Write CSV
@@ -106,7 +116,13 @@ def write_manifest_csv(
                 "processed_at": record.get("processed_at", datetime.utcnow().isoformat() + "Z"),
                 "warnings": warnings_str,
                 "error": record.get("error", ""),
-                "confidence_score": record.get("confidence_score", 1.0)
+                "confidence_score": record.get("confidence_score", 1.0),
+                # Empty string for files that did not go through an OCR batch
+                "ocr_batch_id": record.get("ocr_batch_id", ""),
+                "ocr_pages_per_sec": record.get("ocr_pages_per_sec", ""),
+                "ocr_batch_seconds": record.get("ocr_batch_seconds", ""),
+                "ocr_page_retries": record.get("ocr_page_retries", ""),
+                "ocr_failed_pages": record.get("ocr_failed_pages", "")
             }
 
             writer.writerow(row)
@@ -114,7 +130,8 @@ def write_manifest_csv(
 
 def write_success_marker(
     output_path: Path,
-    metadata: Dict
+    metadata: Dict,
+    ledger=None
 ) -> None:
     """
     Write _SUCCESS marker file with processing metadata.
@@ -122,6 +139,8 @@ def write_success_marker(
     Args:
         output_path: Path to output file (marker will be named {output_path}_SUCCESS)
         metadata: Metadata dictionary to include in marker
+        ledger: Optional utils_state.ProcessedLedger; the success is recorded
+                there first (source of truth), the marker is a secondary artifact
 
     Marker format (JSON):
     {
@@ -141,6 +160,13 @@ def write_success_marker(
         **metadata
     }
 
+    if ledger is not None and metadata.get("file_hash"):
+        ledger.record_success(metadata["file_hash"], {
+            "jsonl_path": marker_data["file_path"],
+            "processor": metadata.get("processor"),
+            "timestamp": marker_data["timestamp"]
+        })
+
     marker_path.write_text(json.dumps(marker_data, indent=2), encoding="utf-8")
 
 
@@ -208,7 +234,8 @@ def generate_batch_summary(
             "total_chunks": 0,
             "total_processing_time_ms": 0,
             "file_types": {},
-            "processors": {}
+            "processors": {},
+            "ocr": {}
         }
 
     # Compute statistics
@@ -233,6 +260,25 @@ def generate_batch_summary(
         if proc:
             processors[proc] = processors.get(proc, 0) + 1
 
+    # OCR throughput (batch wall time and rate are shared by the files of an OCR batch)
+    ocr_records = [r for r in records if r.get("ocr_batch_id")]
+    ocr = {}
+    if ocr_records:
+        ocr_batches = {r["ocr_batch_id"]: r for r in ocr_records}
+        ocr_seconds = sum(float(r["ocr_batch_seconds"] or 0) for r in ocr_batches.values())
+        ocr_pages = sum(
+            float(r["ocr_batch_seconds"] or 0) * float(r["ocr_pages_per_sec"] or 0)
+            for r in ocr_batches.values()
+        )
+        ocr = {
+            "files": len(ocr_records),
+            "batches": len(ocr_batches),
+            "seconds": round(ocr_seconds, 1),
+            "pages_per_sec": round(ocr_pages / ocr_seconds, 3) if ocr_seconds > 0 else 0.0,
+            "page_retries": sum(int(r["ocr_page_retries"] or 0) for r in ocr_records),
+            "failed_pages": sum(int(r["ocr_failed_pages"] or 0) for r in ocr_records)
+        }
+
     return {
         "total_files": total_files,
         "successful": successful,
@@ -242,7 +288,8 @@ def generate_batch_summary(
         "total_processing_time_ms": total_time,
         "avg_processing_time_ms": total_time // total_files if total_files > 0 else 0,
         "file_types": file_types,
-        "processors": processors
+        "processors": processors,
+        "ocr": ocr
     }
 
 
@@ -271,3 +318,10 @@ def print_batch_summary(summary: Dict) -> None:
         print(f"\n   Processors used:")
         for proc, count in sorted(summary['processors'].items()):
             print(f"      {proc}: {count}")
+
+    ocr = summary.get('ocr')
+    if ocr:
+        print(f"\n   OCR throughput:")
+        print(f"      {ocr['files']} file(s) in {ocr['batches']} batch(es), {ocr['seconds']:.1f}s")
+        print(f"      {ocr['pages_per_sec']:.2f} pages/s")
+        print(f"      Page retries: {ocr['page_retries']} | Failed pages: {ocr['failed_pages']}")
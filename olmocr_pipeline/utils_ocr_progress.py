@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+utils_ocr_progress.py - Structured progress from OlmOCR pipeline output
+
+olmocr.pipeline logs every page retry, a metrics table and a per-worker
+status table every 10 seconds. Echoing all of it floods the terminal on
+long runs, so run_olmocr_batch() writes the raw output to the batch log in
+full and feeds each line to OCRProgress, which:
+
+- Parses it into events (pages done, pages/sec, work queue and server queue
+  depth, documents completed/discarded, page retries and failed pages)
+- Prints one progress line per processors.olmocr.progress_interval_seconds;
+  ERROR lines are printed immediately and the last output lines are kept
+  for the failure report
+- Summarises the run (summary()) for the per-file OCR throughput columns
+  of the batch manifest (ocr_file_metrics)
+
+processors.olmocr.echo_output: true restores the full [olmocr] echo.
+"""
+
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# "2026-01-01 12:00:00,000 - olmocr.pipeline - INFO - message"
+_LOG_LINE = re.compile(r"^\S+ \S+ - (?P<logger>\S+) - (?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL) - (?P<msg>.*)$")
+
+# Messages (olmocr 0.4.x)
+_QUEUE = re.compile(r"^Queue remaining: (?P<groups>\d+)")
+_SERVER_QUEUE = re.compile(r"^vllm running req: (?P<running>\d+) queue req: (?P<queued>\d+)")
+_GROUP_DONE = re.compile(r"^Got (?P<docs>\d+) docs for (?P<group>\w+)")
+_PAGE_RETRY = re.compile(
+    r"^(?:try_single_page failed for|Server returned \d+ for|Connection error on|Rotation error for) "
+    r"(?P<path>.+?)-(?P<page>\d+)(?: attempt \d+|,)"
+)
+_PAGE_FAILED = re.compile(r"^Failed (?P<path>.+?)-(?P<page>\d+) after \d+")
+_DOC_DISCARDED = re.compile(r"^Document (?P<path>.+?) has \d+ fallback pages .* discarding document")
+_DOC_ERROR = re.compile(r"^Exception in process_single_pdf for (?P<path>.+?): ")
+
+# Metrics table row: "completed_pages      1.23      4.56" (lifetime and recent rate per second)
+_RATE_ROW = re.compile(r"^(?P<key>completed_pages|failed_pages)\s+(?P<lifetime>[\d.]+)\s+(?P<recent>[\d.]+)$")
+
+# Final summary
+_FINAL_COUNT = re.compile(r"^(?P<key>Completed pages|Failed pages): (?P<value>[\d,]+)$")
+_FINAL_ELAPSED = re.compile(r"^Total elapsed time: (?P<seconds>[\d.]+) seconds")
+
+
+class OCRProgress:
+    """
+    Progress tracker for one olmocr.pipeline run.
+
+    Args:
+        file_count: Number of files in the run
+        config: Configuration dictionary (processors.olmocr)
+    """
+
+    def __init__(self, file_count: int, config: Dict):
+        olmocr_config = config.get("processors", {}).get("olmocr", {})
+        self.file_count = file_count
+        self.interval = olmocr_config.get("progress_interval_seconds", 30)
+        self.echo = olmocr_config.get("echo_output", False)
+
+        self.start_time = time.time()
+        self._last_report = self.start_time
+        self._tail = deque(maxlen=20)
+
+        self.pages_completed = 0
+        self.pages_failed = 0
+        self.pages_per_sec = 0.0
+        self.recent_pages_per_sec = 0.0
+        self.page_retries = 0
+        self.documents_completed = 0
+        self.documents_discarded = 0
+        self.queue_groups: Optional[int] = None
+        self.server_queue: Optional[int] = None
+        self.elapsed_seconds: Optional[float] = None  # Set from the final summary
+        self.final = False
+        self.per_file: Dict[str, Dict[str, int]] = {}
+
+    def _file(self, path: str) -> Dict[str, int]:
+        return self.per_file.setdefault(path, {"page_retries": 0, "failed_pages": 0})
+
+    def _elapsed(self) -> float:
+        return self.elapsed_seconds if self.elapsed_seconds is not None else time.time() - self.start_time
+
+    def feed(self, line: str) -> Optional[Dict]:
+        """
+        Parse one output line and update the counters.
+
+        Args:
+            line: Output line (without trailing newline)
+
+        Returns:
+            Event dict ({"type": ..., ...}) if the line carried progress, else None
+        """
+        self._tail.append(line)
+        if self.echo:
+            print(f"   [olmocr] {line}")
+
+        match = _LOG_LINE.match(line)
+        if not match:
+            return self._feed_table_row(line)
+
+        level, msg = match.group("level"), match.group("msg")
+        if level in ("ERROR", "CRITICAL") and not self.echo:
+            print(f"   [olmocr] ❌ {msg}")
+
+        event = self._parse_message(msg)
+        self.maybe_report()
+        return event
+
+    def _feed_table_row(self, line: str) -> Optional[Dict]:
+        match = _RATE_ROW.match(line.strip())
+        if not match or self.final:
+            return None
+
+        lifetime, recent = float(match.group("lifetime")), float(match.group("recent"))
+        if match.group("key") == "completed_pages":
+            # The table only has rates; olmocr's clock starts with the process
+            self.pages_per_sec, self.recent_pages_per_sec = lifetime, recent
+            self.pages_completed = round(lifetime * self._elapsed())
+            return {"type": "throughput", "pages_per_sec": lifetime, "recent_pages_per_sec": recent}
+
+        self.pages_failed = round(lifetime * self._elapsed())
+        return None
+
+    def _parse_message(self, msg: str) -> Optional[Dict]:
+        match = _QUEUE.match(msg)
+        if match:
+            self.queue_groups = int(match.group("groups"))
+            return {"type": "queue", "groups": self.queue_groups}
+
+        match = _SERVER_QUEUE.match(msg)
+        if match:
+            self.server_queue = int(match.group("queued"))
+            return {"type": "server_queue", "running": int(match.group("running")), "queued": self.server_queue}
+
+        match = _GROUP_DONE.match(msg)
+        if match:
+            docs = int(match.group("docs"))
+            self.documents_completed += docs
+            return {"type": "documents_done", "count": docs, "group": match.group("group")}
+
+        match = _PAGE_RETRY.match(msg)
+        if match:
+            self.page_retries += 1
+            self._file(match.group("path"))["page_retries"] += 1
+            return {"type": "page_retry", "path": match.group("path"), "page": int(match.group("page"))}
+
+        match = _PAGE_FAILED.match(msg)
+        if match:
+            self._file(match.group("path"))["failed_pages"] += 1
+            return {"type": "page_failed", "path": match.group("path"), "page": int(match.group("page"))}
+
+        match = _DOC_DISCARDED.match(msg) or _DOC_ERROR.match(msg)
+        if match:
+            self.documents_discarded += 1
+            return {"type": "document_failed", "path": match.group("path")}
+
+        match = _FINAL_COUNT.match(msg)
+        if match:
+            self.final = True
+            value = int(match.group("value").replace(",", ""))
+            if match.group("key") == "Completed pages":
+                self.pages_completed = value
+            else:
+                self.pages_failed = value
+            return {"type": "final", match.group("key").lower().replace(" ", "_"): value}
+
+        match = _FINAL_ELAPSED.match(msg)
+        if match:
+            self.elapsed_seconds = float(match.group("seconds"))
+            return {"type": "final", "elapsed_seconds": self.elapsed_seconds}
+
+        return None
+
+    def maybe_report(self, force: bool = False) -> None:
+        """Print a progress line if progress_interval_seconds have passed (or force)."""
+        now = time.time()
+        if self.echo or (not force and now - self._last_report < self.interval):
+            return
+        self._last_report = now
+
+        if self.final:
+            elapsed = self._elapsed()
+            rate = self.pages_completed / elapsed if elapsed > 0 else 0.0
+            parts = [f"{self.pages_completed:,} pages ({rate:.2f}/s)"]
+        else:
+            parts = [f"~{self.pages_completed:,} pages ({self.pages_per_sec:.2f}/s, recent {self.recent_pages_per_sec:.2f}/s)"]
+        parts.append(f"{self.documents_completed}/{self.file_count} docs")
+        if self.queue_groups is not None:
+            parts.append(f"queue {self.queue_groups} group(s)")
+        if self.server_queue is not None:
+            parts.append(f"server queue {self.server_queue}")
+        if self.page_retries:
+            parts.append(f"{self.page_retries} page retries")
+        if self.pages_failed:
+            parts.append(f"{self.pages_failed} failed pages")
+        if self.documents_discarded:
+            parts.append(f"{self.documents_discarded} docs discarded")
+
+        print(f"   [olmocr] 📈 {' | '.join(parts)} [{self._elapsed():.0f}s]")
+
+    def tail(self) -> List[str]:
+        """Last output lines (for failure reports)."""
+        return list(self._tail)
+
+    def summary(self) -> Dict:
+        """
+        Throughput metrics for the run.
+
+        Returns:
+            Dict with files, elapsed_seconds, pages_completed, pages_failed,
+            pages_per_sec, page_retries, documents_completed,
+            documents_discarded and per_file ({path: {page_retries, failed_pages}})
+        """
+        elapsed = self._elapsed()
+        return {
+            "files": self.file_count,
+            "elapsed_seconds": round(elapsed, 1),
+            "pages_completed": self.pages_completed,
+            "pages_failed": self.pages_failed,
+            "pages_per_sec": round(self.pages_completed / elapsed, 3) if elapsed > 0 else 0.0,
+            "page_retries": self.page_retries,
+            "documents_completed": self.documents_completed,
+            "documents_discarded": self.documents_discarded,
+            "per_file": {path: dict(counts) for path, counts in self.per_file.items()},
+        }
+
+
+def merge_ocr_metrics(summaries: List[Dict]) -> Dict:
+    """
+    Combine OCRProgress summaries of several runs (e.g. a batch and its salvage retries).
+
+    Args:
+        summaries: Results of OCRProgress.summary()
+
+    Returns:
+        Summary in the same format, with counts and time summed
+    """
+    merged = {
+        "files": summaries[0]["files"] if summaries else 0,
+        "elapsed_seconds": 0.0,
+        "pages_completed": 0,
+        "pages_failed": 0,
+        "page_retries": 0,
+        "documents_completed": 0,
+        "documents_discarded": 0,
+        "per_file": {},
+    }
+    for summary in summaries:
+        for key in ("elapsed_seconds", "pages_completed", "pages_failed", "page_retries",
+                    "documents_completed", "documents_discarded"):
+            merged[key] += summary.get(key, 0)
+        for path, counts in summary.get("per_file", {}).items():
+            target = merged["per_file"].setdefault(path, {"page_retries": 0, "failed_pages": 0})
+            for key, value in counts.items():
+                target[key] = target.get(key, 0) + value
+
+    elapsed = merged["elapsed_seconds"]
+    merged["elapsed_seconds"] = round(elapsed, 1)
+    merged["pages_per_sec"] = round(merged["pages_completed"] / elapsed, 3) if elapsed > 0 else 0.0
+    return merged
+
+
+def ocr_file_metrics(metrics: Optional[Dict], path: Path) -> Dict:
+    """
+    Manifest fields for one file of an OCR batch.
+
+    Batch throughput (pages/sec, OCR wall time) is shared by every file of
+    the batch; retries and failed pages are the file's own.
+
+    Args:
+        metrics: Batch summary (OCRProgress.summary / merge_ocr_metrics), or None
+        path: Input file path as passed to OlmOCR
+
+    Returns:
+        Dict with ocr_batch_id, ocr_pages_per_sec, ocr_batch_seconds,
+        ocr_page_retries, ocr_failed_pages (empty if metrics is None)
+    """
+    if not metrics:
+        return {}
+
+    counts = metrics.get("per_file", {}).get(str(Path(path).resolve()), {})
+    return {
+        "ocr_batch_id": metrics.get("ocr_batch_id", ""),
+        "ocr_pages_per_sec": metrics.get("pages_per_sec", 0.0),
+        "ocr_batch_seconds": metrics.get("elapsed_seconds", 0.0),
+        "ocr_page_retries": counts.get("page_retries", 0),
+        "ocr_failed_pages": counts.get("failed_pages", 0),
+    }
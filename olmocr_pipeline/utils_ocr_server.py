@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+utils_ocr_server.py - Long-lived OlmOCR inference server
+
+By default every run_olmocr_batch() call launches `python -m olmocr.pipeline`,
+which starts its own vLLM server, loads the 7B model and tears it all down
+again: a large run pays that startup once per batch.
+
+With processors.olmocr.backend: "server" the model stays resident instead:
+
+- An OpenAI-compatible endpoint is started once per pipeline process
+  (`vllm serve`, same flags OlmOCR uses internally) and stopped at exit,
+  or an existing endpoint is used (processors.olmocr.server.url)
+- Each batch still runs olmocr.pipeline (rendering, work queue, retries,
+  output format are unchanged) but with --server, so it only streams page
+  requests to the warm model
+- In watch mode the server survives across polls
+
+Any OpenAI-compatible server works as the endpoint, so a local stub can
+stand in for tests.
+"""
+
+import atexit
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional
+
+
+_server: Optional["OCRServer"] = None
+_server_lock = threading.Lock()
+
+
+def get_ocr_backend(config: Dict) -> str:
+    """
+    Get the configured OlmOCR backend.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        "subprocess" (olmocr.pipeline starts its own vLLM per batch) or
+        "server" (batches share a long-lived inference server)
+
+    Raises:
+        ValueError: If processors.olmocr.backend is not recognised
+    """
+    backend = config.get("processors", {}).get("olmocr", {}).get("backend", "subprocess")
+    if backend not in ("subprocess", "server"):
+        raise ValueError(f"Unknown processors.olmocr.backend: {backend!r} (expected 'subprocess' or 'server')")
+    return backend
+
+
+class OCRServer:
+    """
+    An OpenAI-compatible OlmOCR endpoint, started locally if needed.
+
+    Args:
+        config: Configuration dictionary (processors.olmocr, processors.olmocr.server)
+    """
+
+    def __init__(self, config: Dict):
+        olmocr_config = config.get("processors", {}).get("olmocr", {})
+        server_config = olmocr_config.get("server", {})
+
+        self.model_id = olmocr_config.get("model_id", "allenai/olmOCR-2-7B-1025-FP8")
+        self.gpu_util = olmocr_config.get("gpu_memory_utilization", 0.8)
+        self.external_url = server_config.get("url")
+        self.port = server_config.get("port", 30024)
+        self.served_model_name = server_config.get("served_model_name", "olmocr")
+        self.max_model_len = server_config.get("max_model_len", 16384)
+        self.api_key = server_config.get("api_key")
+        self.startup_timeout = server_config.get("startup_timeout_seconds", 600)
+
+        log_dir = server_config.get("log_dir")
+        self.log_path = (
+            Path(log_dir).expanduser() if log_dir
+            else Path.home() / ".cache" / "olmocr_pipeline" / "logs"
+        ) / "ocr_server.log"
+
+        self._proc: Optional[subprocess.Popen] = None
+        self._log_file = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the endpoint (ending in /v1)."""
+        return (self.external_url or f"http://localhost:{self.port}/v1").rstrip("/")
+
+    def is_ready(self) -> bool:
+        """True if the endpoint answers GET /models."""
+        request = urllib.request.Request(f"{self.url}/models")
+        if self.api_key:
+            request.add_header("Authorization", f"Bearer {self.api_key}")
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def ensure_running(self) -> str:
+        """
+        Make sure the endpoint is up, starting a local server if needed.
+
+        Returns:
+            Base URL of the endpoint
+
+        Raises:
+            RuntimeError: If the server exits or does not become ready in time
+        """
+        if self._proc is not None and self._proc.poll() is not None:
+            print(f"   ⚠️  OCR server exited with code {self._proc.returncode}; restarting (log: {self.log_path})")
+            self._proc = None
+
+        if self.is_ready():
+            return self.url
+
+        if self.external_url:
+            # Not ours to start: wait for it (it may be warming up)
+            self._wait_ready()
+            return self.url
+
+        if self._proc is None:
+            self._start()
+        self._wait_ready()
+        return self.url
+
+    def _start(self) -> None:
+        command = [
+            sys.executable, "-m", "vllm.entrypoints.openai.api_server",
+            "--model", self.model_id,
+            "--served-model-name", self.served_model_name,
+            "--port", str(self.port),
+            "--gpu-memory-utilization", str(self.gpu_util),
+            "--max-model-len", str(self.max_model_len),
+            "--limit-mm-per-prompt", json.dumps({"video": 0}),
+            "--disable-log-requests",
+            "--uvicorn-log-level", "warning",
+        ]
+
+        # Local log: the server runs for hours and appends continuously (not gcsfuse-friendly)
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_file = self.log_path.open("a", encoding="utf-8")
+
+        print(f"🚀 Starting OlmOCR inference server on port {self.port}...")
+        print(f"   Model: {self.model_id}")
+        print(f"   Log file: {self.log_path}")
+
+        self._proc = subprocess.Popen(command, stdout=self._log_file, stderr=subprocess.STDOUT)
+
+    def _wait_ready(self) -> None:
+        start = time.time()
+        while time.time() - start < self.startup_timeout:
+            if self._proc is not None and self._proc.poll() is not None:
+                raise RuntimeError(
+                    f"OCR server exited with code {self._proc.returncode} during startup (log: {self.log_path})"
+                )
+            if self.is_ready():
+                print(f"✅ OCR server ready at {self.url} ({time.time() - start:.0f}s)\n")
+                return
+            time.sleep(2)
+
+        raise RuntimeError(f"OCR server at {self.url} not ready after {self.startup_timeout}s")
+
+    def stop(self) -> None:
+        """Stop the server if this process started it."""
+        if self._proc is not None and self._proc.poll() is None:
+            print("🛑 Stopping OlmOCR inference server")
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        self._proc = None
+
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+
+def get_ocr_server(config: Dict) -> OCRServer:
+    """
+    Get the process-wide OCR server (created on first use, stopped at exit).
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        OCRServer (call ensure_running() before sending work)
+    """
+    global _server
+
+    with _server_lock:
+        if _server is None:
+            _server = OCRServer(config)
+            atexit.register(_server.stop)
+        return _server
@@ -10,7 +10,17 @@ import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Optional
+import bisect
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from utils_ocr_progress import OCRProgress
+
+
+# Parsed OlmOCR work indexes: resolved workspace -> ((mtime_ns, size), {path: group hash})
+_work_index_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_work_index_lock = threading.Lock()
 
 
 def get_olmocr_module() -> str:
@@ -42,20 +52,29 @@ def run_olmocr_batch(
     output_dir: Path,
     config: Dict,
     log_file: Path,
-    workers: Optional[int] = None
-) -> None:
+    workers: Optional[int] = None,
+    progress: Optional["OCRProgress"] = None
+) -> Dict:
     """
     Run OlmOCR CLI pipeline on batch of files (PDFs or images).
 
     Supports both PDF and image inputs (JPG, PNG, TIF).
     Produces HTML + Markdown outputs in output_dir.
 
+    The full output goes to log_file; the console gets throttled progress
+    lines parsed from it (see utils_ocr_progress).
+
     Args:
         file_paths: List of input file paths (PDFs or images)
         output_dir: Base output directory for OlmOCR staging
         config: Configuration dictionary
         log_file: Path to write log output
         workers: Number of parallel workers (default from config)
+        progress: Progress tracker to feed (created if None); still holds
+                  the partial metrics if the run fails
+
+    Returns:
+        Throughput metrics for the run (OCRProgress.summary())
 
     Raises:
         subprocess.CalledProcessError: If OlmOCR pipeline fails
@@ -78,26 +97,45 @@ def run_olmocr_batch(
         print(f"❌ {e}")
         raise
 
+    # Server backend: send pages to a long-lived inference server instead of
+    # letting olmocr.pipeline start (and load the model into) its own vLLM
+    from utils_ocr_server import get_ocr_backend, get_ocr_server
+
+    server = None
+    if get_ocr_backend(config) == "server":
+        server = get_ocr_server(config)
+        server.ensure_running()
+
     # Build command
     command = [
         sys.executable,
         "-m", module_path,
         str(output_dir),
         "--markdown",
-        "--model", model_id,
         "--workers", str(workers),
         "--target_longest_image_dim", target_dim,
-        "--gpu-memory-utilization", str(gpu_util),
-        "--pdfs", *file_path_strings
     ]
+    if server:
+        command += ["--server", server.url, "--model", server.served_model_name]
+        if server.api_key:
+            command += ["--api_key", server.api_key]
+    else:
+        command += ["--model", model_id, "--gpu-memory-utilization", str(gpu_util)]
+    command += ["--pdfs", *file_path_strings]
 
     print(f"🚀 Starting OlmOCR batch for {len(file_paths)} file(s)...")
     print(f"   Module: {module_path}")
+    if server:
+        print(f"   Server: {server.url}")
     print(f"   Workspace: {output_dir.resolve()}")
     print(f"   Workers: {workers}")
     print(f"   Log file: {log_file}\n")
 
-    # Run OlmOCR with live output streaming
+    from utils_ocr_progress import OCRProgress
+
+    progress = progress or OCRProgress(len(file_paths), config)
+
+    # Run OlmOCR: full output to the log, parsed progress to the console
     with log_file.open("w", encoding="utf-8") as lf:
         with subprocess.Popen(
             command,
@@ -107,24 +145,82 @@ def run_olmocr_batch(
             encoding="utf-8",
             bufsize=1
         ) as proc:
-            # Stream output live
             if proc.stdout:
                 for line in proc.stdout:
                     line = line.rstrip("\n")
-                    print(f"   [olmocr] {line}")
                     lf.write(line + "\n")
+                    progress.feed(line)
 
             # Wait for completion
             proc.wait()
+            progress.maybe_report(force=True)
 
             # Check return code
             if proc.returncode != 0:
                 print(f"\n⚠️  OlmOCR pipeline FAILED with exit code {proc.returncode}")
+                if not progress.echo:
+                    print("   Last output:")
+                    for line in progress.tail():
+                        print(f"   [olmocr] {line}")
                 print(f"   Check log: {log_file}")
                 print(f"   Common issues: GPU memory, invalid file, missing dependencies")
                 raise subprocess.CalledProcessError(proc.returncode, command)
 
     print("✅ OlmOCR batch completed successfully.\n")
+    return progress.summary()
+
+
+def load_olmocr_work_index(output_dir: Path) -> Dict[str, str]:
+    """
+    Parse OlmOCR's work index into an input-path -> work-group-hash map.
+
+    The index (work_index_list.csv.zstd) maps each work group hash to the
+    files in that group. It is decompressed and parsed once and cached per
+    workspace until the index file changes (checked by one stat), so every
+    per-file lookup in a batch reuses the same map. Paths are kept exactly
+    as OlmOCR recorded them, i.e. as run_olmocr_batch() passed them
+    (already resolved), so parsing makes no filesystem calls.
+
+    Args:
+        output_dir: OlmOCR output directory (olmocr_staging)
+
+    Returns:
+        Mapping of recorded input path to group hash (empty if no index)
+    """
+    import csv
+    import io
+    import zstandard as zstd
+
+    mapping_file = output_dir / "work_index_list.csv.zstd"
+    try:
+        stat = mapping_file.stat()
+    except OSError:
+        return {}
+
+    cache_key = str(output_dir.resolve())
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    with _work_index_lock:
+        cached = _work_index_cache.get(cache_key)
+        if cached and cached[0] == stat_key:
+            return cached[1]
+
+    index: Dict[str, str] = {}
+    try:
+        with open(mapping_file, "rb") as f:
+            with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                for row in csv.reader(io.TextIOWrapper(reader, encoding="utf-8")):
+                    # Row format: hash, file1, file2, file3, ...
+                    # When batched, multiple files map to same hash
+                    if len(row) >= 2:
+                        for file_path in row[1:]:
+                            index[file_path] = row[0]
+    except Exception:
+        return {}
+
+    with _work_index_lock:
+        _work_index_cache[cache_key] = (stat_key, index)
+    return index
 
 
 def get_olmocr_jsonl_path(
@@ -135,7 +231,8 @@ def get_olmocr_jsonl_path(
     Find the JSONL output file produced by OlmOCR v0.4.2+.
 
     OlmOCR v0.4.2+ outputs JSONL files in results/ directory with hash-based names.
-    This function reads the mapping file to find the correct JSONL output.
+    Per-file results are checked first; otherwise the work index is used
+    (see load_olmocr_work_index; parsed once, not per lookup).
 
     Args:
         input_path: Original input file path
@@ -144,47 +241,252 @@ def get_olmocr_jsonl_path(
     Returns:
         Path to JSONL file, or None if not found
     """
-    import zstandard as zstd
-    import csv
-    import hashlib
-
-    # Compute file hash (same method OlmOCR uses)
-    file_hash = hashlib.sha256(str(input_path.resolve()).encode()).hexdigest()
-
-    # Check if JSONL exists directly
+    # Check if JSONL exists directly (single-file results, salvaged retries)
     results_dir = output_dir / "results"
-    jsonl_path = results_dir / f"output_{file_hash}.jsonl"
+    jsonl_path = results_dir / _olmocr_result_name(input_path)
 
     if jsonl_path.exists():
         return jsonl_path
 
-    # Fallback: read mapping file
-    mapping_file = output_dir / "work_index_list.csv.zstd"
-    if not mapping_file.exists():
+    # Fallback: look up the file's work group in the index
+    # Recorded paths are resolved; resolve() is only needed on a mismatch
+    work_index = load_olmocr_work_index(output_dir)
+    group_hash = work_index.get(str(input_path)) or work_index.get(str(input_path.resolve()))
+    if group_hash is None:
         return None
 
+    jsonl_path = results_dir / f"output_{group_hash}.jsonl"
+    return jsonl_path if jsonl_path.exists() else None
+
+
+def _olmocr_result_name(input_path: Path) -> str:
+    """Per-file results name that get_olmocr_jsonl_path() checks first."""
+    import hashlib
+    return f"output_{hashlib.sha256(str(input_path.resolve()).encode()).hexdigest()}.jsonl"
+
+
+def demux_olmocr_results(input_paths: List[Path], output_dir: Path) -> Dict[Path, List[Dict]]:
+    """
+    Split batched OlmOCR results into per-file record lists in one pass.
+
+    Each results JSONL shared by a batch is read and parsed once, and its
+    records are grouped by Source-File, instead of every file re-reading the
+    whole shared file. Paths are matched as strings (OlmOCR records the
+    resolved path it was given); resolve() is only needed on a mismatch.
+
+    OlmOCR writes a document's record only once all its pages are done, so
+    a non-empty record list means the file's output is complete. A record
+    without Source-File is kept only if a single input reads its results
+    file; otherwise it cannot be attributed and is dropped with a warning.
+
+    Args:
+        input_paths: Input file paths (as passed to run_olmocr_batch)
+        output_dir: OlmOCR output directory (olmocr_staging)
+
+    Returns:
+        Mapping of every input path to its records (empty list if none)
+    """
+    import json
+
+    records: Dict[Path, List[Dict]] = {path: [] for path in input_paths}
+
+    # Group inputs by the results file that holds them
+    by_results_file: Dict[Path, Dict[str, Path]] = {}
+    for path in input_paths:
+        jsonl_path = get_olmocr_jsonl_path(path, output_dir)
+        if jsonl_path is not None:
+            by_results_file.setdefault(jsonl_path, {})[str(path.resolve())] = path
+
+    for jsonl_path, inputs in by_results_file.items():
+        unattributed = 0
+        try:
+            with jsonl_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    source = data.get("metadata", {}).get("Source-File", "")
+                    if not source:
+                        # Unattributed record: only safe to assign when one input reads this file
+                        if len(inputs) == 1:
+                            records[next(iter(inputs.values()))].append(data)
+                        else:
+                            unattributed += 1
+                        continue
+                    path = inputs.get(source) or inputs.get(str(Path(source).resolve()))
+                    if path is not None:
+                        records[path].append(data)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Could not read OlmOCR results {jsonl_path.name}: {e}")
+
+        if unattributed:
+            print(f"   ⚠️  Dropped {unattributed} record(s) without Source-File from {jsonl_path.name} "
+                  f"(shared by {len(inputs)} inputs)")
+
+    return records
+
+
+def find_olmocr_records(input_path: Path, output_dir: Path) -> List[Dict]:
+    """
+    Get the OlmOCR result record(s) for one input file.
+
+    Args:
+        input_path: Input file path (as passed to run_olmocr_batch)
+        output_dir: OlmOCR output directory (olmocr_staging)
+
+    Returns:
+        Records whose Source-File is input_path (empty if none)
+    """
+    return demux_olmocr_results([input_path], output_dir)[input_path]
+
+
+def run_olmocr_batch_with_salvage(
+    file_paths: List[Path],
+    output_dir: Path,
+    config: Dict,
+    log_file: Path,
+    workers: Optional[int] = None
+) -> Tuple[Dict[Path, str], Dict]:
+    """
+    Run OlmOCR on a batch, salvaging partial results if the run fails.
+
+    When the OlmOCR process exits non-zero, most files have usually finished.
+    Files with complete output are kept; only the missing ones are re-run,
+    each retry in a scratch workspace. A retry that fails again is split in
+    half until the failing (poison) file is isolated. Retried outputs are
+    copied into output_dir under the per-file results name, where
+    get_olmocr_jsonl_path() finds them.
+
+    Salvage stops (failing every file still missing) when a retry fails
+    without completing any file, since bisecting a run that can't make
+    progress only repeats the failure, or after
+    processors.olmocr.max_salvage_retries retry runs.
+
+    Retries are disabled with processors.olmocr.salvage_failed_batches: false
+    (the whole batch then fails as before).
+
+    Args:
+        file_paths: Input file paths (PDFs or images)
+        output_dir: OlmOCR output directory (olmocr_staging)
+        config: Configuration dictionary
+        log_file: Log file for the first run (retry logs are written next to it)
+        workers: Number of parallel workers (default from config)
+
+    Returns:
+        Tuple of (mapping of input path to error message for files without
+        output, empty if every file was processed; throughput metrics of
+        the batch and its retries, see utils_ocr_progress.merge_ocr_metrics,
+        plus a unique ocr_batch_id)
+
+    Raises:
+        subprocess.CalledProcessError: If the batch fails and salvage is disabled
+    """
+    import shutil
+    import uuid
+    from utils_ocr_progress import OCRProgress, merge_ocr_metrics
+
+    # Identifies this batch in the manifest (files of one batch share its throughput)
+    ocr_batch_id = uuid.uuid4().hex[:12]
+
+    olmocr_config = config.get("processors", {}).get("olmocr", {})
+    max_retries = olmocr_config.get("max_salvage_retries", 8)
+
+    progress = OCRProgress(len(file_paths), config)
     try:
-        with open(mapping_file, "rb") as f:
-            dctx = zstd.ZstdDecompressor()
-            with dctx.stream_reader(f) as reader:
-                text_stream = reader.read().decode('utf-8')
-                for row in csv.reader(text_stream.splitlines()):
-                    if len(row) >= 2:
-                        # Row format: hash, file1, file2, file3, ...
-                        # When batched, multiple files map to same hash
-                        hash_val = row[0]
-                        file_paths = row[1:]
-
-                        # Check if our input_path is in this batch
-                        for file_path in file_paths:
-                            if Path(file_path) == input_path.resolve():
-                                jsonl_path = results_dir / f"output_{hash_val}.jsonl"
-                                if jsonl_path.exists():
-                                    return jsonl_path
-    except Exception:
-        pass
+        run_olmocr_batch(file_paths, output_dir, config, log_file, workers, progress=progress)
+        metrics = merge_ocr_metrics([progress.summary()])
+        metrics["ocr_batch_id"] = ocr_batch_id
+        return {}, metrics
+    except subprocess.CalledProcessError as e:
+        if not olmocr_config.get("salvage_failed_batches", True):
+            raise
+        batch_error = e
+
+    runs = [progress.summary()]
+    found = demux_olmocr_results(file_paths, output_dir)
+    missing = [p for p in file_paths if not found[p]]
+    print(f"   🛟 Salvaged {len(file_paths) - len(missing)}/{len(file_paths)} file(s) from failed OlmOCR batch")
+
+    failures: Dict[Path, str] = {}
+    attempt = 0
+    pending = [missing] if missing else []
+
+    def give_up(paths: List[Path], reason: str) -> None:
+        print(f"   🛑 {reason}: giving up on {len(paths)} file(s)")
+        for path in paths:
+            failures[path] = reason
+
+    while pending:
+        if attempt >= max_retries:
+            give_up([path for group in pending for path in group],
+                    f"OlmOCR salvage retry limit ({max_retries}) reached")
+            break
+
+        group = pending.pop(0)
+        attempt += 1
+        retry_dir = output_dir / "retries" / f"{log_file.stem}_{attempt}"
+        retry_log = log_file.with_name(f"{log_file.stem}_retry{attempt}.log")
+
+        print(f"   🔁 Retrying {len(group)} file(s) (attempt {attempt})")
+        progress = OCRProgress(len(group), config)
+        try:
+            run_olmocr_batch(group, retry_dir, config, retry_log, workers, progress=progress)
+            error = None
+        except subprocess.CalledProcessError as e:
+            error = e
+        runs.append(progress.summary())
+
+        # Keep whatever completed, even from a failed retry
+        still_missing = []
+        retried = demux_olmocr_results(group, retry_dir)
+        for path in group:
+            records = retried[path]
+            if records:
+                _write_olmocr_result(path, records, output_dir)
+            else:
+                still_missing.append(path)
+        shutil.rmtree(retry_dir, ignore_errors=True)
+
+        if not still_missing:
+            continue
+        if error is None:
+            # Run succeeded but produced nothing for these: retrying won't help
+            for path in still_missing:
+                failures[path] = "OlmOCR produced no output"
+        elif len(still_missing) == 1:
+            failures[still_missing[0]] = f"OlmOCR failed on this file in isolation: {error}"
+            print(f"   ☠️  Isolated failing file: {still_missing[0].name}")
+        elif len(still_missing) == len(group):
+            # Failed without finishing anything: OlmOCR itself is broken, not one file
+            give_up(still_missing + [path for rest in pending for path in rest],
+                    f"OlmOCR retry failed without completing any file: {error}")
+            break
+        else:
+            mid = len(still_missing) // 2
+            pending[:0] = [still_missing[:mid], still_missing[mid:]]
+
+    if failures:
+        print(f"   ⚠️  {len(failures)} file(s) failed after retries (batch error: {batch_error})")
+
+    metrics = merge_ocr_metrics(runs)
+    metrics["files"] = len(file_paths)
+    metrics["ocr_batch_id"] = ocr_batch_id
+    return failures, metrics
+
+
+def _write_olmocr_result(input_path: Path, records: List[Dict], output_dir: Path) -> None:
+    """Write one file's records under its per-file results name (atomic replace)."""
+    import json
+    import os
 
-    return None
+    results_dir = output_dir / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    target = results_dir / _olmocr_result_name(input_path)
+    tmp = target.with_suffix(".jsonl.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, target)
 
 
 def get_olmocr_output_paths(
@@ -264,23 +566,76 @@ def olmocr_jsonl_to_markdown(jsonl_path: Path) -> str:
         raise ValueError(f"Failed to read JSONL: {e}")
 
 
+class PageIndex:
+    """
+    Character-offset -> page lookup over sorted, non-overlapping ranges.
+
+    Ranges are kept as parallel sorted offset arrays and searched with
+    bisect, so a lookup is O(log n) instead of scanning (and re-parsing) a
+    {"start-end": page} dict.
+
+    Args:
+        ranges: (start_char, end_char, page_num) tuples, end exclusive
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int, int]] = ()):
+        ordered = sorted(ranges)
+        self.starts = [r[0] for r in ordered]
+        self.ends = [r[1] for r in ordered]
+        self.page_nums = [r[2] for r in ordered]
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, int]) -> "PageIndex":
+        """Build from the legacy {"start-end": page_num} format (keys parsed once)."""
+        ranges = []
+        for range_str, page_num in mapping.items():
+            start, end = map(int, range_str.split('-'))
+            ranges.append((start, end, page_num))
+        return cls(ranges)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def ranges(self) -> List[Tuple[int, int, int]]:
+        """All (start_char, end_char, page_num) ranges in offset order."""
+        return list(zip(self.starts, self.ends, self.page_nums))
+
+    def page_at(self, char_pos: int) -> Optional[int]:
+        """Page containing char_pos, or None if it falls outside every range."""
+        i = bisect.bisect_right(self.starts, char_pos) - 1
+        if i >= 0 and char_pos < self.ends[i]:
+            return self.page_nums[i]
+        return None
+
+    def pages_in(self, start: int, end: int) -> List[int]:
+        """Sorted distinct pages whose ranges overlap [start, end)."""
+        first = bisect.bisect_right(self.starts, start) - 1
+        if first < 0 or self.ends[first] <= start:
+            first += 1
+        last = bisect.bisect_left(self.starts, end)
+        return sorted(set(self.page_nums[first:last]))
+
+
 def olmocr_jsonl_to_markdown_with_pages(
     jsonl_path: Path,
     filter_source_file: Optional[Path] = None
-) -> tuple[str, Dict[str, int]]:
+) -> tuple[str, PageIndex]:
     """
     Convert OlmOCR JSONL output to markdown with character-based page mapping.
 
     OlmOCR v0.4.2+ outputs JSONL files with page numbers in attributes.pdf_page_numbers.
     Format: [[start_char, end_char, page_num], ...]
 
+    For batched results, prefer demux_olmocr_results() +
+    olmocr_records_to_markdown_with_pages(), which read the shared file once.
+
     Args:
         jsonl_path: Path to JSONL file
         filter_source_file: If specified, only extract data for this source file (for batched results)
 
     Returns:
-        Tuple of (markdown_content, page_ranges) where page_ranges maps character positions to pages
-        page_ranges format: {char_range: page_num} where char_range is "start-end"
+        Tuple of (markdown_content, page_index) where page_index is a PageIndex
+        mapping character positions in markdown_content to pages
 
     Raises:
         FileNotFoundError: If JSONL doesn't exist
@@ -291,10 +646,7 @@ def olmocr_jsonl_to_markdown_with_pages(
     if not jsonl_path.exists():
         raise FileNotFoundError(f"JSONL not found: {jsonl_path}")
 
-    markdown_parts = []
-    page_ranges = []  # List of (start_char_in_full_text, end_char_in_full_text, page_num)
-    current_char_pos = 0
-
+    records = []
     try:
         with jsonl_path.open("r", encoding="utf-8") as f:
             for line_num, line in enumerate(f, 1):
@@ -304,71 +656,72 @@ def olmocr_jsonl_to_markdown_with_pages(
 
                 try:
                     data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Malformed JSON on line {line_num}: {e}")
 
-                    # If filtering by source file, check metadata
-                    if filter_source_file:
-                        source = data.get("metadata", {}).get("Source-File", "")
-                        if source and Path(source).resolve() != filter_source_file.resolve():
-                            continue  # Skip entries from other files in the batch
+                # If filtering by source file, check metadata
+                if filter_source_file:
+                    source = data.get("metadata", {}).get("Source-File", "")
+                    if source and Path(source).resolve() != filter_source_file.resolve():
+                        continue  # Skip entries from other files in the batch
 
-                    text = data.get("text", "")
+                records.append(data)
 
-                    if text:
-                        markdown_parts.append(text)
+    except Exception as e:
+        raise ValueError(f"Failed to read JSONL: {e}")
 
-                        # Extract page ranges from attributes.pdf_page_numbers
-                        # Format: [[start_char, end_char, page_num], ...]
-                        attrs = data.get("attributes", {})
-                        pdf_pages = attrs.get("pdf_page_numbers", [])
+    return olmocr_records_to_markdown_with_pages(records, source_label=str(jsonl_path))
 
-                        if pdf_pages:
-                            # Convert OlmOCR's local character positions to global positions
-                            for page_range in pdf_pages:
-                                if len(page_range) >= 3:
-                                    local_start, local_end, page_num = page_range
-                                    global_start = current_char_pos + local_start
-                                    global_end = current_char_pos + local_end
-                                    page_ranges.append((global_start, global_end, page_num))
 
-                        # Update character position (text + 2 chars for "\n\n")
-                        current_char_pos += len(text) + 2
+def olmocr_records_to_markdown_with_pages(
+    records: List[Dict],
+    source_label: str = "OlmOCR output"
+) -> tuple[str, PageIndex]:
+    """
+    Convert one file's OlmOCR records to markdown with character-based page mapping.
 
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Malformed JSON on line {line_num}: {e}")
+    Args:
+        records: OlmOCR result records for a single source file
+                 (from demux_olmocr_results)
+        source_label: Name used in the error message
 
-        if not markdown_parts:
-            raise ValueError(f"JSONL file is empty or contains no text: {jsonl_path}")
+    Returns:
+        Tuple of (markdown_content, page_index), as olmocr_jsonl_to_markdown_with_pages
 
-        # Join with double newlines to separate pages/sections
-        markdown_content = "\n\n".join(markdown_parts)
+    Raises:
+        ValueError: If the records contain no text
+    """
+    markdown_parts = []
+    page_ranges = []  # List of (start_char_in_full_text, end_char_in_full_text, page_num)
+    current_char_pos = 0
 
-        # Convert page_ranges list to a lookup-friendly dict
-        page_map = {}
-        for start, end, page_num in page_ranges:
-            page_map[f"{start}-{end}"] = page_num
+    for data in records:
+        text = data.get("text", "")
+        if not text:
+            continue
 
-        return markdown_content, page_map
+        markdown_parts.append(text)
 
-    except Exception as e:
-        raise ValueError(f"Failed to read JSONL: {e}")
+        # Extract page ranges from attributes.pdf_page_numbers
+        # Format: [[start_char, end_char, page_num], ...]
+        pdf_pages = data.get("attributes", {}).get("pdf_page_numbers", [])
 
+        # Convert OlmOCR's local character positions to global positions
+        for page_range in pdf_pages:
+            if len(page_range) >= 3:
+                local_start, local_end, page_num = page_range
+                page_ranges.append((current_char_pos + local_start, current_char_pos + local_end, page_num))
 
-def _get_page_for_char_position(char_pos: int, page_mapping: Dict[str, int]) -> Optional[int]:
-    """
-    Find which page a character position falls into.
+        # Update character position (text + 2 chars for "\n\n")
+        current_char_pos += len(text) + 2
 
-    Args:
-        char_pos: Character position in the text
-        page_mapping: Dict mapping "start-end" ranges to page numbers
+    if not markdown_parts:
+        raise ValueError(f"JSONL file is empty or contains no text: {source_label}")
 
-    Returns:
-        Page number, or None if not found
-    """
-    for range_str, page_num in page_mapping.items():
-        start, end = map(int, range_str.split('-'))
-        if start <= char_pos < end:
-            return page_num
-    return None
+    # Join with double newlines to separate pages/sections
+    markdown_content = "\n\n".join(markdown_parts)
+
+    return markdown_content, PageIndex(page_ranges)
 
 
 def olmocr_to_jsonl(
@@ -376,7 +729,10 @@ def olmocr_to_jsonl(
     source_path: Path,
     config: Dict,
     batch_id: str,
-    page_mapping: Optional[Dict[str, int]] = None
+    page_mapping: Optional[Union[PageIndex, Dict[str, int]]] = None,
+    processor: str = "olmocr-2",
+    file_type: Optional[str] = None,
+    context: Optional[Dict] = None
 ) -> List[Dict]:
     """
     Convert OlmOCR markdown output to JSONL chunks (schema v2.3.0).
@@ -389,95 +745,43 @@ def olmocr_to_jsonl(
         source_path: Original source file path
         config: Configuration dictionary
         batch_id: Batch identifier
-        page_mapping: Optional dict mapping character ranges ("start-end") to page numbers
+        page_mapping: PageIndex over markdown_content (a legacy {"start-end": page}
+                      dict is also accepted)
+        processor: Processor name recorded in metadata (e.g., "docling+olmocr-2" for mixed PDFs)
+        file_type: Override metadata file_type (default: derived from extension)
+        context: Document context from build_document_context() (built if None)
 
     Returns:
         List of JSONL record dictionaries (schema v2.3.0 with page-level bbox)
     """
     from datetime import datetime
-    from utils_classify import compute_file_hash, get_mime_type
-
-    # Compute source file hash
-    file_hash = compute_file_hash(source_path)
-    mime_type = get_mime_type(source_path)
-
-    # Generate doc_id from hash
-    doc_id = file_hash[:16]
+    from utils_context import get_or_build_context
 
-    # Try paragraph-based chunking first
-    paragraphs = [p.strip() for p in markdown_content.split('\n\n') if p.strip()]
+    # Hash, MIME type and doc_id come from the document context (computed once per file)
+    context = get_or_build_context(context, source_path, config)
+    file_hash = context["hash_sha256"]
+    mime_type = context["mime_type"]
+    doc_id = context["doc_id"]
 
-    # Get chunking config
-    chunking_config = config.get("chunking", {})
-    token_target = chunking_config.get("token_target", 1400)
-    token_max = chunking_config.get("token_max", 2000)
+    # Chunk with exact source offsets (utils_chunking)
+    from utils_chunking import chunk_paragraphs, chunk_sentences, get_chunk_limits
+    token_target, token_max = get_chunk_limits(config)
 
     # Detect if this is continuous text (OlmOCR JSONL) vs structured markdown (Docling)
     # If we have very few paragraphs, use sentence-based chunking instead
-    use_sentence_chunking = len(paragraphs) < 3
-
-    chunks = []
-
-    if use_sentence_chunking:
+    paragraph_count = sum(1 for p in markdown_content.split('\n\n') if p.strip())
+    if paragraph_count < 3:
         # OlmOCR produces continuous text - use sentence-based chunking
-        import re
-
-        # Split by sentences (basic approach)
-        sentences = re.split(r'(?<=[.!?])\s+', markdown_content)
-
-        current_chunk = []
-        current_tokens = 0
-
-        for sent in sentences:
-            sent_tokens = len(sent.split())
-
-            if current_tokens + sent_tokens > token_max and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [sent]
-                current_tokens = sent_tokens
-            else:
-                current_chunk.append(sent)
-                current_tokens += sent_tokens
-
-                if current_tokens >= token_target:
-                    chunks.append(' '.join(current_chunk))
-                    current_chunk = []
-                    current_tokens = 0
-
-        # Add remaining
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-
+        chunks = chunk_sentences(markdown_content, token_target, token_max)
     else:
-        # Structured markdown (Docling) - use paragraph-based chunking
-        current_chunk = []
-        current_tokens = 0
-
-        for para in paragraphs:
-            para_tokens = len(para.split())
-
-            # If adding exceeds max, finalize current chunk
-            if current_tokens + para_tokens > token_max and current_chunk:
-                chunks.append("\n\n".join(current_chunk))
-                current_chunk = [para]
-                current_tokens = para_tokens
-            else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
-
-                # If reached target, finalize
-                if current_tokens >= token_target:
-                    chunks.append("\n\n".join(current_chunk))
-                    current_chunk = []
-                    current_tokens = 0
-
-        # Add remaining
-        if current_chunk:
-            chunks.append("\n\n".join(current_chunk))
+        # Structured markdown - use paragraph-based chunking
+        chunks = chunk_paragraphs(markdown_content, token_target, token_max)
 
     # Determine file type
     ext = source_path.suffix.lower()
-    if ext == '.pdf':
+    if file_type:
+        pass  # Caller-provided (e.g., pdf_mixed)
+    elif ext == '.pdf':
         file_type = 'pdf_scanned'
     elif ext in ['.jpg', '.jpeg']:
         file_type = 'image_jpg'
@@ -492,17 +796,20 @@ def olmocr_to_jsonl(
     schema_version = config.get("schema", {}).get("version", "2.3.0")
     processed_at = datetime.utcnow().isoformat() + "Z"
 
+    if isinstance(page_mapping, dict):
+        page_mapping = PageIndex.from_mapping(page_mapping)
+
     jsonl_records = []
-    for idx, chunk_text in enumerate(chunks):
+    for idx, chunk in enumerate(chunks):
+        chunk_text = chunk.text
         chunk_tokens = len(chunk_text.split())
 
-        # Get page number by finding this chunk's position in the markdown
+        # Pages come straight from the chunk's source offsets
         page_num = None
-        if page_mapping and chunk_text:
-            # Find where this chunk appears in the markdown
-            char_pos = markdown_content.find(chunk_text[:100])  # Use first 100 chars for matching
-            if char_pos != -1:
-                page_num = _get_page_for_char_position(char_pos, page_mapping)
+        page_span = None
+        if page_mapping:
+            page_span = page_mapping.pages_in(chunk.start, chunk.end) or None
+            page_num = page_mapping.page_at(chunk.start) or (page_span[0] if page_span else None)
 
         # Page-level bbox (MVP: coordinates as None, page number only)
         chunk_bbox = None
@@ -521,14 +828,14 @@ def olmocr_to_jsonl(
             "chunk_index": idx,
             "text": chunk_text,
             "attrs": {
-                "page_span": None,  # TODO: Extract from OlmOCR output
+                "page_span": page_span,
                 "sections": [],
                 "table": "| " in chunk_text and chunk_text.count("|") >= 3,
                 "token_count": chunk_tokens,
                 "bbox": chunk_bbox  # NEW in v2.3.0: page-level bbox
             },
             "source": {
-                "file_path": str(source_path.resolve()),
+                "file_path": context["resolved_path"],
                 "file_name": source_path.name,
                 "file_type": ext.lstrip('.'),
                 "mime_type": mime_type
@@ -538,7 +845,7 @@ def olmocr_to_jsonl(
                 "file_type": file_type,
                 "mime_type": mime_type,
                 "hash_input_sha256": file_hash,
-                "processor": "olmocr-2",
+                "processor": processor,
                 "processor_version": "olmocr-2-7b",
                 "processed_at": processed_at,
                 "batch_id": batch_id,
@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+"""
+utils_pipeline.py - Staged producer/consumer processing pipeline
+
+process_batch() runs its phases strictly one after another (classify all,
+then digital PDFs, then OCR batches, then other files), with enrichment
+inline in each handler, so the GPU idles while the CPU converts, chunks and
+enriches, and vice versa.
+
+This module provides:
+- StagedPipeline: a small engine of stages connected by bounded queues,
+  each stage with its own worker threads (optionally consuming batches)
+- process_batch_pipelined(): process_batch() expressed as stages
+
+    classify ──┬─> convert (Docling PDFs, N workers) ──────────┬─> enrich ─> commit
+               ├─> office (DOCX/XLSX/CSV, M workers) ──────────┤
+               └─> gpu (OlmOCR batches, 1 worker) ─> ocr_post ─┘
+                   (scanned PDFs + images batched, mixed PDFs)
+
+While the gpu stage runs the next OlmOCR batch, ocr_post/enrich/commit
+work through the previous batch on the CPU. Bounded queues provide
+backpressure so a fast stage cannot run arbitrarily far ahead.
+
+Enabled with processors.pipeline_mode (or --pipeline).
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from utils_config import get_storage_paths
+from utils_classify import (
+    classify_pdf,
+    validate_file_type,
+    compute_file_hash,
+    SUPPORTED_EXTENSIONS,
+    IMAGE_EXTENSIONS,
+    OFFICE_EXTENSIONS
+)
+from utils_context import build_document_context
+from utils_hash import configure_hashing
+from utils_workers import (
+    create_digital_executor,
+    get_digital_backend,
+    create_office_executor,
+    get_office_backend,
+    start_all_workers
+)
+from utils_concurrency import create_concurrency_controller
+from utils_processor import (
+    route_pdf,
+    process_file_with_retry,
+    commit_success_state,
+    quarantine_result,
+    finalize_batch
+)
+from handlers import (
+    run_scanned_ocr_batch,
+    postprocess_scanned_output,
+    postprocess_image_output,
+    process_mixed_pdf_batch
+)
+from utils_olmocr import demux_olmocr_results
+from utils_ocr_progress import ocr_file_metrics
+
+
+# Sentinel that tells a stage worker to exit
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    One stage of a StagedPipeline.
+
+    Args:
+        name: Stage name (used for routing)
+        func: Called with one job dict (or a list of jobs if batch_size > 1);
+              returns the job(s), updated in place
+        workers: Worker threads for this stage
+        queue_size: Capacity of the stage's input queue (backpressure)
+        batch_size: Jobs handed to func at once (1 = one job per call)
+        batch_wait_seconds: How long a batching stage waits to fill a batch
+        batch_weight: Optional callable(job) -> int (e.g. page count); with
+                      batch_budget, a batch is closed before its total weight
+                      would exceed the budget
+        batch_budget: Maximum total batch_weight per batch (None = count only)
+        next_stage: Next stage name, a callable(job) -> stage name, or None (final stage)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        workers: int = 1,
+        queue_size: int = 32,
+        batch_size: int = 1,
+        batch_wait_seconds: float = 0.0,
+        batch_weight: Optional[Callable[[Dict], int]] = None,
+        batch_budget: Optional[int] = None,
+        next_stage: Union[str, Callable[[Dict], Optional[str]], None] = None
+    ):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait_seconds = batch_wait_seconds
+        self.batch_weight = batch_weight
+        self.batch_budget = batch_budget
+        self.next_stage = next_stage
+
+
+class StagedPipeline:
+    """
+    Run jobs through stages connected by bounded queues.
+
+    Each job is a dict. A stage that raises marks its job(s) with "error"
+    and "failed_stage" and forwards them to the final stage, which is
+    therefore responsible for recording failures.
+    """
+
+    def __init__(self, stages: List[PipelineStage]):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+
+        self.stages = {stage.name: stage for stage in stages}
+        self.first = stages[0].name
+        self.last = stages[-1].name
+        self._queues = {stage.name: queue.Queue(maxsize=stage.queue_size) for stage in stages}
+
+        self._finished: List[Dict] = []
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _route(self, stage: PipelineStage, job: Dict) -> None:
+        """Send a job to its next stage, or retire it."""
+        if job.get("error") and stage.name != self.last:
+            next_name = self.last
+        elif callable(stage.next_stage):
+            next_name = stage.next_stage(job)
+        else:
+            next_name = stage.next_stage
+
+        if next_name is None:
+            with self._cond:
+                self._finished.append(job)
+                self._in_flight -= 1
+                self._cond.notify_all()
+        else:
+            self._queues[next_name].put(job)
+
+    def _fail(self, stage: PipelineStage, jobs: List[Dict], error: Exception) -> None:
+        for job in jobs:
+            job["error"] = str(error)
+            job["failed_stage"] = stage.name
+            if stage.name == self.last:
+                # Nowhere left to record the failure; retire the job as-is
+                with self._cond:
+                    self._finished.append(job)
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+            else:
+                self._route(stage, job)
+
+    def _collect_batch(self, stage: PipelineStage, first: Dict, in_queue: queue.Queue):
+        """
+        Gather up to batch_size jobs (and batch_budget weight), waiting at
+        most batch_wait_seconds. A job that would overflow the budget is
+        returned as carry-over to start the next batch.
+        """
+        batch = [first]
+        weight = stage.batch_weight(first) if stage.batch_weight else 0
+        deadline = time.time() + stage.batch_wait_seconds
+        stop_seen = False
+        carry = None
+
+        while len(batch) < stage.batch_size:
+            if stage.batch_budget and weight >= stage.batch_budget:
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = in_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop_seen = True
+                break
+            if stage.batch_weight and stage.batch_budget:
+                item_weight = stage.batch_weight(item)
+                if weight + item_weight > stage.batch_budget:
+                    carry = item
+                    break
+                weight += item_weight
+            batch.append(item)
+
+        return batch, stop_seen, carry
+
+    def _worker(self, stage: PipelineStage) -> None:
+        in_queue = self._queues[stage.name]
+
+        carry = None
+        while True:
+            item = carry if carry is not None else in_queue.get()
+            carry = None
+            if item is _STOP:
+                return
+
+            stop_seen = False
+            if stage.batch_size > 1:
+                jobs, stop_seen, carry = self._collect_batch(stage, item, in_queue)
+                try:
+                    out = stage.func(jobs)
+                except Exception as e:
+                    self._fail(stage, jobs, e)
+                    out = []
+            else:
+                try:
+                    out = [stage.func(item)]
+                except Exception as e:
+                    self._fail(stage, [item], e)
+                    out = []
+
+            for job in out:
+                self._route(stage, job)
+
+            if stop_seen:
+                return
+
+    def run(self, jobs: Iterable[Dict]) -> List[Dict]:
+        """
+        Feed jobs through the pipeline and wait for all of them to finish.
+
+        Args:
+            jobs: Job dicts (consumed lazily; feeding blocks when the first queue is full)
+
+        Returns:
+            Finished jobs, in completion order
+        """
+        threads = []
+        for stage in self.stages.values():
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage,),
+                    name=f"pipeline-{stage.name}-{i}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for job in jobs:
+            with self._cond:
+                self._in_flight += 1
+            self._queues[self.first].put(job)
+
+        with self._cond:
+            while self._in_flight > 0:
+                self._cond.wait()
+
+        for name, stage in self.stages.items():
+            for _ in range(stage.workers):
+                self._queues[name].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        return self._finished
+
+
+# =============================================================================
+# Document processing stages
+# =============================================================================
+
+def _enrichment_enabled(config: Dict) -> bool:
+    return (
+        config.get("entity_extraction", {}).get("enabled", False)
+        or config.get("embeddings", {}).get("enabled", False)
+    )
+
+
+def enrich_jsonl(jsonl_path: Path, config: Dict) -> int:
+    """
+    Add entities and embeddings to an already-written JSONL file.
+
+    Same enrichment the handlers run inline, moved to its own stage so it
+    overlaps with conversion/OCR of other files. The file is replaced atomically.
+
+    Args:
+        jsonl_path: JSONL written by a handler with skip_enrichment=True
+        config: Configuration dictionary
+
+    Returns:
+        Number of chunks enriched
+    """
+    with jsonl_path.open("r", encoding="utf-8") as f:
+        chunks = [json.loads(line) for line in f if line.strip()]
+
+    if not chunks:
+        return 0
+
+    if config.get("entity_extraction", {}).get("enabled", False):
+        from utils_entity_integration import add_entities_to_chunks
+        api_key = config.get("entity_extraction", {}).get("openai_api_key") or os.getenv("OPENAI_API_KEY")
+        chunks, _ = add_entities_to_chunks(chunks, enable_entities=True, api_key=api_key)
+
+    if config.get("embeddings", {}).get("enabled", False):
+        from handlers.pdf_digital import get_embedding_generator
+        model_name = config.get("embeddings", {}).get("model", "all-mpnet-base-v2")
+        chunks = get_embedding_generator(model_name).add_embeddings_to_chunks(chunks, show_progress=False)
+
+    tmp_path = jsonl_path.with_name(f".{jsonl_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, jsonl_path)
+
+    return len(chunks)
+
+
+def _failure_result(job: Dict, error: str, processor: Optional[str] = None) -> Dict:
+    file_path = job["file_path"]
+    return {
+        "success": False,
+        "file_path": str(file_path),
+        "file_name": file_path.name,
+        "file_type": file_path.suffix.lower().lstrip('.'),
+        "processor": processor,
+        "error": error,
+        "quarantined": True,
+        "retry_count": 0
+    }
+
+
+def process_batch_pipelined(
+    file_paths: List[Path],
+    config: Dict,
+    batch_id: str,
+    apply_preprocessing: bool = False,
+    skip_enrichment: bool = False
+) -> Dict:
+    """
+    Process a batch of files with the staged pipeline.
+
+    Drop-in replacement for process_batch() (same return value); selected
+    by processors.pipeline_mode.
+
+    Args:
+        file_paths: List of file paths to process
+        config: Configuration dictionary
+        batch_id: Batch identifier
+        apply_preprocessing: Apply preprocessing to scanned PDFs
+        skip_enrichment: Skip entity extraction and embeddings
+
+    Returns:
+        Batch results dictionary (see process_batch)
+    """
+    output_dir = get_storage_paths(config)["rag_staging"]
+    processors_config = config.get("processors", {})
+    pipeline_config = processors_config.get("pipeline", {})
+    olmocr_config = processors_config.get("olmocr", {})
+
+    queue_size = pipeline_config.get("queue_size", 32)
+    # OlmOCR batches are closed at the page budget when one is set (see plan_ocr_batches)
+    ocr_page_budget = olmocr_config.get("batch_page_budget")
+    if ocr_page_budget:
+        ocr_batch_size = olmocr_config.get("max_files_per_batch", 50)
+    else:
+        ocr_batch_size = olmocr_config.get("default_batch_size", 10)
+    if not olmocr_config.get("enable_file_batching", True):
+        ocr_batch_size = 1
+
+    # Handlers write un-enriched JSONL; the enrich stage adds entities/embeddings
+    defer_enrichment = not skip_enrichment and _enrichment_enabled(config)
+    handler_skip_enrichment = skip_enrichment or defer_enrichment
+
+    print(f"\n{'='*70}")
+    print(f"🚀 Processing Batch (pipelined): {batch_id}")
+    print(f"   Files: {len(file_paths)}")
+    print(f"{'='*70}")
+
+    configure_hashing(config)
+
+    # Docling process pool (processors.digital_backend: process): convert
+    # threads only dispatch digital PDFs to it and wait for the result
+    digital_workers = processors_config.get("digital_pdf_workers", 1)
+
+    # Adaptive limit on concurrent conversions; convert threads are sized to its maximum
+    controller = create_concurrency_controller(config, digital_workers)
+    if controller:
+        digital_workers = controller.max_workers
+
+    digital_executor = None
+    if get_digital_backend(config) == "process":
+        digital_executor = create_digital_executor(config, digital_workers)
+        start_all_workers(digital_executor, digital_workers)
+
+    # DOCX/XLSX/CSV pool, sized separately (processors.office_workers)
+    office_workers = processors_config.get("office_workers", 4)
+    office_executor = None
+    if get_office_backend(config) == "process":
+        office_executor = create_office_executor(config, office_workers)
+        start_all_workers(office_executor, office_workers)
+
+    def classify(job: Dict) -> Dict:
+        file_path = job["file_path"]
+        valid, file_type = validate_file_type(file_path, SUPPORTED_EXTENSIONS)
+        if not valid:
+            job["result"] = _failure_result(job, f"Unsupported file type: {file_type}")
+            job["route"] = "commit"
+            return job
+
+        job["file_hash"] = compute_file_hash(file_path)
+
+        if file_type == "pdf":
+            classification = classify_pdf(file_path, config, file_hash=job["file_hash"])
+            job["classification"] = classification
+            if not classification["allowed"]:
+                job["result"] = _failure_result(job, classification["rejection_reason"])
+                job["route"] = "commit"
+                return job
+            route = route_pdf(classification, config)
+        elif file_path.suffix.lower() in IMAGE_EXTENSIONS:
+            route = "image"
+        else:
+            route = file_type
+
+        # Everything that runs OlmOCR goes through the single GPU stage
+        if route in ("pdf_scanned", "pdf_mixed", "image"):
+            job["route"] = "gpu"
+        elif file_path.suffix.lower() in OFFICE_EXTENSIONS:
+            job["route"] = "office"
+        else:
+            job["route"] = "convert"
+        job["kind"] = route
+        return job
+
+    def convert(job: Dict) -> Dict:
+        args = (
+            job["file_path"],
+            output_dir,
+            config,
+            batch_id,
+            apply_preprocessing,
+            handler_skip_enrichment,
+            job.get("classification")
+        )
+        pages = (job.get("classification") or {}).get("total_pages")
+        if controller:
+            controller.acquire(pages)
+        try:
+            if digital_executor is not None and job["kind"] == "pdf_digital":
+                job["result"] = digital_executor.submit(process_file_with_retry, *args, commit_state=False).result()
+            else:
+                job["result"] = process_file_with_retry(*args, commit_state=False)
+        finally:
+            if controller:
+                controller.release(pages)
+        return job
+
+    def office(job: Dict) -> Dict:
+        args = (job["file_path"], output_dir, config, batch_id, apply_preprocessing, handler_skip_enrichment, None)
+        if office_executor is not None:
+            job["result"] = office_executor.submit(process_file_with_retry, *args, commit_state=False).result()
+        else:
+            job["result"] = process_file_with_retry(*args, commit_state=False)
+        return job
+
+    def gpu(jobs: List[Dict]) -> List[Dict]:
+        # Mixed PDFs of this batch share one OlmOCR run over their scanned pages
+        mixed_jobs = [job for job in jobs if job["kind"] == "pdf_mixed"]
+        if mixed_jobs:
+            print(f"\n🔀 Mixed batch: {len(mixed_jobs)} PDF(s)")
+            mixed_paths = [job["file_path"] for job in mixed_jobs]
+            try:
+                mixed_results = process_mixed_pdf_batch(
+                    mixed_paths,
+                    output_dir,
+                    config,
+                    batch_id,
+                    {job["file_path"]: job["classification"] for job in mixed_jobs},
+                    apply_preprocessing=apply_preprocessing,
+                    skip_enrichment=handler_skip_enrichment,
+                    contexts={
+                        job["file_path"]: build_document_context(
+                            job["file_path"], config, file_hash=job["file_hash"], classification=job["classification"]
+                        )
+                        for job in mixed_jobs
+                    }
+                )
+                for job, result in zip(mixed_jobs, mixed_results):
+                    result["hash_sha256"] = job["file_hash"]
+                    job["result"] = result
+                    job["route"] = "enrich"
+            except Exception as e:
+                print(f"   ❌ Mixed batch failed: {e}")
+                for job in mixed_jobs:
+                    job["result"] = _failure_result(job, f"Batch processing failed: {e}", "docling+olmocr-2")
+                    job["route"] = "commit"
+
+        # Scanned PDFs and images share one OlmOCR run
+        ocr_jobs = [job for job in jobs if job["kind"] in ("pdf_scanned", "image")]
+        if ocr_jobs:
+            print(f"\n📦 OCR batch: {len(ocr_jobs)} file(s)")
+            try:
+                failures, ocr_metrics = run_scanned_ocr_batch(
+                    [job["file_path"] for job in ocr_jobs],
+                    output_dir,
+                    config,
+                    batch_id,
+                    apply_preprocessing
+                )
+                # Split the shared results once; ocr_post workers get their file's records
+                records = demux_olmocr_results(
+                    [job["file_path"] for job in ocr_jobs if job["file_path"] not in failures],
+                    output_dir / "olmocr_staging"
+                )
+                for job in ocr_jobs:
+                    job["ocr_metrics"] = ocr_file_metrics(ocr_metrics, job["file_path"])
+                    if job["file_path"] in failures:
+                        error = failures[job["file_path"]]
+                        job["result"] = _failure_result(job, f"Batch processing failed: {error}", "olmocr")
+                        job["result"].update(job.pop("ocr_metrics"))
+                        job["route"] = "commit"
+                    else:
+                        job["ocr_records"] = records[job["file_path"]]
+                        job["route"] = "ocr_post"
+            except Exception as e:
+                print(f"   ❌ OCR batch failed: {e}")
+                for job in ocr_jobs:
+                    job["result"] = _failure_result(job, f"Batch processing failed: {e}", "olmocr")
+                    job["route"] = "commit"
+
+        return jobs
+
+    def ocr_post(job: Dict) -> Dict:
+        file_path = job["file_path"]
+        context = build_document_context(
+            file_path, config, file_hash=job["file_hash"], classification=job.get("classification")
+        )
+        if job["kind"] == "image":
+            result = postprocess_image_output(
+                file_path, output_dir, config, batch_id, context=context, records=job.pop("ocr_records", None)
+            )
+            if not result["success"]:
+                result["quarantined"] = True
+        else:
+            result = postprocess_scanned_output(
+                file_path,
+                output_dir,
+                config,
+                batch_id,
+                skip_enrichment=handler_skip_enrichment,
+                context=context,
+                records=job.pop("ocr_records", None)
+            )
+        result["hash_sha256"] = job["file_hash"]
+        result.update(job.pop("ocr_metrics", {}))
+        job["result"] = result
+        return job
+
+    def enrich(job: Dict) -> Dict:
+        result = job["result"]
+        # Only types whose handlers enrich inline (PDF, DOCX) are enriched here
+        if (defer_enrichment and result.get("success") and result.get("jsonl_path")
+                and result.get("file_type") in ("pdf", "docx")):
+            try:
+                enrich_jsonl(Path(result["jsonl_path"]), config)
+            except Exception as e:
+                result.setdefault("warnings", []).append(f"Enrichment failed: {e}")
+        return job
+
+    def commit(job: Dict) -> Dict:
+        result = job.get("result")
+        if result is None:
+            # A stage raised before producing a result
+            result = _failure_result(job, f"{job.get('failed_stage')} stage failed: {job.get('error')}")
+            job["result"] = result
+
+        if result.get("success"):
+            commit_success_state(result, config)
+        elif result.get("quarantined"):
+            job["quarantine_record"] = quarantine_result(result, job["file_path"], config)
+        return job
+
+    pipeline = StagedPipeline([
+        PipelineStage("classify", classify,
+                      workers=pipeline_config.get("classify_workers", 4),
+                      queue_size=queue_size,
+                      next_stage=lambda job: job["route"]),
+        PipelineStage("convert", convert,
+                      workers=digital_workers,
+                      queue_size=queue_size,
+                      next_stage="enrich"),
+        PipelineStage("office", office,
+                      workers=office_workers,
+                      queue_size=queue_size,
+                      next_stage="enrich"),
+        PipelineStage("gpu", gpu,
+                      workers=1,
+                      queue_size=queue_size,
+                      batch_size=ocr_batch_size,
+                      batch_wait_seconds=pipeline_config.get("batch_wait_seconds", 10),
+                      batch_weight=lambda job: max((job.get("classification") or {}).get("total_pages") or 1, 1),
+                      batch_budget=ocr_page_budget,
+                      next_stage=lambda job: job["route"]),
+        PipelineStage("ocr_post", ocr_post,
+                      workers=pipeline_config.get("postprocess_workers", 2),
+                      queue_size=queue_size,
+                      next_stage="enrich"),
+        PipelineStage("enrich", enrich,
+                      workers=pipeline_config.get("enrich_workers", 2),
+                      queue_size=queue_size,
+                      next_stage="commit"),
+        PipelineStage("commit", commit,
+                      workers=1,
+                      queue_size=queue_size,
+                      next_stage=None)
+    ])
+
+    jobs = ({"index": i, "file_path": Path(p)} for i, p in enumerate(file_paths))
+    try:
+        finished = sorted(pipeline.run(jobs), key=lambda job: job["index"])
+    finally:
+        for executor in (digital_executor, office_executor):
+            if executor is not None:
+                executor.shutdown()
+
+    results = []
+    quarantine_records = []
+    for job in finished:
+        result = job.get("result") or _failure_result(job, job.get("error", "Unknown error"))
+        result.setdefault("file_path", str(job["file_path"]))
+        result.setdefault("file_name", job["file_path"].name)
+        result.setdefault("file_type", job["file_path"].suffix.lower().lstrip('.'))
+        if job.get("file_hash"):
+            result.setdefault("hash_sha256", job["file_hash"])
+        results.append(result)
+        if job.get("quarantine_record"):
+            quarantine_records.append(job["quarantine_record"])
+
+    return finalize_batch(results, quarantine_records, config, batch_id)
@@ -8,30 +8,107 @@ classification, routing, retry logic, and quarantine handling.
 
 import time
 from pathlib import Path
-from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from concurrent.futures import as_completed
 
 from utils_config import load_config, get_storage_paths
-from utils_classify import classify_pdf, validate_file_type, SUPPORTED_EXTENSIONS, compute_file_hash
+from utils_classify import (
+    classify_pdf,
+    validate_file_type,
+    SUPPORTED_EXTENSIONS,
+    IMAGE_EXTENSIONS,
+    OFFICE_EXTENSIONS,
+    compute_file_hash
+)
+from utils_hash import configure_hashing, hash_files
+from utils_context import build_document_context
 from utils_quarantine import quarantine_file, should_retry, write_quarantine_csv
 from utils_manifest import write_manifest_csv, write_success_marker
+from utils_state import get_ledger_for_config
+from utils_workers import create_digital_executor, get_digital_backend, create_office_executor, get_office_backend
+from utils_concurrency import create_concurrency_controller
 from handlers import (
     process_digital_pdf,
     process_scanned_pdf,
     process_scanned_pdf_batch,
+    process_mixed_pdf,
+    process_mixed_pdf_batch,
     process_docx,
     process_xlsx,
-    process_image
+    process_image,
+    process_image_batch
 )
 
 
+def route_pdf(classification: Dict, config: Dict) -> str:
+    """
+    Decide how a classified PDF is processed (page-level router).
+
+    A PDF whose per-page classification contains both digital and scanned
+    pages (at least page_routing.min_pages_per_route of each) is routed as
+    "pdf_mixed": only its scanned pages go to OlmOCR, the rest to Docling.
+
+    Args:
+        classification: classify_pdf() result
+        config: Configuration dictionary
+
+    Returns:
+        "pdf_digital" | "pdf_scanned" | "pdf_mixed"
+    """
+    routing_config = config.get("classification", {}).get("page_routing", {})
+    scanned_pages = classification.get("scanned_pages")
+
+    if routing_config.get("enabled", False) and scanned_pages is not None:
+        min_pages = routing_config.get("min_pages_per_route", 2)
+        scanned_count = len(scanned_pages)
+        digital_count = classification.get("total_pages", 0) - scanned_count
+
+        if scanned_count >= min_pages and digital_count >= min_pages:
+            return "pdf_mixed"
+
+    return classification["type"]
+
+
+def commit_success_state(result: Dict, config: Dict) -> bool:
+    """
+    Record a successful result in the processed-state ledger and write its _SUCCESS marker.
+
+    Shared by the single-file and batched paths, so every successful file is
+    skipped on the next run regardless of how it was processed.
+
+    Args:
+        result: Handler result with "success", "jsonl_path" and "hash_sha256"
+        config: Configuration dictionary
+
+    Returns:
+        True if state was committed, False if the result is not committable
+    """
+    if not result.get("success") or not result.get("jsonl_path") or not result.get("hash_sha256"):
+        return False
+
+    write_success_marker(
+        Path(result["jsonl_path"]),
+        {
+            "file_hash": result["hash_sha256"],
+            "chunks": result.get("chunk_count", 0),
+            "processor": result.get("processor", ""),
+            "processing_duration_ms": result.get("processing_duration_ms", 0),
+            "config_version": config.get("metadata", {}).get("config_version", "")
+        },
+        ledger=get_ledger_for_config(config)
+    )
+    return True
+
+
 def process_file_with_retry(
     file_path: Path,
     output_dir: Path,
     config: Dict,
     batch_id: str,
     apply_preprocessing: bool = False,
-    skip_enrichment: bool = False
+    skip_enrichment: bool = False,
+    classification: Optional[Dict] = None,
+    commit_state: bool = True
 ) -> Dict:
     """
     Process single file with automatic retry and quarantine logic.
@@ -46,6 +123,9 @@ def process_file_with_retry(
         config: Configuration dictionary
         batch_id: Batch identifier
         apply_preprocessing: Apply preprocessing to scanned PDFs
+        classification: Precomputed classify_pdf() result (PDFs only, avoids reclassifying)
+        commit_state: Record success in the ledger/_SUCCESS marker (False when a
+                      later pipeline stage still has to enrich the output)
 
     Returns:
         Processing result dictionary with metadata
@@ -70,13 +150,25 @@ def process_file_with_retry(
 
     print(f"\n📄 Processing: {file_path.name}")
 
+    # Compute file hash once (deduplication, classification cache, success marker)
+    file_hash = None
+
     while retry_count <= max_retries:
         try:
+            if file_hash is None:
+                file_hash = compute_file_hash(file_path)
+
+            # Classify PDF first (cached: reuses batch/inventory classification)
+            if file_type == "pdf" and classification is None:
+                classification = classify_pdf(file_path, config, file_hash=file_hash)
+
+            # Facts shared by all handlers (no handler reopens or rehashes the input)
+            context = build_document_context(
+                file_path, config, file_hash=file_hash, classification=classification
+            )
+
             # Route based on file type
             if file_type == "pdf":
-                # Classify PDF first
-                classification = classify_pdf(file_path, config)
-
                 if not classification["allowed"]:
                     # Rejected (e.g., >200 pages)
                     return {
@@ -89,24 +181,38 @@ def process_file_with_retry(
                         "quarantined": True
                     }
 
-                # Route to digital or scanned handler
-                if classification["type"] == "pdf_digital":
-                    result = process_digital_pdf(file_path, output_dir, config, batch_id, skip_enrichment=skip_enrichment)
+                # Route to digital, scanned, or page-level mixed handler
+                route = route_pdf(classification, config)
+
+                if route == "pdf_digital":
+                    result = process_digital_pdf(
+                        file_path, output_dir, config, batch_id,
+                        skip_enrichment=skip_enrichment,
+                        context=context
+                    )
+                elif route == "pdf_mixed":
+                    result = process_mixed_pdf(
+                        file_path, output_dir, config, batch_id, classification,
+                        apply_preprocessing=apply_preprocessing,
+                        skip_enrichment=skip_enrichment,
+                        context=context
+                    )
                 else:  # pdf_scanned
                     result = process_scanned_pdf(
                         file_path, output_dir, config, batch_id,
                         apply_preprocessing=apply_preprocessing,
-                        skip_enrichment=skip_enrichment
+                        skip_enrichment=skip_enrichment,
+                        context=context
                     )
 
             elif file_type == "docx":
-                result = process_docx(file_path, output_dir, config, batch_id, skip_enrichment=skip_enrichment)
+                result = process_docx(file_path, output_dir, config, batch_id, skip_enrichment=skip_enrichment, context=context)
 
             elif file_type in ["xlsx", "csv"]:
-                result = process_xlsx(file_path, output_dir, config, batch_id)
+                result = process_xlsx(file_path, output_dir, config, batch_id, context=context)
 
             elif file_type in ["jpg", "jpeg", "png", "tif", "tiff"]:
-                result = process_image(file_path, output_dir, config, batch_id)
+                result = process_image(file_path, output_dir, config, batch_id, context=context)
 
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
@@ -116,22 +222,12 @@ def process_file_with_retry(
             result["file_name"] = file_path.name
             result["file_type"] = file_type
 
-            # Compute file hash for deduplication (matches inventory hash method)
-            file_hash = compute_file_hash(file_path)
+            # File hash for deduplication (matches inventory hash method)
             result["hash_sha256"] = file_hash
 
-            # If successful, write success marker
-            if result["success"] and result.get("jsonl_path"):
-                write_success_marker(
-                    result["jsonl_path"],
-                    {
-                        "file_hash": file_hash,
-                        "chunks": result.get("chunk_count", 0),
-                        "processor": result.get("processor", ""),
-                        "processing_duration_ms": result.get("processing_duration_ms", 0),
-                        "config_version": config.get("metadata", {}).get("config_version", "")
-                    }
-                )
+            # If successful, commit processing state (ledger + success marker)
+            if commit_state:
+                commit_success_state(result, config)
 
             return result
 
@@ -182,6 +278,61 @@ def batch_scanned_pdfs(scanned_pdfs: List[Path], batch_size: int) -> List[List[P
     return batches
 
 
+def plan_ocr_batches(
+    file_paths: List[Path],
+    page_counts: Dict[Path, Optional[int]],
+    config: Dict
+) -> List[List[Path]]:
+    """
+    Pack files into OlmOCR batches by total page count.
+
+    Fixed-size file groups give wildly uneven batches (ten 2-page letters vs
+    ten 190-page abstracts). Here files are packed first-fit-decreasing into
+    batches of at most olmocr.batch_page_budget pages (and
+    olmocr.max_files_per_batch files), so batch durations are comparable.
+    Because the largest files are placed first, batches come out ordered
+    with the longest documents first and short ones fill the tail.
+
+    A file larger than the budget gets a batch of its own. With
+    batch_page_budget unset, falls back to fixed groups of default_batch_size.
+
+    Args:
+        file_paths: Files to batch (scanned PDFs, images)
+        page_counts: Page count per file from classification (None/missing = 1)
+        config: Configuration dictionary (processors.olmocr)
+
+    Returns:
+        List of batches (each batch is a list of file paths)
+    """
+    olmocr_config = config.get("processors", {}).get("olmocr", {})
+    page_budget = olmocr_config.get("batch_page_budget")
+    if not page_budget:
+        return batch_scanned_pdfs(file_paths, olmocr_config.get("default_batch_size", 10))
+
+    max_files = olmocr_config.get("max_files_per_batch", 50)
+
+    def pages_of(path: Path) -> int:
+        return max(page_counts.get(path) or 1, 1)
+
+    # Largest first; ties keep input order (sorted() is stable)
+    ordered = sorted(file_paths, key=pages_of, reverse=True)
+
+    batches: List[List[Path]] = []
+    batch_pages: List[int] = []
+    for path in ordered:
+        pages = pages_of(path)
+        for i, batch in enumerate(batches):
+            if batch_pages[i] + pages <= page_budget and len(batch) < max_files:
+                batch.append(path)
+                batch_pages[i] += pages
+                break
+        else:
+            batches.append([path])
+            batch_pages.append(pages)
+
+    return batches
+
+
 def process_batch(
     file_paths: List[Path],
     config: Dict,
@@ -210,6 +361,15 @@ def process_batch(
             "quarantine_csv_path": Path | None
         }
     """
+    if config.get("processors", {}).get("pipeline_mode", False):
+        # Staged pipeline: classify / convert / OCR / enrich / commit overlap
+        from utils_pipeline import process_batch_pipelined
+        return process_batch_pipelined(
+            file_paths, config, batch_id,
+            apply_preprocessing=apply_preprocessing,
+            skip_enrichment=skip_enrichment
+        )
+
     paths = get_storage_paths(config)
     output_dir = paths["rag_staging"]
 
@@ -221,25 +381,39 @@ def process_batch(
     print(f"   Files: {len(file_paths)}")
     print(f"{'='*70}")
 
+    # ⚡ Hash all inputs up front in parallel; later classification, marker and
+    # JSONL steps reuse the memoized digests instead of re-reading the files
+    configure_hashing(config)
+    hash_files(file_paths)
+
     # ⚡ Separate digital PDFs, scanned PDFs, and other files for optimized processing
     digital_pdfs = []
     scanned_pdfs = []
+    mixed_pdfs = []
+    image_files = []
     other_files = []
+    classifications = {}  # file_path -> classify_pdf() result (passed to handlers, never recomputed)
 
     for file_path in file_paths:
         # Quick check if it's a PDF
         if file_path.suffix.lower() == '.pdf':
             try:
                 classification = classify_pdf(file_path, config)
+                classifications[file_path] = classification
                 if classification['allowed']:
-                    if classification['type'] == 'pdf_digital':
+                    route = route_pdf(classification, config)
+                    if route == 'pdf_digital':
                         digital_pdfs.append(file_path)
+                    elif route == 'pdf_mixed':
+                        mixed_pdfs.append(file_path)
                     else:  # pdf_scanned
                         scanned_pdfs.append(file_path)
                 else:
                     other_files.append(file_path)
             except:
                 other_files.append(file_path)
+        elif file_path.suffix.lower() in IMAGE_EXTENSIONS:
+            image_files.append(file_path)
         else:
             other_files.append(file_path)
 
@@ -251,20 +425,37 @@ def process_batch(
         print(f"\n⚡ Processing {len(digital_pdfs)} digital PDFs with {digital_workers} parallel workers...")
         print(f"   (Scanned PDFs and other files will be processed sequentially)\n")
 
-        with ThreadPoolExecutor(max_workers=digital_workers) as executor:
+        # Thread or process pool (processors.digital_backend); process workers
+        # return results and the state is committed here in the parent
+        in_process_pool = get_digital_backend(config) == "process"
+
+        # Optional adaptive limit: the pool is sized to the maximum and the
+        # controller gates how many PDFs are in flight (CPU, RSS, throughput)
+        controller = create_concurrency_controller(config, digital_workers)
+        pool_size = controller.max_workers if controller else digital_workers
+
+        with create_digital_executor(config, pool_size) as executor:
             # Submit all digital PDFs
-            future_to_pdf = {
-                executor.submit(
+            future_to_pdf = {}
+            for idx, pdf in enumerate(digital_pdfs, 1):
+                pages = (classifications.get(pdf) or {}).get("total_pages")
+                if controller:
+                    controller.acquire(pages)
+
+                future = executor.submit(
                     process_file_with_retry,
                     pdf,
                     output_dir,
                     config,
                     batch_id,
                     apply_preprocessing,
-                    skip_enrichment
-                ): (idx, pdf)
-                for idx, pdf in enumerate(digital_pdfs, 1)
-            }
+                    skip_enrichment,
+                    classifications.get(pdf),
+                    commit_state=not in_process_pool
+                )
+                if controller:
+                    future.add_done_callback(lambda _, pages=pages: controller.release(pages))
+                future_to_pdf[future] = (idx, pdf)
 
             # Collect results as they complete
             for future in as_completed(future_to_pdf):
@@ -275,32 +466,16 @@ def process_batch(
                     result = future.result()
                     results.append(result)
 
+                    if in_process_pool:
+                        commit_success_state(result, config)
+
                     # Handle quarantine
                     if result.get("quarantined"):
-                        quarantine_dir = paths["quarantine_dir"]
-                        quarantine_location = quarantine_file(
-                            file_path,
-                            quarantine_dir,
-                            result.get("error", "Unknown error"),
-                            retry_count=result.get("retry_count", 0),
-                            processor_attempted=result.get("processor")
-                        )
-
-                        quarantine_records.append({
-                            "file_path": str(file_path),
-                            "file_name": file_path.name,
-                            "file_type": result.get("file_type", "unknown"),
-                            "attempted_processor": result.get("processor", "unknown"),
-                            "error_message": result.get("error", ""),
-                            "retry_count": result.get("retry_count", 0),
-                            "quarantine_location": str(quarantine_location)
-                        })
+                        quarantine_records.append(quarantine_result(result, file_path, config))
                 except Exception as e:
                     print(f"   ❌ Error processing {file_path.name}: {e}")
 
     # ⚡ Process scanned PDFs in batches for 2-3x speedup
-    start_idx = len(digital_pdfs) + 1 if (digital_pdfs and digital_workers > 1) else 1
-
     if scanned_pdfs:
         # Get batching config
         olmocr_config = config.get("processors", {}).get("olmocr", {})
@@ -308,49 +483,50 @@ def process_batch(
         enable_batching = olmocr_config.get("enable_file_batching", True)
 
         if enable_batching and len(scanned_pdfs) > 1:
-            # Process in batches
-            batches = batch_scanned_pdfs(scanned_pdfs, batch_size)
-            print(f"\n⚡ Processing {len(scanned_pdfs)} scanned PDFs in {len(batches)} batch(es) (batch size: {batch_size})")
+            # Process in batches, packed by page count (longest documents first)
+            page_counts = {pdf: (classifications.get(pdf) or {}).get("total_pages") for pdf in scanned_pdfs}
+            batches = plan_ocr_batches(scanned_pdfs, page_counts, config)
+            page_budget = olmocr_config.get("batch_page_budget")
+            sizing = f"page budget: {page_budget}" if page_budget else f"batch size: {batch_size}"
+            print(f"\n⚡ Processing {len(scanned_pdfs)} scanned PDFs in {len(batches)} batch(es) ({sizing})")
             print(f"   (Expected 2-3x speedup from file-level batching)\n")
 
             for batch_idx, pdf_batch in enumerate(batches, 1):
-                print(f"\n📦 Batch {batch_idx}/{len(batches)}: Processing {len(pdf_batch)} scanned PDFs together")
+                batch_pages = sum(max(page_counts.get(pdf) or 1, 1) for pdf in pdf_batch)
+                print(f"\n📦 Batch {batch_idx}/{len(batches)}: Processing {len(pdf_batch)} scanned PDFs together ({batch_pages} pages)")
 
                 try:
+                    batch_contexts = {
+                        pdf: build_document_context(pdf, config, classification=classifications.get(pdf))
+                        for pdf in pdf_batch
+                    }
+
                     batch_results = process_scanned_pdf_batch(
                         pdf_paths=pdf_batch,
                         output_dir=output_dir,
                         config=config,
                         batch_id=batch_id,
                         apply_preprocessing=apply_preprocessing,
-                        skip_enrichment=skip_enrichment
+                        skip_enrichment=skip_enrichment,
+                        contexts=batch_contexts
                     )
 
                     # Process results from batch
                     for result in batch_results:
                         results.append(result)
 
+                        # Commit state exactly like single-file results (never re-OCR)
+                        batch_context = batch_contexts.get(Path(result.get("file_path")))
+                        if batch_context is not None:
+                            result["hash_sha256"] = batch_context["hash_sha256"]
+                        try:
+                            commit_success_state(result, config)
+                        except Exception as e:
+                            print(f"   ⚠️  Could not record success state for {result.get('file_name')}: {e}")
+
                         # Handle quarantine
                         if result.get("quarantined"):
-                            file_path = Path(result.get("file_path"))
-                            quarantine_dir = paths["quarantine_dir"]
-                            quarantine_location = quarantine_file(
-                                file_path,
-                                quarantine_dir,
-                                result.get("error", "Unknown error"),
-                                retry_count=result.get("retry_count", 0),
-                                processor_attempted=result.get("processor")
-                            )
-
-                            quarantine_records.append({
-                                "file_path": str(file_path),
-                                "file_name": file_path.name,
-                                "file_type": result.get("file_type", "unknown"),
-                                "attempted_processor": result.get("processor", "unknown"),
-                                "error_message": result.get("error", ""),
-                                "retry_count": result.get("retry_count", 0),
-                                "quarantine_location": str(quarantine_location)
-                            })
+                            quarantine_records.append(quarantine_result(result, Path(result.get("file_path")), config))
 
                 except Exception as e:
                     print(f"   ❌ BATCH PROCESSING FAILED: {e}")
@@ -367,33 +543,134 @@ def process_batch(
                     config,
                     batch_id,
                     apply_preprocessing,
-                    skip_enrichment
+                    skip_enrichment,
+                    classifications.get(file_path)
                 )
                 results.append(result)
 
                 if result.get("quarantined"):
-                    quarantine_dir = paths["quarantine_dir"]
-                    quarantine_location = quarantine_file(
-                        file_path,
-                        quarantine_dir,
-                        result.get("error", "Unknown error"),
-                        retry_count=result.get("retry_count", 0),
-                        processor_attempted=result.get("processor")
-                    )
+                    quarantine_records.append(quarantine_result(result, file_path, config))
 
-                    quarantine_records.append({
-                        "file_path": str(file_path),
-                        "file_name": file_path.name,
-                        "file_type": result.get("file_type", "unknown"),
-                        "attempted_processor": result.get("processor", "unknown"),
-                        "error_message": result.get("error", ""),
-                        "retry_count": result.get("retry_count", 0),
-                        "quarantine_location": str(quarantine_location)
-                    })
+    # 🔀 Mixed PDFs: scanned pages of several PDFs share one OlmOCR run, the rest goes through Docling
+    if mixed_pdfs:
+        olmocr_config = config.get("processors", {}).get("olmocr", {})
+        if olmocr_config.get("enable_file_batching", True):
+            scanned_counts = {pdf: len(classifications[pdf].get("scanned_pages", [])) for pdf in mixed_pdfs}
+            mixed_batches = plan_ocr_batches(mixed_pdfs, scanned_counts, config)
+        else:
+            mixed_batches = [[pdf] for pdf in mixed_pdfs]
+        print(f"\n🔀 Processing {len(mixed_pdfs)} mixed digital/scanned PDF(s) with page-level routing "
+              f"in {len(mixed_batches)} OlmOCR batch(es)")
 
-    # Process remaining files sequentially (DOCX, XLSX, images, etc.)
-    for idx, file_path in enumerate(other_files, start_idx):
-        print(f"\n[{start_idx + idx}/{len(file_paths)}]")
+        for batch_idx, mixed_batch in enumerate(mixed_batches, 1):
+            print(f"\n📦 Mixed batch {batch_idx}/{len(mixed_batches)}: {len(mixed_batch)} PDF(s)")
+
+            mixed_contexts = {
+                pdf: build_document_context(pdf, config, classification=classifications.get(pdf))
+                for pdf in mixed_batch
+            }
+            batch_results = process_mixed_pdf_batch(
+                mixed_batch,
+                output_dir,
+                config,
+                batch_id,
+                classifications,
+                apply_preprocessing=apply_preprocessing,
+                skip_enrichment=skip_enrichment,
+                contexts=mixed_contexts
+            )
+
+            for file_path, result in zip(mixed_batch, batch_results):
+                result["hash_sha256"] = mixed_contexts[file_path]["hash_sha256"]
+                results.append(result)
+
+                try:
+                    commit_success_state(result, config)
+                except Exception as e:
+                    print(f"   ⚠️  Could not record success state for {file_path.name}: {e}")
+
+                if result.get("quarantined"):
+                    quarantine_records.append(quarantine_result(result, file_path, config))
+
+    # ⚡ Batch images into shared OlmOCR runs (model/vLLM startup paid once per batch)
+    olmocr_config = config.get("processors", {}).get("olmocr", {})
+    if image_files and olmocr_config.get("enable_file_batching", True) and len(image_files) > 1:
+        image_batches = plan_ocr_batches(image_files, {}, config)  # One page per image
+        print(f"\n⚡ Processing {len(image_files)} images in {len(image_batches)} OlmOCR batch(es)")
+
+        for batch_idx, image_batch in enumerate(image_batches, 1):
+            print(f"\n📦 Image batch {batch_idx}/{len(image_batches)}: {len(image_batch)} images")
+
+            image_contexts = {image: build_document_context(image, config) for image in image_batch}
+            batch_results = process_image_batch(image_batch, output_dir, config, batch_id, contexts=image_contexts)
+
+            for result in batch_results:
+                file_path = Path(result["file_path"])
+                result["hash_sha256"] = image_contexts[file_path]["hash_sha256"]
+                results.append(result)
+
+                try:
+                    commit_success_state(result, config)
+                except Exception as e:
+                    print(f"   ⚠️  Could not record success state for {file_path.name}: {e}")
+
+                if result.get("quarantined"):
+                    quarantine_records.append(quarantine_result(result, file_path, config))
+    else:
+        # Batching disabled or a single image: regular per-file path
+        other_files.extend(image_files)
+
+    # Digital PDFs not handled by the parallel pool above (single file or 1 worker)
+    if not (digital_pdfs and len(digital_pdfs) > 1 and digital_workers > 1):
+        other_files = digital_pdfs + other_files
+
+    # ⚡ DOCX/XLSX/CSV are CPU-only and independent: run them in their own pool
+    office_workers = config.get("processors", {}).get("office_workers", 4)
+    office_files = [f for f in other_files if f.suffix.lower() in OFFICE_EXTENSIONS]
+
+    if len(office_files) > 1 and office_workers > 1:
+        other_files = [f for f in other_files if f.suffix.lower() not in OFFICE_EXTENSIONS]
+        in_process_pool = get_office_backend(config) == "process"
+
+        print(f"\n⚡ Processing {len(office_files)} DOCX/XLSX/CSV file(s) with {office_workers} parallel workers...")
+
+        with create_office_executor(config, office_workers) as executor:
+            future_to_file = {
+                executor.submit(
+                    process_file_with_retry,
+                    file_path,
+                    output_dir,
+                    config,
+                    batch_id,
+                    apply_preprocessing,
+                    skip_enrichment,
+                    None,
+                    commit_state=not in_process_pool
+                ): file_path
+                for file_path in office_files
+            }
+
+            for done_idx, future in enumerate(as_completed(future_to_file), 1):
+                file_path = future_to_file[future]
+                print(f"\n[{done_idx}/{len(office_files)}] (office pool) {file_path.name}")
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   ❌ Error processing {file_path.name}: {e}")
+                    continue
+
+                results.append(result)
+
+                if in_process_pool:
+                    commit_success_state(result, config)
+
+                if result.get("quarantined"):
+                    quarantine_records.append(quarantine_result(result, file_path, config))
+
+    # Process remaining files sequentially (single images, rejected PDFs, etc.)
+    for idx, file_path in enumerate(other_files, 1):
+        print(f"\n[{idx}/{len(other_files)}]")
 
         result = process_file_with_retry(
             file_path,
@@ -401,31 +678,69 @@ def process_batch(
             config,
             batch_id,
             apply_preprocessing,
-            skip_enrichment
+            skip_enrichment,
+            classifications.get(file_path)
         )
 
         results.append(result)
 
         # Handle quarantine
         if result.get("quarantined"):
-            quarantine_dir = paths["quarantine_dir"]
-            quarantine_location = quarantine_file(
-                file_path,
-                quarantine_dir,
-                result.get("error", "Unknown error"),
-                retry_count=result.get("retry_count", 0),
-                processor_attempted=result.get("processor")
-            )
+            quarantine_records.append(quarantine_result(result, file_path, config))
+
+    return finalize_batch(results, quarantine_records, config, batch_id)
 
-            quarantine_records.append({
-                "file_path": str(file_path),
-                "file_name": file_path.name,
-                "file_type": result.get("file_type", "unknown"),
-                "attempted_processor": result.get("processor", "unknown"),
-                "error_message": result.get("error", ""),
-                "retry_count": result.get("retry_count", 0),
-                "quarantine_location": str(quarantine_location)
-            })
+
+def quarantine_result(result: Dict, file_path: Path, config: Dict) -> Dict:
+    """
+    Quarantine a failed file and build its quarantine CSV record.
+
+    Args:
+        result: Failed result dictionary (with "quarantined" set)
+        file_path: Path to input file
+        config: Configuration dictionary
+
+    Returns:
+        Quarantine record for write_quarantine_csv()
+    """
+    quarantine_location = quarantine_file(
+        file_path,
+        get_storage_paths(config)["quarantine_dir"],
+        result.get("error", "Unknown error"),
+        retry_count=result.get("retry_count", 0),
+        processor_attempted=result.get("processor")
+    )
+
+    return {
+        "file_path": str(file_path),
+        "file_name": file_path.name,
+        "file_type": result.get("file_type", "unknown"),
+        "attempted_processor": result.get("processor", "unknown"),
+        "error_message": result.get("error", ""),
+        "retry_count": result.get("retry_count", 0),
+        "quarantine_location": str(quarantine_location)
+    }
+
+
+def finalize_batch(
+    results: List[Dict],
+    quarantine_records: List[Dict],
+    config: Dict,
+    batch_id: str
+) -> Dict:
+    """
+    Write the batch manifest and quarantine CSV, print and return the summary.
+
+    Args:
+        results: Per-file result dictionaries
+        quarantine_records: Records from quarantine_result()
+        config: Configuration dictionary
+        batch_id: Batch identifier
+
+    Returns:
+        Batch results dictionary (see process_batch)
+    """
+    paths = get_storage_paths(config)
 
     # Write manifest
     manifest_dir = paths["manifest_dir"]
@@ -1,32 +1,42 @@
 #!/usr/bin/env python3
 """
-utils_state.py - Processing state management using _SUCCESS markers
+utils_state.py - Processing state management
 
-Tracks processed files by reading _SUCCESS markers as the source of truth.
+Tracks processed files in an append-only, compacted ledger under the state
+directory (see ProcessedLedger). Per-file _SUCCESS markers are still written
+as a secondary artifact and remain the fallback when the ledger is disabled.
 Provides fast filtering to avoid reprocessing files.
 """
 
 from pathlib import Path
 from typing import Dict, List, Set, Optional
+import atexit
+import bisect
 import json
+import os
+import threading
 import time
 
 
 def get_processed_hashes(
     jsonl_dir: Path,
     use_cache: bool = True,
-    cache_path: Optional[Path] = None
+    cache_path: Optional[Path] = None,
+    ledger: Optional["ProcessedLedger"] = None
 ) -> Set[str]:
     """
     Get set of hashes for successfully processed files.
 
-    Scans _SUCCESS markers in the JSONL directory to determine which files
-    have been successfully processed. Optionally caches results for performance.
+    With a ledger, reads the processed-state ledger (snapshot + recent
+    segments), seeding it from existing _SUCCESS markers on first use.
+    Otherwise scans _SUCCESS markers in the JSONL directory, optionally
+    caching results for performance.
 
     Args:
         jsonl_dir: Directory containing JSONL outputs and _SUCCESS markers
-        use_cache: Whether to use cached index (default: True)
+        use_cache: Whether to use cached index (default: True, marker scan only)
         cache_path: Path to cache file (default: auto-detect)
+        ledger: Processed-state ledger (from get_ledger_for_config)
 
     Returns:
         Set of SHA256 hashes for processed files
@@ -35,6 +45,9 @@ def get_processed_hashes(
         >>> processed = get_processed_hashes(Path("/mnt/gcs/.../jsonl"))
         >>> print(f"Found {len(processed)} processed files")
     """
+    if ledger is not None:
+        return ledger.load(bootstrap_jsonl_dir=jsonl_dir).hashes()
+
     # Default cache path
     if cache_path is None:
         cache_path = jsonl_dir.parent / "state" / "processed_hashes.json"
@@ -95,19 +108,21 @@ def filter_unprocessed_files(
 def clear_processed_state(
     jsonl_dir: Path,
     hash_sha256: Optional[str] = None,
-    cache_path: Optional[Path] = None
+    cache_path: Optional[Path] = None,
+    ledger: Optional["ProcessedLedger"] = None
 ) -> int:
     """
     Clear processing state for reprocessing files.
 
     Deletes _SUCCESS markers to allow files to be reprocessed.
-    Also clears the cache.
+    Also clears the cache, and records tombstones in the ledger if given.
 
     Args:
         jsonl_dir: Directory containing _SUCCESS markers
         hash_sha256: If provided, only clear this specific hash (prefix match supported).
                      If None, clear all markers.
         cache_path: Path to cache file (default: auto-detect)
+        ledger: Processed-state ledger (from get_ledger_for_config)
 
     Returns:
         Number of markers deleted
@@ -122,6 +137,9 @@ def clear_processed_state(
     if cache_path is None:
         cache_path = jsonl_dir.parent / "state" / "processed_hashes.json"
 
+    if ledger is not None:
+        return _clear_ledger_state(jsonl_dir, ledger, hash_sha256, cache_path)
+
     deleted = 0
 
     if hash_sha256:
@@ -156,6 +174,51 @@ def clear_processed_state(
     return deleted
 
 
+def _clear_ledger_state(
+    jsonl_dir: Path,
+    ledger: "ProcessedLedger",
+    hash_sha256: Optional[str],
+    cache_path: Path
+) -> int:
+    """
+    Clear state via the ledger: prefix lookup, tombstones, then marker cleanup.
+
+    Markers are located from the ledger's recorded JSONL paths, so clearing a
+    single hash no longer reads every marker in the directory.
+    """
+    ledger.load(bootstrap_jsonl_dir=jsonl_dir)
+
+    if hash_sha256:
+        matches = ledger.find_prefix(hash_sha256)
+        for file_hash in matches:
+            jsonl_path = (ledger.get(file_hash) or {}).get("jsonl_path")
+            if jsonl_path:
+                marker = Path(jsonl_path).parent / f"{Path(jsonl_path).stem}_SUCCESS"
+                try:
+                    marker.unlink()
+                except FileNotFoundError:
+                    pass
+        if matches:
+            ledger.clear(matches)
+        deleted = len(matches)
+    else:
+        deleted = len(ledger)
+        ledger.clear()
+        for marker in jsonl_dir.glob("*_SUCCESS"):
+            try:
+                marker.unlink()
+            except Exception:
+                continue
+
+    if cache_path.exists():
+        try:
+            cache_path.unlink()
+        except Exception:
+            pass
+
+    return deleted
+
+
 def _load_cache(cache_path: Path, jsonl_dir: Path) -> Optional[Set[str]]:
     """
     Load cached hash set if valid.
@@ -210,3 +273,374 @@ def _write_cache(cache_path: Path, hashes: Set[str], jsonl_dir: Path) -> None:
     except Exception:
         # Cache write failure is non-fatal, just slower next time
         pass
+
+
+# =============================================================================
+# Processed-state ledger
+# =============================================================================
+#
+# Layout under {state_dir}/ledger/:
+#   snapshot.json          Compacted state: {hash: {jsonl_path, processor, timestamp}}
+#   segments/*.jsonl       Immutable segments written since the last compaction
+#
+# Segments are never appended to in place (each flush creates a new object),
+# which is cheap on gcsfuse; compaction folds them into the snapshot. Reads
+# cost one snapshot read plus a listing of the (few) uncompacted segments,
+# instead of a glob + JSON parse of every _SUCCESS marker.
+#
+# _SUCCESS markers are still written next to each JSONL as a secondary artifact.
+
+_LEDGER_SNAPSHOT = "snapshot.json"
+_LEDGER_SEGMENTS = "segments"
+
+# Default for state.ledger.compact_threshold (keep in sync with config/default.yaml)
+DEFAULT_COMPACT_THRESHOLD = 200
+
+_ledgers: Dict[Path, "ProcessedLedger"] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger_dir(config: Dict) -> Optional[Path]:
+    """
+    Resolve the processed-state ledger directory.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        {state_dir}/ledger, or None if the ledger is disabled (state.ledger.enabled)
+    """
+    if not config.get("state", {}).get("ledger", {}).get("enabled", True):
+        return None
+
+    from utils_config import get_storage_paths
+    return get_storage_paths(config)["state_dir"] / "ledger"
+
+
+def get_ledger(
+    ledger_dir: Path,
+    flush_every: int = 1,
+    compact_threshold: int = DEFAULT_COMPACT_THRESHOLD
+) -> "ProcessedLedger":
+    """
+    Get the process-wide ledger instance for a directory (loaded on first use).
+
+    Callers should use get_ledger_for_config(), which applies the
+    state.ledger settings before the ledger is loaded (and maybe compacted).
+
+    Args:
+        ledger_dir: Ledger directory (from get_ledger_dir)
+        flush_every: Entries buffered before a segment is written (1 = durable per file)
+        compact_threshold: Compact on load once this many segments have accumulated
+
+    Returns:
+        ProcessedLedger instance shared by all threads in this process
+    """
+    with _ledgers_lock:
+        ledger = _ledgers.get(ledger_dir)
+        if ledger is None:
+            ledger = ProcessedLedger(ledger_dir, flush_every=flush_every, compact_threshold=compact_threshold)
+            _ledgers[ledger_dir] = ledger
+            # Buffered entries (flush_every > 1) must not be lost on exit
+            atexit.register(ledger.flush)
+        return ledger
+
+
+def get_ledger_for_config(config: Dict) -> Optional["ProcessedLedger"]:
+    """
+    Get the ledger configured by the `state.ledger` section.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        ProcessedLedger, or None if the ledger is disabled
+    """
+    ledger_dir = get_ledger_dir(config)
+    if ledger_dir is None:
+        return None
+
+    ledger_config = config.get("state", {}).get("ledger", {})
+    flush_every = max(1, ledger_config.get("flush_every", 1))
+    compact_threshold = ledger_config.get("compact_threshold", DEFAULT_COMPACT_THRESHOLD)
+
+    ledger = get_ledger(ledger_dir, flush_every=flush_every, compact_threshold=compact_threshold)
+    # Config wins even if the instance was first created with other settings
+    ledger.flush_every = flush_every
+    ledger.compact_threshold = compact_threshold
+    return ledger
+
+
+class ProcessedLedger:
+    """
+    Append-only, compacted ledger of successfully processed file hashes.
+
+    Membership is O(1) (in-memory set); prefix lookups use bisect over the
+    sorted hash list. Clears are recorded as tombstones and applied on compaction.
+    """
+
+    def __init__(self, ledger_dir: Path, flush_every: int = 1, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        self.ledger_dir = ledger_dir
+        self.segments_dir = ledger_dir / _LEDGER_SEGMENTS
+        self.snapshot_path = ledger_dir / _LEDGER_SNAPSHOT
+        self.flush_every = max(1, flush_every)
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict] = {}
+        self._sorted_hashes: Optional[List[str]] = None
+        self._buffer: List[Dict] = []
+        self._segment_seq = 0
+        self._loaded = False
+
+    # -- Loading -------------------------------------------------------------
+
+    def _list_segments(self) -> List[Path]:
+        """List segment files in write order (names start with a ns timestamp)."""
+        try:
+            with os.scandir(self.segments_dir) as entries:
+                names = sorted(e.name for e in entries if e.name.endswith(".jsonl"))
+        except FileNotFoundError:
+            return []
+        return [self.segments_dir / name for name in names]
+
+    def _apply(self, op: Dict) -> None:
+        """Apply one ledger operation to the in-memory state."""
+        kind = op.get("op")
+        if kind == "add" and op.get("hash"):
+            self._entries[op["hash"]] = {
+                "jsonl_path": op.get("jsonl_path"),
+                "processor": op.get("processor"),
+                "timestamp": op.get("timestamp")
+            }
+        elif kind == "clear":
+            if op.get("all"):
+                self._entries.clear()
+            elif op.get("hash"):
+                self._entries.pop(op["hash"], None)
+        self._sorted_hashes = None
+
+    def load(self, bootstrap_jsonl_dir: Optional[Path] = None) -> "ProcessedLedger":
+        """
+        Load snapshot + segments (once per process).
+
+        If there is no snapshot yet and bootstrap_jsonl_dir is given, it is
+        seeded once from the existing _SUCCESS markers (migration). Segments
+        written before the first load (record_success() before load()) are
+        applied on top, so they never hide the markers.
+
+        Args:
+            bootstrap_jsonl_dir: JSONL directory whose markers seed a new ledger
+
+        Returns:
+            self
+        """
+        with self._lock:
+            if self._loaded:
+                return self
+
+            segments = self._list_segments()
+
+            if self.snapshot_path.exists():
+                try:
+                    snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+                    self._entries = snapshot.get("entries", {})
+                except Exception:
+                    print(f"⚠️  Ledger snapshot unreadable, rebuilding from segments: {self.snapshot_path}")
+                    self._entries = {}
+            elif bootstrap_jsonl_dir is not None:
+                self._bootstrap_from_markers(bootstrap_jsonl_dir)
+
+            for segment in segments:
+                self._read_segment(segment)
+
+            # Operations recorded before this load and not flushed yet
+            for op in self._buffer:
+                self._apply(op)
+
+            self._sorted_hashes = None
+            self._loaded = True
+
+            if len(segments) >= self.compact_threshold:
+                self.compact()
+
+            return self
+
+    def _read_segment(self, segment: Path) -> None:
+        """Apply all operations in a segment (truncated trailing lines are skipped)."""
+        try:
+            for line in segment.read_text(encoding="utf-8").splitlines():
+                try:
+                    self._apply(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        except OSError:
+            pass
+
+    def _bootstrap_from_markers(self, jsonl_dir: Path) -> None:
+        """Seed the ledger from existing _SUCCESS markers and write the first snapshot."""
+        print(f"🗃️  Migrating _SUCCESS markers into processed-state ledger: {self.ledger_dir}")
+
+        for marker in jsonl_dir.glob("*_SUCCESS"):
+            try:
+                data = json.loads(marker.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if data.get("file_hash"):
+                self._entries[data["file_hash"]] = {
+                    "jsonl_path": data.get("file_path"),
+                    "processor": data.get("processor"),
+                    "timestamp": data.get("timestamp")
+                }
+
+        self._write_snapshot()
+        print(f"   Migrated {len(self._entries)} processed file(s)")
+
+    # -- Queries -------------------------------------------------------------
+
+    def __contains__(self, file_hash: str) -> bool:
+        return file_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hashes(self) -> Set[str]:
+        """Set of processed hashes (a copy)."""
+        with self._lock:
+            return set(self._entries)
+
+    def get(self, file_hash: str) -> Optional[Dict]:
+        """Ledger metadata for a processed hash, or None."""
+        return self._entries.get(file_hash)
+
+    def find_prefix(self, prefix: str) -> List[str]:
+        """
+        Find processed hashes starting with a prefix.
+
+        Args:
+            prefix: Hash prefix (e.g. the 16-char doc_id)
+
+        Returns:
+            Matching full hashes
+        """
+        with self._lock:
+            if self._sorted_hashes is None:
+                self._sorted_hashes = sorted(self._entries)
+            sorted_hashes = self._sorted_hashes
+
+        start = bisect.bisect_left(sorted_hashes, prefix)
+        matches = []
+        for file_hash in sorted_hashes[start:]:
+            if not file_hash.startswith(prefix):
+                break
+            matches.append(file_hash)
+        return matches
+
+    # -- Writes --------------------------------------------------------------
+
+    def record_success(self, file_hash: str, metadata: Optional[Dict] = None) -> None:
+        """
+        Record a successfully processed file.
+
+        Args:
+            file_hash: SHA256 of the input file
+            metadata: Optional {"jsonl_path", "processor", "timestamp"}
+        """
+        metadata = metadata or {}
+        op = {
+            "op": "add",
+            "hash": file_hash,
+            "jsonl_path": metadata.get("jsonl_path"),
+            "processor": metadata.get("processor"),
+            "timestamp": metadata.get("timestamp") or time.time()
+        }
+        with self._lock:
+            self._apply(op)
+            self._buffer.append(op)
+            if len(self._buffer) >= self.flush_every:
+                self.flush()
+
+    def clear(self, file_hashes: Optional[List[str]] = None) -> None:
+        """
+        Record tombstones for hashes (or for everything if file_hashes is None).
+
+        Args:
+            file_hashes: Full hashes to clear, or None to clear all
+        """
+        with self._lock:
+            if file_hashes is None:
+                ops = [{"op": "clear", "all": True}]
+            else:
+                ops = [{"op": "clear", "hash": h} for h in file_hashes]
+            for op in ops:
+                self._apply(op)
+            self._buffer.extend(ops)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered operations as a new immutable segment."""
+        with self._lock:
+            if not self._buffer:
+                return
+
+            self.segments_dir.mkdir(parents=True, exist_ok=True)
+            self._segment_seq += 1
+            name = f"{time.time_ns():020d}_{os.getpid()}_{self._segment_seq:06d}.jsonl"
+
+            # Write under a temp name and rename, so readers never see a partial segment
+            tmp_path = self.segments_dir / f".{name}.tmp"
+            tmp_path.write_text(
+                "".join(json.dumps(op) + "\n" for op in self._buffer),
+                encoding="utf-8"
+            )
+            os.replace(tmp_path, self.segments_dir / name)
+            self._buffer = []
+
+    def _write_snapshot(self) -> None:
+        """Atomically write the compacted snapshot."""
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+        snapshot = {
+            "built_at": time.time(),
+            "count": len(self._entries),
+            "entries": self._entries
+        }
+        tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(snapshot, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.snapshot_path)
+
+    def compact(self) -> int:
+        """
+        Fold all segments into the snapshot and delete them.
+
+        Only segments that were read are deleted, so segments written
+        concurrently by another process survive until the next compaction.
+
+        Returns:
+            Number of segments folded
+        """
+        with self._lock:
+            self.flush()
+            segments = self._list_segments()
+
+            # Re-read from disk so the snapshot reflects other writers too
+            entries = {}
+            if self.snapshot_path.exists():
+                try:
+                    entries = json.loads(self.snapshot_path.read_text(encoding="utf-8")).get("entries", {})
+                except Exception:
+                    entries = {}
+
+            self._entries = entries
+            for segment in segments:
+                self._read_segment(segment)
+
+            self._write_snapshot()
+
+            for segment in segments:
+                try:
+                    segment.unlink()
+                except FileNotFoundError:
+                    pass
+
+            self._sorted_hashes = None
+            return len(segments)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+utils_watch.py - Continuous watch mode (--auto --watch)
+
+Detects new or changed files in the input bucket and processes them in
+micro-batches, so new filings become searchable within minutes instead of
+at the next cron run.
+
+- Detection: stat-diff polling of the input tree (utils_discovery's parallel
+  scandir), which is the only reliable signal on gcsfuse. Where inotify is
+  available (optional inotify_simple package, local disks) events only wake
+  the poller early; polling remains the source of truth.
+- Stability: a new/changed file is queued only once its size and mtime are
+  unchanged across watch.stable_polls polls, so half-uploaded files are skipped.
+- Micro-batches: queued files are flushed when watch.max_batch_size is
+  reached or the oldest has waited watch.max_latency_seconds.
+- Warm resources: worker pools are kept alive between batches
+  (utils_workers.keep_pools_warm), so Docling converters and embedding
+  models load once per daemon, not once per batch. With the OCR server
+  backend the OlmOCR model is started up front and stays resident too.
+- Files whose content hash is already in the processed-state ledger
+  (e.g. touched but unchanged) are dropped before processing.
+- Seeding: the tree is listed before the startup batch runs. Files in that
+  listing that are not part of the startup batch are queued (the ledger
+  check drops the ones already processed), so files missing from a stale
+  inventory or uploaded during a long startup batch are never skipped.
+- Failures: a micro-batch that raises is put back in the queue and retried
+  on the next flush; a file is given up after watch.max_batch_attempts
+  failures (until it changes again).
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils_batch import generate_batch_id, verify_gcs_mount
+from utils_config import get_storage_paths
+from utils_discovery import iter_discovered_files
+from utils_hash import configure_hashing, hash_files
+from utils_ocr_server import get_ocr_backend, get_ocr_server
+from utils_state import get_ledger_for_config
+from utils_workers import keep_pools_warm, shutdown_warm_pools
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+
+def _snapshot(input_dir: Path, config: Dict, extensions: Optional[Set[str]]) -> Dict[Path, Tuple[int, int]]:
+    """Current {path: (size_bytes, mtime_ns)} for all supported files."""
+    workers = config.get("inventory", {}).get("discovery_workers", 16)
+    return {
+        f.path: (f.size_bytes, f.mtime_ns)
+        for f in iter_discovered_files(input_dir, extensions=extensions, max_workers=workers)
+    }
+
+
+class _InotifyWaker:
+    """Wakes the poll loop early on local filesystem events (best effort)."""
+
+    def __init__(self, input_dir: Path):
+        self._inotify = INotify()
+        self._wake = threading.Event()
+        mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+        # Subdirectories are picked up on the next poll; the root watch is a hint only
+        self._inotify.add_watch(str(input_dir), mask)
+        threading.Thread(target=self._run, name="watch-inotify", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            if self._inotify.read(timeout=None):
+                self._wake.set()
+
+    def wait(self, timeout: float) -> None:
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+
+class FileWatcher:
+    """
+    Stat-diff change detector with upload stability and micro-batching.
+
+    Args:
+        input_dir: Directory to watch (recursively)
+        config: Configuration dictionary (watch section)
+        extensions: Extensions to watch (default: all supported)
+    """
+
+    def __init__(self, input_dir: Path, config: Dict, extensions: Optional[Set[str]] = None):
+        watch_config = config.get("watch", {})
+        self.input_dir = input_dir
+        self.config = config
+        self.extensions = extensions
+        self.stable_polls = watch_config.get("stable_polls", 1)
+        self.max_batch_size = watch_config.get("max_batch_size", 20)
+        self.max_latency_seconds = watch_config.get("max_latency_seconds", 300)
+        self.max_batch_attempts = watch_config.get("max_batch_attempts", 3)
+
+        self._known: Dict[Path, Tuple[int, int]] = {}
+        self._candidates: Dict[Path, Tuple[Tuple[int, int], int]] = {}  # path -> (stat, polls unchanged)
+        self._pending: Dict[Path, float] = {}  # path -> time queued
+        self._failures: Dict[Path, int] = {}  # path -> failed batch attempts
+
+    def seed(self, accounted: Optional[Iterable[Path]] = None) -> int:
+        """
+        Record the current tree as seen.
+
+        Files not in accounted are also queued, so anything the caller is not
+        already processing (e.g. missing from a stale inventory) still goes
+        through the processed-ledger check in run_watch().
+
+        Args:
+            accounted: Files the caller processes itself (e.g. the startup batch);
+                       None = treat the whole tree as already handled
+
+        Returns:
+            Number of files queued
+        """
+        self._known = _snapshot(self.input_dir, self.config, self.extensions)
+        if accounted is None:
+            return 0
+
+        # Snapshot paths sit under the resolved input root (iter_discovered_files)
+        # and are compared as-is; only the small startup batch is resolved
+        accounted = {Path(p).resolve() for p in accounted}
+        now = time.time()
+        for path in self._known:
+            if path not in accounted:
+                self._pending[path] = now
+        return len(self._pending)
+
+    def poll(self) -> int:
+        """
+        Diff the tree against the last poll and queue files that have settled.
+
+        Returns:
+            Number of files newly queued
+        """
+        current = _snapshot(self.input_dir, self.config, self.extensions)
+        queued = 0
+
+        for path, stat in current.items():
+            if self._known.get(path) == stat:
+                continue
+            self._failures.pop(path, None)  # Changed content gets a fresh set of attempts
+
+            previous = self._candidates.get(path)
+            if previous and previous[0] == stat:
+                polls = previous[1] + 1
+            else:
+                polls = 0
+
+            if polls >= self.stable_polls:
+                self._candidates.pop(path, None)
+                self._known[path] = stat
+                if path not in self._pending:
+                    self._pending[path] = time.time()
+                    queued += 1
+            else:
+                self._candidates[path] = (stat, polls)
+
+        # Forget deleted files
+        for path in set(self._known) - set(current):
+            del self._known[path]
+        for path in set(self._candidates) - set(current):
+            del self._candidates[path]
+        for path in set(self._pending) - set(current):
+            del self._pending[path]
+
+        return queued
+
+    def take_batch(self, force: bool = False) -> List[Path]:
+        """
+        Return a micro-batch if one is due (size reached or latency expired).
+
+        Args:
+            force: Flush whatever is pending
+
+        Returns:
+            Files to process now (oldest first), possibly empty
+        """
+        if not self._pending:
+            return []
+
+        oldest = min(self._pending.values())
+        due = (
+            force
+            or len(self._pending) >= self.max_batch_size
+            or time.time() - oldest >= self.max_latency_seconds
+        )
+        if not due:
+            return []
+
+        batch = sorted(self._pending, key=self._pending.get)[:self.max_batch_size]
+        for path in batch:
+            del self._pending[path]
+        return batch
+
+    @property
+    def known_count(self) -> int:
+        """Number of files currently tracked."""
+        return len(self._known)
+
+    def requeue(self, files: List[Path]) -> List[Path]:
+        """
+        Put the files of a failed micro-batch back in the queue.
+
+        Args:
+            files: Files of the failed batch
+
+        Returns:
+            Files given up on (max_batch_attempts reached; retried if they change)
+        """
+        given_up = []
+        now = time.time()
+        for path in files:
+            self._failures[path] = self._failures.get(path, 0) + 1
+            if self._failures[path] >= self.max_batch_attempts:
+                given_up.append(path)
+            elif path in self._known:
+                self._pending[path] = now
+        return given_up
+
+    def next_flush_in(self) -> Optional[float]:
+        """Seconds until the pending queue hits its latency deadline (None if empty)."""
+        if not self._pending:
+            return None
+        return max(0.0, self.max_latency_seconds - (time.time() - min(self._pending.values())))
+
+
+def get_watch_filters(
+    file_types: Optional[str],
+    pdf_type: Optional[str],
+    config: Dict
+) -> Tuple[Optional[Set[str]], Optional[Callable[[Path], bool]]]:
+    """
+    Turn the --file-types / --pdf-type CLI filters into watch filters.
+
+    Args:
+        file_types: Comma-separated file types (e.g. "pdf,docx"), or None for all
+        pdf_type: "digital" or "scanned" to keep only PDFs of that classification
+                  (other requested file types pass), or None
+        config: Configuration dictionary (classification settings)
+
+    Returns:
+        Tuple of (extensions for run_watch, file_filter for run_watch)
+    """
+    extensions = None
+    if file_types:
+        extensions = {"." + ft.strip().lower().lstrip(".") for ft in file_types.split(",") if ft.strip()}
+        if ".jpg" in extensions:
+            extensions.add(".jpeg")
+        if ".tif" in extensions:
+            extensions.add(".tiff")
+
+    file_filter = None
+    if pdf_type:
+        from utils_classify import classify_pdf
+
+        classification = f"pdf_{pdf_type}"  # "digital" -> "pdf_digital"
+
+        def file_filter(path: Path) -> bool:
+            if path.suffix.lower() != ".pdf":
+                return True
+            return classify_pdf(path, config)["type"] == classification
+
+    return extensions, file_filter
+
+
+def _drop_processed(files: List[Path], config: Dict) -> List[Path]:
+    """Remove files whose content hash is already recorded as processed."""
+    ledger = get_ledger_for_config(config)
+    if ledger is None:
+        return files
+
+    ledger.load()
+    digests = hash_files(files)
+    return [f for f in files if not digests.get(f) or digests[f] not in ledger]
+
+
+def _passes_filter(path: Path, file_filter: Callable[[Path], bool]) -> bool:
+    """Apply file_filter; files it can't judge (e.g. unreadable PDFs) go to processing, which quarantines them."""
+    try:
+        return file_filter(path)
+    except Exception as e:
+        print(f"   ⚠️  Watch filter failed for {path.name}: {e}")
+        return True
+
+
+def _run_micro_batch(
+    watcher: FileWatcher,
+    files: List[Path],
+    process_fn: Callable[[List[Path], str], Dict]
+) -> None:
+    """Run one micro-batch; on failure requeue its files and keep watching."""
+    batch_id = generate_batch_id()
+    print(f"👀 Processing micro-batch {batch_id}: {len(files)} file(s)")
+    try:
+        process_fn(files, batch_id)
+    except Exception as e:
+        print(f"   ❌ Micro-batch {batch_id} failed: {type(e).__name__}: {e}")
+        given_up = watcher.requeue(files)
+        if len(given_up) < len(files):
+            print(f"   🔁 Requeued {len(files) - len(given_up)} file(s)")
+        for path in given_up:
+            print(f"   ⚠️  Giving up on {path.name} after {watcher.max_batch_attempts} failed attempt(s) "
+                  f"(retried if it changes)")
+
+
+def run_watch(
+    input_dir: Path,
+    config: Dict,
+    process_fn: Callable[[List[Path], str], Dict],
+    interval_seconds: Optional[int] = None,
+    extensions: Optional[Set[str]] = None,
+    max_batches: Optional[int] = None,
+    initial_files: Optional[List[Path]] = None,
+    file_filter: Optional[Callable[[Path], bool]] = None
+) -> None:
+    """
+    Watch input_dir and process new/changed files until interrupted.
+
+    Args:
+        input_dir: Input bucket directory
+        config: Configuration dictionary
+        process_fn: Called as process_fn(file_paths, batch_id) for each micro-batch
+                    (normally a wrapper around utils_processor.process_batch)
+        interval_seconds: Seconds between polls (default: watch.default_interval_seconds)
+        extensions: Extensions to watch (default: all supported), e.g. from --file-types
+        max_batches: Stop after this many micro-batches (None = run forever)
+        initial_files: Startup batch (e.g. unprocessed inventory files), processed
+                       first; the tree is seeded before it runs
+        file_filter: Extra predicate a queued file must pass (e.g. the --pdf-type
+                     classification); applied after the processed-ledger check
+    """
+    watch_config = config.get("watch", {})
+    interval = interval_seconds or watch_config.get("default_interval_seconds", 60)
+    paths = get_storage_paths(config)
+
+    watcher = FileWatcher(input_dir, config, extensions=extensions)
+    waker = None
+    if INotify is not None and watch_config.get("use_inotify", True):
+        try:
+            waker = _InotifyWaker(input_dir)
+        except OSError as e:
+            print(f"   ⚠️  inotify unavailable ({e}); polling only")
+
+    configure_hashing(config)
+    keep_pools_warm(True)
+    if get_ocr_backend(config) == "server":
+        get_ocr_server(config).ensure_running()
+
+    print(f"\n👀 Watch mode: {input_dir}")
+    print(f"   Poll interval: {interval}s | Batch: ≤{watcher.max_batch_size} files or ≤{watcher.max_latency_seconds}s wait"
+          f"{' | inotify wake-ups' if waker else ''}")
+    # Seed before the startup batch, so uploads during it are picked up by the first poll
+    queued = watcher.seed(accounted=initial_files or [])
+    print(f"   Seeded with {watcher.known_count:,} existing file(s), {queued:,} not in the startup batch queued for "
+          f"a processed check; press Ctrl+C to stop\n")
+
+    batches_run = 0
+    try:
+        if initial_files:
+            _run_micro_batch(watcher, list(initial_files), process_fn)
+            batches_run += 1
+
+        while max_batches is None or batches_run < max_batches:
+            # Sleep until the next poll, or earlier if a pending batch hits its deadline
+            flush_in = watcher.next_flush_in()
+            wait = interval if flush_in is None else min(interval, flush_in)
+            if waker:
+                waker.wait(wait)
+            else:
+                time.sleep(wait)
+
+            if watch_config.get("verify_mount_health", True):
+                verify_gcs_mount(paths["gcs_mount_base"])
+
+            queued = watcher.poll()
+            if queued:
+                print(f"👀 {queued} new/changed file(s) queued")
+
+            while True:
+                batch = watcher.take_batch()
+                if not batch:
+                    break
+
+                batch = _drop_processed(batch, config)
+                if file_filter is not None:
+                    batch = [f for f in batch if _passes_filter(f, file_filter)]
+                if not batch:
+                    continue
+
+                _run_micro_batch(watcher, batch, process_fn)
+                batches_run += 1
+
+    except KeyboardInterrupt:
+        print("\n👋 Watch mode stopped")
+    finally:
+        keep_pools_warm(False)
+        shutdown_warm_pools()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+utils_workers.py - Thread or process pools for document workers
+
+Much of Docling conversion, markdown export and chunking is pure Python and
+contends on the GIL, so 8 threads don't give 8x. The process backend runs
+each worker in its own interpreter:
+
+- Workers load the DocumentConverter once, in the pool initializer. The
+  parent never loads it for them: forking a process that has already
+  started torch/OpenMP threads can deadlock the child, so the default start
+  method is "forkserver" (max_tasks_per_child is rejected with "fork", see
+  utils_config.validate_process_pool)
+- Workers never commit processing state; results come back to the parent,
+  which writes the ledger/_SUCCESS marker (pool workers exit without atexit,
+  so buffered ledger entries could otherwise be lost)
+
+Selected with processors.digital_backend: "thread" (default) | "process".
+DOCX/XLSX/CSV files get their own pool (processors.office_backend,
+processors.office_workers).
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Tuple
+
+from utils_config import DEFAULT_START_METHOD
+
+
+# Warm pools (watch mode): executors are kept alive between batches so
+# thread-local Docling converters / embedding models and process workers
+# stay loaded. Keyed by (pool kind, backend, max_workers).
+_keep_warm = False
+_warm_pools: Dict[Tuple[str, str, int], Executor] = {}
+_warm_lock = threading.Lock()
+
+
+class _WarmExecutor(Executor):
+    """Shares a long-lived executor; shutdown() from a batch is a no-op."""
+
+    def __init__(self, executor: Executor):
+        self._executor = executor
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def map(self, fn, *iterables, **kwargs):
+        return self._executor.map(fn, *iterables, **kwargs)
+
+    def shutdown(self, wait=True, **kwargs):
+        pass
+
+
+def keep_pools_warm(enabled: bool = True) -> None:
+    """
+    Keep worker pools alive between batches (watch mode).
+
+    Args:
+        enabled: True to reuse pools across process_batch() calls
+    """
+    global _keep_warm
+    _keep_warm = enabled
+
+
+def shutdown_warm_pools() -> None:
+    """Shut down all pools kept alive by keep_pools_warm()."""
+    with _warm_lock:
+        for executor in _warm_pools.values():
+            executor.shutdown()
+        _warm_pools.clear()
+
+
+def _get_or_create(kind: str, backend: str, max_workers: int, factory: Callable[[], Executor]) -> Executor:
+    if not _keep_warm:
+        return factory()
+
+    key = (kind, backend, max_workers)
+    with _warm_lock:
+        if key not in _warm_pools:
+            _warm_pools[key] = factory()
+        return _WarmExecutor(_warm_pools[key])
+
+
+def _get_backend(config: Dict, key: str, default: str) -> str:
+    backend = config.get("processors", {}).get(key, default)
+    if backend not in ("thread", "process"):
+        raise ValueError(f"Unknown processors.{key}: {backend!r} (expected 'thread' or 'process')")
+    return backend
+
+
+def get_digital_backend(config: Dict) -> str:
+    """
+    Get the configured executor backend for digital PDF workers.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        "thread" or "process"
+
+    Raises:
+        ValueError: If processors.digital_backend is not recognised
+    """
+    return _get_backend(config, "digital_backend", "thread")
+
+
+def get_office_backend(config: Dict) -> str:
+    """
+    Get the configured executor backend for DOCX/XLSX/CSV workers.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        "thread" or "process"
+
+    Raises:
+        ValueError: If processors.office_backend is not recognised
+    """
+    return _get_backend(config, "office_backend", "process")
+
+
+def _init_docling_worker() -> None:
+    """Process pool initializer: load this worker's converter and its PDF pipeline models."""
+    from handlers.pdf_digital import get_docling_converter, InputFormat
+    converter = get_docling_converter()
+    # Docling loads models lazily on first convert; load them before the first task
+    if hasattr(converter, "initialize_pipeline"):
+        converter.initialize_pipeline(InputFormat.PDF)
+
+
+def _create_process_pool(config: Dict, max_workers: int, initializer=None) -> ProcessPoolExecutor:
+    """Process pool using the processors.process_pool settings."""
+    pool_config = config.get("processors", {}).get("process_pool", {})
+
+    kwargs = {}
+    if pool_config.get("max_tasks_per_child"):
+        # Recycle workers to cap memory growth (Python 3.11+, rejected with "fork" at config load)
+        kwargs["max_tasks_per_child"] = pool_config["max_tasks_per_child"]
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(pool_config.get("start_method", DEFAULT_START_METHOD)),
+        initializer=initializer,
+        **kwargs
+    )
+
+
+def create_digital_executor(config: Dict, max_workers: int) -> Executor:
+    """
+    Create the executor used for digital PDF (Docling) workers.
+
+    Args:
+        config: Configuration dictionary (processors.digital_backend, processors.process_pool)
+        max_workers: Number of workers
+
+    Returns:
+        ThreadPoolExecutor or ProcessPoolExecutor
+    """
+    backend = get_digital_backend(config)
+    return _get_or_create("digital", backend, max_workers,
+                          lambda: _create_digital_executor(config, backend, max_workers))
+
+
+def _create_digital_executor(config: Dict, backend: str, max_workers: int) -> Executor:
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+    pool_config = config.get("processors", {}).get("process_pool", {})
+    start_method = pool_config.get("start_method", DEFAULT_START_METHOD)
+
+    print(f"   🧩 Docling process pool: {max_workers} worker(s), start method '{start_method}'")
+
+    return _create_process_pool(config, max_workers, initializer=_init_docling_worker)
+
+
+def create_office_executor(config: Dict, max_workers: int) -> Executor:
+    """
+    Create the executor used for DOCX/XLSX/CSV workers.
+
+    Sized separately from the Docling PDF pool (processors.office_workers).
+    python-docx/openpyxl parsing is pure Python, so the default backend is
+    a process pool; as with digital PDFs, the parent commits state.
+
+    Args:
+        config: Configuration dictionary (processors.office_backend, processors.process_pool)
+        max_workers: Number of workers
+
+    Returns:
+        ThreadPoolExecutor or ProcessPoolExecutor
+    """
+    backend = get_office_backend(config)
+    if backend == "thread":
+        return _get_or_create("office", backend, max_workers, lambda: ThreadPoolExecutor(max_workers=max_workers))
+    return _get_or_create("office", backend, max_workers, lambda: _create_process_pool(config, max_workers))
+
+
+def start_all_workers(executor: Executor, max_workers: int) -> None:
+    """
+    Make a process pool start all its workers now.
+
+    ProcessPoolExecutor forks lazily on submit(); call this before starting
+    other threads so workers are never forked from a multi-threaded parent.
+
+    Args:
+        executor: Executor from create_digital_executor()
+        max_workers: Number of workers it was created with
+    """
+    if isinstance(executor, _WarmExecutor):
+        executor = executor._executor
+
+    if isinstance(executor, ProcessPoolExecutor):
+        # Each sleeping task occupies a worker, forcing the pool to spawn the next one
+        list(executor.map(time.sleep, [0.1] * max_workers))
@@ -40,6 +40,14 @@ from utils_inventory import (
     filter_inventory,
     print_inventory_summary
 )
+from utils_catalog import (
+    is_catalog_enabled,
+    ensure_catalog,
+    filter_catalog,
+    count_catalog,
+    get_catalog_stats,
+    sync_processed_hashes
+)
 from utils_batch import (
     acquire_process_lock,
     release_process_lock,
@@ -112,6 +120,7 @@ Examples:
   # Auto mode - discover from input bucket
   python process_documents.py --auto --summary
   python process_documents.py --auto --file-types pdf,docx --limit 20
+  python process_documents.py --auto --refresh-inventory   # Pick up new/changed files only
 
   # Filter PDFs by classification
   python process_documents.py --auto --file-types pdf --pdf-type scanned --limit 100
@@ -164,6 +173,8 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
                         help="Apply image cleanup before OCR (scanned PDFs only)")
     parser.add_argument("--workers", type=int, default=6,
                         help="Parallel workers for processing (default: 6)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Use the staged pipeline (overlap OCR, conversion and enrichment)")
 
     # Pipeline separation flags
     parser.add_argument("--ingest-only", action="store_true",
@@ -176,6 +187,8 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
                         help="Preview files without processing")
     parser.add_argument("--rebuild-inventory", action="store_true",
                         help="Force rebuild inventory even if it exists")
+    parser.add_argument("--refresh-inventory", action="store_true",
+                        help="Incrementally update inventory (only new/changed files are hashed and classified)")
     parser.add_argument("--no-skip-processed", action="store_false", dest="skip_processed",
                         help="Disable skipping of already-processed files")
     parser.add_argument("--reprocess-all", action="store_true",
@@ -247,15 +260,19 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
 
         # Handle reprocessing flags
         if args.reprocess_all or args.reprocess_hash:
-            from utils_state import clear_processed_state
+            from utils_state import clear_processed_state, get_ledger_for_config
 
             if args.reprocess_all:
                 print("🔄 Clearing all success markers for reprocessing...\n")
-                cleared = clear_processed_state(paths["jsonl_output"])
+                cleared = clear_processed_state(paths["jsonl_output"], ledger=get_ledger_for_config(config))
                 print(f"   Cleared {cleared} success marker(s)\n")
             elif args.reprocess_hash:
                 print(f"🔄 Clearing success marker for hash {args.reprocess_hash}...\n")
-                cleared = clear_processed_state(paths["jsonl_output"], hash_sha256=args.reprocess_hash)
+                cleared = clear_processed_state(
+                    paths["jsonl_output"],
+                    hash_sha256=args.reprocess_hash,
+                    ledger=get_ledger_for_config(config)
+                )
                 if cleared > 0:
                     print(f"   Cleared {cleared} success marker(s)\n")
                 else:
@@ -270,64 +287,117 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
             if args.rebuild_inventory or not inventory_path.exists():
                 print(f"📋 Building inventory from {input_bucket}...")
                 build_inventory(input_bucket, config, output_path=inventory_path, sort_by=args.sort_by)
+            elif args.refresh_inventory:
+                print(f"📋 Refreshing inventory from {input_bucket}...")
+                build_inventory(input_bucket, config, output_path=inventory_path, sort_by=args.sort_by, incremental=True)
             else:
                 print(f"📋 Loading existing inventory from {inventory_path}")
-                print(f"   (Use --rebuild-inventory to force refresh)\n")
-
-            # Load inventory
-            inventory = load_inventory(inventory_path)
-            print_inventory_summary(inventory)
-
-            # Sort by pages if requested (after loading, since page counts come from inventory)
-            if args.sort_by in ["pages", "pages_desc"]:
-                def get_page_count(record):
-                    """Extract page count, handling None and empty string cases."""
-                    pages = record.get("total_pages")
-                    if pages is None or pages == "":
-                        return 999999  # Put files without page counts at the end
-                    try:
-                        return int(pages)
-                    except (ValueError, TypeError):
-                        return 999999
-
-                inventory.sort(key=get_page_count, reverse=(args.sort_by == "pages_desc"))
-                print(f"   Sorted by page count ({'largest first' if args.sort_by == 'pages_desc' else 'smallest first'})\n")
-
-            # Filter by file types if specified
-            if args.file_types:
-                requested_types = [ft.strip().lower() for ft in args.file_types.split(',')]
-                filtered = []
-                for file_type in requested_types:
-                    filtered.extend(filter_inventory(inventory, file_type=file_type, allowed_only=True))
-                inventory = filtered
-                print(f"   Filtered to {len(inventory)} file(s) matching types: {', '.join(requested_types)}\n")
-            else:
-                # Only allowed files
-                inventory = filter_inventory(inventory, allowed_only=True)
-
-            # Filter PDFs by classification type if specified
-            if args.pdf_type:
-                classification = f"pdf_{args.pdf_type}"  # Convert "digital" -> "pdf_digital"
-                inventory = filter_inventory(inventory, classification_type=classification)
-                print(f"   Filtered to {len(inventory)} {args.pdf_type} PDF(s)\n")
-
-            # Filter out already-processed files (unless disabled)
-            if args.skip_processed and not args.reprocess_all:
-                from utils_state import get_processed_hashes, filter_unprocessed_files
-
-                processed_hashes = get_processed_hashes(
-                    jsonl_dir=paths["jsonl_output"],
-                    use_cache=True,
-                    cache_path=paths["gcs_mount_base"] / "state" / "processed_hashes.json"
+                print(f"   (Use --refresh-inventory to pick up new/changed files, --rebuild-inventory to force full rebuild)\n")
+
+            if is_catalog_enabled(config):
+                # ⚡ Indexed catalog: filtering, page sorting and unprocessed selection are SQL queries
+                catalog_path = ensure_catalog(inventory_path, config)
+                print_inventory_summary(stats=get_catalog_stats(catalog_path))
+
+                requested_types = None
+                if args.file_types:
+                    requested_types = [ft.strip().lower() for ft in args.file_types.split(',')]
+                classification = f"pdf_{args.pdf_type}" if args.pdf_type else None  # "digital" -> "pdf_digital"
+
+                skip_processed = args.skip_processed and not args.reprocess_all
+                if skip_processed:
+                    from utils_state import get_processed_hashes, get_ledger_for_config
+
+                    processed_hashes = get_processed_hashes(
+                        jsonl_dir=paths["jsonl_output"],
+                        use_cache=True,
+                        cache_path=paths["gcs_mount_base"] / "state" / "processed_hashes.json",
+                        ledger=get_ledger_for_config(config)
+                    )
+                    sync_processed_hashes(catalog_path, processed_hashes)
+
+                inventory = filter_catalog(
+                    catalog_path,
+                    file_types=requested_types,
+                    allowed_only=True,
+                    classification_type=classification,
+                    unprocessed_only=skip_processed,
+                    sort_by=args.sort_by
                 )
 
-                original_count = len(inventory)
-                inventory = filter_unprocessed_files(inventory, processed_hashes)
+                if args.sort_by in ["pages", "pages_desc"]:
+                    print(f"   Sorted by page count ({'largest first' if args.sort_by == 'pages_desc' else 'smallest first'})\n")
+                if requested_types:
+                    print(f"   Filtered to file types: {', '.join(requested_types)}")
+                if classification:
+                    print(f"   Filtered to {args.pdf_type} PDFs")
+                if skip_processed:
+                    matching = count_catalog(
+                        catalog_path,
+                        file_types=requested_types,
+                        allowed_only=True,
+                        classification_type=classification
+                    )
+                    if matching > len(inventory):
+                        print(f"   Skipping {matching - len(inventory)} already-processed file(s)")
+                        print(f"   Remaining unprocessed: {len(inventory)}\n")
 
-                if original_count > len(inventory):
-                    skipped_count = original_count - len(inventory)
-                    print(f"   Skipping {skipped_count} already-processed file(s)")
-                    print(f"   Remaining unprocessed: {len(inventory)}\n")
+            else:
+                # Load inventory
+                inventory = load_inventory(inventory_path)
+                print_inventory_summary(inventory)
+
+                # Sort by pages if requested (after loading, since page counts come from inventory)
+                if args.sort_by in ["pages", "pages_desc"]:
+                    def get_page_count(record):
+                        """Extract page count, handling None and empty string cases."""
+                        pages = record.get("total_pages")
+                        if pages is None or pages == "":
+                            return 999999  # Put files without page counts at the end
+                        try:
+                            return int(pages)
+                        except (ValueError, TypeError):
+                            return 999999
+
+                    inventory.sort(key=get_page_count, reverse=(args.sort_by == "pages_desc"))
+                    print(f"   Sorted by page count ({'largest first' if args.sort_by == 'pages_desc' else 'smallest first'})\n")
+
+                # Filter by file types if specified
+                if args.file_types:
+                    requested_types = [ft.strip().lower() for ft in args.file_types.split(',')]
+                    filtered = []
+                    for file_type in requested_types:
+                        filtered.extend(filter_inventory(inventory, file_type=file_type, allowed_only=True))
+                    inventory = filtered
+                    print(f"   Filtered to {len(inventory)} file(s) matching types: {', '.join(requested_types)}\n")
+                else:
+                    # Only allowed files
+                    inventory = filter_inventory(inventory, allowed_only=True)
+
+                # Filter PDFs by classification type if specified
+                if args.pdf_type:
+                    classification = f"pdf_{args.pdf_type}"  # Convert "digital" -> "pdf_digital"
+                    inventory = filter_inventory(inventory, classification_type=classification)
+                    print(f"   Filtered to {len(inventory)} {args.pdf_type} PDF(s)\n")
+
+                # Filter out already-processed files (unless disabled)
+                if args.skip_processed and not args.reprocess_all:
+                    from utils_state import get_processed_hashes, filter_unprocessed_files, get_ledger_for_config
+
+                    processed_hashes = get_processed_hashes(
+                        jsonl_dir=paths["jsonl_output"],
+                        use_cache=True,
+                        cache_path=paths["gcs_mount_base"] / "state" / "processed_hashes.json",
+                        ledger=get_ledger_for_config(config)
+                    )
+
+                    original_count = len(inventory)
+                    inventory = filter_unprocessed_files(inventory, processed_hashes)
+
+                    if original_count > len(inventory):
+                        skipped_count = original_count - len(inventory)
+                        print(f"   Skipping {skipped_count} already-processed file(s)")
+                        print(f"   Remaining unprocessed: {len(inventory)}\n")
 
             # Extract file paths
             file_paths = [Path(record["file_path"]) for record in inventory]
@@ -342,7 +412,7 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
             file_paths = file_paths[:args.limit]
             print(f"   Limited to first {args.limit} file(s)")
 
-        if not file_paths:
+        if not file_paths and not args.watch:
             print("❌ No valid files to process. Exiting.")
             return
 
@@ -362,36 +432,51 @@ Supported file types: PDF (scanned/digital), DOCX, XLSX, CSV, JPG, PNG, TIF
             print(f"Batches ({args.batch_size} files each): {(len(file_paths) + args.batch_size - 1) // args.batch_size}")
             return
 
-        # TODO: Implement watch mode
-        if args.watch:
-            print("⚠️  Watch mode not yet implemented (deferred to production)")
-            return
-
         # Process files using unified batch processor
         from utils_processor import process_batch
         from utils_batch import generate_batch_id
 
-        batch_id = generate_batch_id()
-
-        # Process batch
-        batch_result = process_batch(
-            file_paths,
-            config,
-            batch_id,
-            apply_preprocessing=args.preprocess,
-            skip_enrichment=args.ingest_only
-        )
-
-        # Print summary
-        from utils_manifest import generate_batch_summary, print_batch_summary
-        summary = generate_batch_summary(batch_result["manifest_path"])
-        print_batch_summary(summary)
-
-        # Print quarantine summary if any
-        if batch_result.get("quarantine_csv_path"):
-            from utils_quarantine import get_quarantine_stats, print_quarantine_summary
-            quar_stats = get_quarantine_stats(batch_result["quarantine_csv_path"])
-            print_quarantine_summary(quar_stats)
+        if args.pipeline:
+            config.setdefault("processors", {})["pipeline_mode"] = True
+
+        def run_batch(batch_files, batch_id):
+            batch_result = process_batch(
+                batch_files,
+                config,
+                batch_id,
+                apply_preprocessing=args.preprocess,
+                skip_enrichment=args.ingest_only
+            )
+
+            # Print summary
+            from utils_manifest import generate_batch_summary, print_batch_summary
+            summary = generate_batch_summary(batch_result["manifest_path"])
+            print_batch_summary(summary)
+
+            # Print quarantine summary if any
+            if batch_result.get("quarantine_csv_path"):
+                from utils_quarantine import get_quarantine_stats, print_quarantine_summary
+                quar_stats = get_quarantine_stats(batch_result["quarantine_csv_path"])
+                print_quarantine_summary(quar_stats)
+
+            return batch_result
+
+        if args.watch:
+            # Watch mode: the startup batch runs inside the watcher, which lists the
+            # tree first so nothing uploaded meanwhile is missed (process lock stays held)
+            from utils_watch import get_watch_filters, run_watch
+            extensions, file_filter = get_watch_filters(args.file_types, args.pdf_type, config)
+            run_watch(
+                paths["input_bucket"],
+                config,
+                run_batch,
+                interval_seconds=args.watch_interval,
+                extensions=extensions,
+                initial_files=file_paths,
+                file_filter=file_filter
+            )
+        elif file_paths:
+            run_batch(file_paths, generate_batch_id())
 
         elapsed = time.time() - start_time
         print(f"\n⏱️  Total elapsed: {elapsed:.1f}s")
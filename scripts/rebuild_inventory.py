@@ -7,8 +7,10 @@ with image detection, which can now detect pre-OCR'd scanned PDFs.
 
 Usage:
   python scripts/rebuild_inventory.py
+  python scripts/rebuild_inventory.py --incremental   # Only hash/classify new or changed files
 """
 
+import argparse
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -20,6 +22,11 @@ from utils_config import load_config, get_storage_paths
 from utils_inventory import build_inventory, get_inventory_stats
 
 def main():
+    parser = argparse.ArgumentParser(description="Rebuild inventory with improved classification")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse records of unchanged files (size/mtime) from the existing inventory")
+    args = parser.parse_args()
+
     print("="*70)
     print("Rebuilding Inventory with Improved Classification")
     print("="*70)
@@ -50,7 +57,8 @@ def main():
         config=config,
         output_path=None,  # Use default
         sort_by="name",
-        parallel=True  # Enable parallelization
+        parallel=True,  # Enable parallelization
+        incremental=args.incremental
     )
 
     end = datetime.now()
@@ -39,7 +39,7 @@ markdown_content, page_map = olmocr_jsonl_to_markdown_with_pages(olmocr_jsonl)
 
 print(f"   Markdown length: {len(markdown_content):,} chars")
 print(f"   Page ranges found: {len(page_map)}")
-print(f"   Sample ranges: {list(page_map.items())[:3]}")
+print(f"   Sample ranges: {page_map.ranges()[:3]}")
 print()
 
 # Step 2: Convert to JSONL chunks
@@ -40,10 +40,10 @@ def test_olmocr_bbox_extraction():
         print(f"   Page map entries: {len(page_map)}")
 
         if page_map:
-            print(f"   Page numbers found: {sorted(set(page_map.values()))}")
+            print(f"   Page numbers found: {sorted(set(page_map.page_nums))}")
             print(f"\n   Sample page map:")
-            for idx, page in list(page_map.items())[:3]:
-                print(f"      Block {idx} → Page {page}")
+            for start, end, page in page_map.ranges()[:3]:
+                print(f"      Block {start}-{end} → Page {page}")
         else:
             print("   ⚠️  No page information found")
 
@@ -0,0 +1,13 @@
+"""
+Unit tests for pure pipeline logic (no GPU, no models, no GCS mount).
+
+Run from the repo root:
+    python -m pytest scripts/testing/unit -q
+
+Tests that need PyMuPDF (fitz) are skipped where it is not installed.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "olmocr_pipeline"))
@@ -0,0 +1,71 @@
+"""Offset-tracking chunker and in-order element location (utils_chunking)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils_chunking import OffsetIndex, chunk_paragraphs, chunk_sentences, locate_in_order
+
+
+def test_chunk_offsets_point_at_source_text():
+    text = "  First para.\n\nSecond para here.\n\n\n\nThird.  "
+    chunks = chunk_paragraphs(text, token_target=3, token_max=10)
+
+    assert [c.text for c in chunks] == ["First para.\n\nSecond para here.", "Third."]
+    for chunk in chunks:
+        assert text[chunk.start:chunk.start + 5] == chunk.text[:5]
+        assert text[:chunk.end].endswith(chunk.text[-5:])
+
+
+def test_chunk_sentences_respects_token_max():
+    text = "One two three. Four five six. Seven eight nine."
+    chunks = chunk_sentences(text, token_target=100, token_max=6)
+    assert [c.text for c in chunks] == ["One two three. Four five six.", "Seven eight nine."]
+    assert text[chunks[1].start:chunks[1].end] == "Seven eight nine."
+
+
+def test_offset_index_items_in():
+    index = OffsetIndex([(10, 15, "b"), (0, 5, "a"), (20, 25, "c")])
+    assert index.items_in(0, 20) == ["a", "b"]
+    assert index.items_in(5, 10) == []
+    assert index.first_in(11, 30) == "c"
+
+
+def test_locate_in_order_maps_repeats_to_their_own_occurrence():
+    text = "CONFIDENTIAL\n\nclause one\n\nCONFIDENTIAL\n\nclause two"
+    index = locate_in_order(text, [("CONFIDENTIAL", 1), ("clause one", 2), ("CONFIDENTIAL", 3), ("clause two", 4)])
+    assert index.starts == [0, 14, 26, 40]
+    assert index.items == [1, 2, 3, 4]
+
+
+def test_locate_in_order_missing_element_keeps_cursor():
+    text = "alpha\n\nbeta\n\ngamma"
+    index = locate_in_order(text, [("alpha", 1), ("not in text", 2), ("beta", 3), ("gamma", 4)])
+    assert index.items == [1, 3, 4]
+
+
+def test_locate_in_order_ignores_far_match():
+    # A header repeated on a later page must not pull the cursor past the body
+    text = "Intro text\n\n" + "body " * 100 + "\n\nPage Header"
+    elements = [("Intro text", 1), ("Page Header", 2), ("body body", 3)]
+    index = locate_in_order(text, elements, window=100)
+    assert index.items == [1, 3]
+    assert index.starts == [0, 12]
+
+
+def test_extract_bbox_skips_page_furniture():
+    pytest.importorskip("docling")
+    from handlers.pdf_digital import extract_bbox_from_docling
+
+    bbox = {"l": 1, "t": 4, "r": 3, "b": 2}
+    texts = [
+        {"text": "Header", "label": "page_header", "prov": [{"page_no": 1, "bbox": bbox}]},
+        {"text": "Body", "label": "text", "content_layer": "body", "prov": [{"page_no": 1, "bbox": bbox}]},
+        {"text": "Footnote", "label": "text", "content_layer": "furniture", "prov": [{"page_no": 1, "bbox": bbox}]},
+        {"text": "3", "label": "page_footer", "prov": [{"page_no": 1, "bbox": bbox}]},
+    ]
+    result = SimpleNamespace(document=SimpleNamespace(export_to_dict=lambda: {"texts": texts}))
+
+    elements = extract_bbox_from_docling(result)
+    assert [e["text"] for e in elements] == ["Body"]
+    assert elements[0]["bbox"] == {"x0": 1, "y0": 2, "x1": 3, "y1": 4}
@@ -0,0 +1,26 @@
+"""Classification cache writes (utils_classify_cache)."""
+
+import pytest
+
+pytest.importorskip("fitz")  # utils_classify
+
+import utils_classify_cache
+
+
+def test_write_failure_warns_once(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / "cache"
+    blocker.write_text("not a directory")  # mkdir under it fails
+    config = {"classification": {"cache": {"dir": str(blocker)}}}
+    monkeypatch.setattr(utils_classify_cache, "_write_failure_reported", False)
+
+    utils_classify_cache.store_cached_classification("ab12", config, {"type": "pdf_digital"})
+    utils_classify_cache.store_cached_classification("cd34", config, {"type": "pdf_digital"})
+
+    assert capsys.readouterr().out.count("⚠️  Classification cache write failed") == 1
+    assert utils_classify_cache.load_cached_classification("ab12", config) is None
+
+
+def test_store_and_load_roundtrip(tmp_path):
+    config = {"classification": {"cache": {"dir": str(tmp_path)}}}
+    utils_classify_cache.store_cached_classification("ab12", config, {"type": "pdf_scanned"})
+    assert utils_classify_cache.load_cached_classification("ab12", config) == {"type": "pdf_scanned"}
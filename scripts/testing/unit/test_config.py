@@ -0,0 +1,28 @@
+"""processors.process_pool validation (utils_config)."""
+
+import pytest
+
+from utils_config import load_config, validate_process_pool
+
+
+def _config(**process_pool):
+    return {"processors": {"process_pool": process_pool}}
+
+
+def test_default_config_is_valid():
+    load_config()
+
+
+def test_max_tasks_per_child_rejected_with_fork():
+    with pytest.raises(ValueError, match="max_tasks_per_child"):
+        validate_process_pool(_config(start_method="fork", max_tasks_per_child=50))
+
+
+def test_max_tasks_per_child_allowed_with_forkserver():
+    validate_process_pool(_config(start_method="forkserver", max_tasks_per_child=50))
+    validate_process_pool(_config(start_method="fork", max_tasks_per_child=None))
+
+
+def test_unknown_start_method_rejected():
+    with pytest.raises(ValueError, match="start_method"):
+        validate_process_pool(_config(start_method="thread"))
@@ -0,0 +1,49 @@
+"""Incremental inventory reuse (utils_inventory)."""
+
+import os
+
+import pytest
+
+pytest.importorskip("fitz")  # utils_classify
+
+import utils_inventory
+
+
+def test_incremental_reuses_records_of_symlinked_files(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "b.csv").write_text("x,y\n1,2\n")
+
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    (input_dir / "b.csv").symlink_to(shared / "b.csv")  # Keyed by the link, not its target
+
+    classified = []
+
+    def classify(args):
+        file_path, config, timestamp = args
+        classified.append(file_path.name)
+        st = file_path.stat()
+        return {
+            "file_path": os.path.abspath(file_path),
+            "file_name": file_path.name,
+            "size_bytes": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "allowed": True,
+        }
+
+    monkeypatch.setattr(utils_inventory, "_classify_single_file", classify)
+    config = {"inventory": {"partial_dir": str(tmp_path / "partial")}}
+    output_path = tmp_path / "inventory.csv"
+
+    utils_inventory.build_inventory(input_dir, config, output_path,
+                                    parallel=False, incremental=True)
+    assert sorted(classified) == ["a.pdf", "b.csv"]
+
+    classified.clear()
+    utils_inventory.build_inventory(input_dir, config, output_path,
+                                    parallel=False, incremental=True)
+    assert classified == []
+    records = utils_inventory.load_inventory(output_path)
+    assert [r["file_path"] for r in records] == [str(input_dir.resolve() / "a.pdf"), str(input_dir.resolve() / "b.csv")]
@@ -0,0 +1,107 @@
+"""Processed-state ledger: segments, tombstones and compaction (utils_state)."""
+
+import json
+
+import utils_state
+from utils_state import (
+    DEFAULT_COMPACT_THRESHOLD,
+    ProcessedLedger,
+    clear_processed_state,
+    get_ledger_for_config,
+    get_processed_hashes,
+)
+
+
+def _segments(ledger_dir):
+    return sorted((ledger_dir / "segments").glob("*.jsonl"))
+
+
+def test_segments_are_replayed_with_tombstones(tmp_path):
+    writer = ProcessedLedger(tmp_path).load()
+    for file_hash in ("aa11", "bb22", "cc33"):
+        writer.record_success(file_hash, {"jsonl_path": f"/out/{file_hash}.jsonl"})
+    writer.clear(["bb22"])
+
+    reader = ProcessedLedger(tmp_path).load()
+    assert reader.hashes() == {"aa11", "cc33"}
+    assert reader.get("aa11")["jsonl_path"] == "/out/aa11.jsonl"
+    assert reader.find_prefix("c") == ["cc33"]
+
+
+def test_load_compacts_at_threshold(tmp_path):
+    writer = ProcessedLedger(tmp_path).load()
+    for i in range(4):
+        writer.record_success(f"hash{i}")
+    writer.clear(["hash0"])
+    assert len(_segments(tmp_path)) == 5
+
+    below = ProcessedLedger(tmp_path, compact_threshold=6).load()
+    assert len(_segments(tmp_path)) == 5
+    assert not (tmp_path / "snapshot.json").exists()
+
+    compacted = ProcessedLedger(tmp_path, compact_threshold=5).load()
+    assert _segments(tmp_path) == []
+    assert compacted.hashes() == below.hashes() == {"hash1", "hash2", "hash3"}
+
+    # The snapshot alone reproduces the state
+    assert ProcessedLedger(tmp_path).load().hashes() == {"hash1", "hash2", "hash3"}
+
+
+def test_config_threshold_applies_before_first_load(tmp_path, monkeypatch):
+    ledger_dir = tmp_path / "ledger"
+    writer = ProcessedLedger(ledger_dir).load()
+    for i in range(3):
+        writer.record_success(f"hash{i}")
+
+    monkeypatch.setattr(utils_state, "get_ledger_dir", lambda config: ledger_dir)
+    config = {"state": {"ledger": {"compact_threshold": 3}}}
+
+    hashes = get_processed_hashes(tmp_path / "jsonl", ledger=get_ledger_for_config(config))
+    assert hashes == {"hash0", "hash1", "hash2"}
+    assert _segments(ledger_dir) == []
+
+
+def test_default_threshold_matches_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_state, "get_ledger_dir", lambda config: tmp_path / "default")
+    assert get_ledger_for_config({}).compact_threshold == DEFAULT_COMPACT_THRESHOLD == 200
+
+
+def test_clear_processed_state_by_prefix(tmp_path, monkeypatch):
+    jsonl_dir = tmp_path / "jsonl"
+    jsonl_dir.mkdir()
+    marker = jsonl_dir / "doc_SUCCESS"
+    marker.write_text("{}")
+
+    monkeypatch.setattr(utils_state, "get_ledger_dir", lambda config: tmp_path / "ledger")
+    ledger = get_ledger_for_config({})
+    ledger.load(bootstrap_jsonl_dir=jsonl_dir)
+    ledger.record_success("abcdef01", {"jsonl_path": str(jsonl_dir / "doc.jsonl")})
+    ledger.record_success("ffff0000")
+
+    assert clear_processed_state(jsonl_dir, hash_sha256="abcd", ledger=ledger) == 1
+    assert not marker.exists()
+    assert ProcessedLedger(tmp_path / "ledger").load().hashes() == {"ffff0000"}
+
+
+def test_write_before_first_load_still_migrates_markers(tmp_path):
+    jsonl_dir = tmp_path / "jsonl"
+    jsonl_dir.mkdir()
+    (jsonl_dir / "old_SUCCESS").write_text(json.dumps({"file_hash": "aaa", "processor": "olmocr"}))
+
+    # e.g. an explicit-file run commits before anything loads the ledger
+    writer = ProcessedLedger(tmp_path / "ledger")
+    writer.record_success("bbb")
+    assert writer.load(bootstrap_jsonl_dir=jsonl_dir).hashes() == {"aaa", "bbb"}
+
+    reader = ProcessedLedger(tmp_path / "ledger")
+    assert get_processed_hashes(jsonl_dir, ledger=reader) == {"aaa", "bbb"}
+
+
+def test_buffered_writes_survive_first_load(tmp_path):
+    ledger = ProcessedLedger(tmp_path, flush_every=10)
+    ledger.record_success("aa11")
+    ProcessedLedger(tmp_path)._write_snapshot()  # Another process compacted meanwhile
+
+    assert "aa11" in ledger.load()
+    ledger.flush()
+    assert ProcessedLedger(tmp_path).load().hashes() == {"aa11"}
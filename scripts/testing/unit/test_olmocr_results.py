@@ -0,0 +1,87 @@
+"""Locating and demultiplexing batched OlmOCR results (utils_olmocr)."""
+
+import json
+
+import pytest
+
+import utils_olmocr
+from utils_olmocr import demux_olmocr_results
+
+
+def _record(text, source=None):
+    return {"text": text, "metadata": {"Source-File": source} if source else {}}
+
+
+def _shared_results(tmp_path, monkeypatch, records):
+    results = tmp_path / "staging" / "results" / "output_group.jsonl"
+    results.parent.mkdir(parents=True)
+    results.write_text("\n".join(json.dumps(r) for r in records) + "\n", encoding="utf-8")
+    monkeypatch.setattr(utils_olmocr, "get_olmocr_jsonl_path", lambda path, output_dir: results)
+    return tmp_path / "staging"
+
+
+def test_records_split_by_source_file(tmp_path, monkeypatch):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    staging = _shared_results(tmp_path, monkeypatch, [
+        _record("a1", str(a.resolve())),
+        _record("b1", str(b.resolve())),
+        _record("a2", str(a.resolve())),
+        _record("other", str((tmp_path / "c.pdf").resolve())),
+    ])
+
+    records = demux_olmocr_results([a, b], staging)
+    assert [r["text"] for r in records[a]] == ["a1", "a2"]
+    assert [r["text"] for r in records[b]] == ["b1"]
+
+
+def test_unattributed_record_dropped_when_results_are_shared(tmp_path, monkeypatch, capsys):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    staging = _shared_results(tmp_path, monkeypatch, [
+        _record("a1", str(a.resolve())),
+        _record("orphan"),
+    ])
+
+    records = demux_olmocr_results([a, b], staging)
+    assert [r["text"] for r in records[a]] == ["a1"]
+    assert records[b] == []
+    assert "Dropped 1 record(s) without Source-File" in capsys.readouterr().out
+
+
+def test_unattributed_record_kept_for_single_input(tmp_path, monkeypatch):
+    a = tmp_path / "a.pdf"
+    staging = _shared_results(tmp_path, monkeypatch, [_record("orphan")])
+
+    assert [r["text"] for r in demux_olmocr_results([a], staging)[a]] == ["orphan"]
+
+
+def test_input_without_results_gets_empty_list(tmp_path, monkeypatch):
+    a = tmp_path / "a.pdf"
+    monkeypatch.setattr(utils_olmocr, "get_olmocr_jsonl_path", lambda path, output_dir: None)
+    assert demux_olmocr_results([a], tmp_path) == {a: []}
+
+
+def _write_work_index(output_dir, rows):
+    zstd = pytest.importorskip("zstandard")
+    content = "\n".join(",".join(row) for row in rows) + "\n"
+    (output_dir / "work_index_list.csv.zstd").write_bytes(zstd.ZstdCompressor().compress(content.encode()))
+
+
+def test_work_index_keeps_recorded_paths_and_resolves_only_on_miss(tmp_path):
+    staging = tmp_path / "staging"
+    (staging / "results").mkdir(parents=True)
+    (staging / "results" / "output_g1.jsonl").write_text("{}\n")
+
+    real = tmp_path / "docs" / "a.pdf"
+    real.parent.mkdir()
+    real.write_bytes(b"%PDF")
+    link = tmp_path / "link.pdf"
+    link.symlink_to(real)
+
+    recorded = str(real.resolve())
+    _write_work_index(staging, [("g1", recorded, "relative/b.pdf")])
+
+    index = utils_olmocr.load_olmocr_work_index(staging)
+    assert index == {recorded: "g1", "relative/b.pdf": "g1"}  # Stored as recorded
+
+    assert utils_olmocr.get_olmocr_jsonl_path(real.resolve(), staging) == staging / "results" / "output_g1.jsonl"
+    assert utils_olmocr.get_olmocr_jsonl_path(link, staging) == staging / "results" / "output_g1.jsonl"
@@ -0,0 +1,41 @@
+"""Character offset -> page lookups (utils_olmocr.PageIndex)."""
+
+from utils_olmocr import PageIndex
+
+# Page 2 is blank (no range); 10-20 is a gap between pages 1 and 3
+RANGES = [(20, 35, 3), (0, 10, 1), (35, 50, 4)]
+
+
+def test_page_at_boundaries_and_gaps():
+    index = PageIndex(RANGES)
+    assert index.page_at(0) == 1
+    assert index.page_at(9) == 1
+    assert index.page_at(10) is None   # End is exclusive
+    assert index.page_at(15) is None   # Gap
+    assert index.page_at(20) == 3
+    assert index.page_at(35) == 4
+    assert index.page_at(50) is None
+    assert index.page_at(-1) is None
+
+
+def test_pages_in_overlapping_ranges():
+    index = PageIndex(RANGES)
+    assert index.pages_in(0, 50) == [1, 3, 4]
+    assert index.pages_in(5, 25) == [1, 3]
+    assert index.pages_in(10, 20) == []      # Only the gap
+    assert index.pages_in(0, 20) == [1]      # End exclusive: page 3 starts at 20
+    assert index.pages_in(34, 36) == [3, 4]
+    assert index.pages_in(60, 80) == []
+
+
+def test_pages_in_repeated_page_and_empty_index():
+    index = PageIndex([(0, 5, 1), (5, 9, 2), (9, 12, 1)])
+    assert index.pages_in(0, 12) == [1, 2]
+    assert PageIndex().pages_in(0, 100) == []
+    assert PageIndex().page_at(0) is None
+
+
+def test_from_mapping_matches_ranges():
+    index = PageIndex.from_mapping({"20-35": 3, "0-10": 1, "35-50": 4})
+    assert index.ranges() == sorted(RANGES)
+    assert len(index) == 3
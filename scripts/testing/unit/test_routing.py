@@ -0,0 +1,120 @@
+"""Per-page scanned detection (utils_classify), route_pdf and mixed chunk merging."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fitz")  # utils_classify
+
+import utils_classify
+
+
+class _FakeDoc:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, index):
+        return self.pages[index]
+
+    def close(self):
+        pass
+
+
+def _page(text, image):
+    return SimpleNamespace(text=text, image=image)
+
+
+def _classify(monkeypatch, pages, routing=True, checked=None):
+    def has_full_page_image(page, fast=False):
+        if checked is not None:
+            checked.append(page)
+        return page.image
+
+    monkeypatch.setattr(utils_classify.fitz, "open", lambda path: _FakeDoc(pages), raising=False)
+    monkeypatch.setattr(utils_classify, "page_has_text_layer", lambda page, fast=True: page.text)
+    monkeypatch.setattr(utils_classify, "has_full_page_image", has_full_page_image)
+
+    def detect(pdf_path, config, doc=None):
+        scans = sum(1 for page in pages if page.image)
+        return {
+            "has_full_page_scans": scans / len(pages) >= 0.5,
+            "sampled_pages": len(pages),
+            "scan_pages": scans,
+            "scan_percentage": 100.0 * scans / len(pages),
+        }
+
+    monkeypatch.setattr(utils_classify, "detect_full_page_images", detect)
+    config = {"classification": {"page_routing": {"enabled": routing}}}
+    return utils_classify._classify_pdf_uncached("doc.pdf", config)
+
+
+def test_blank_page_is_not_scanned(monkeypatch):
+    pages = [_page(True, False), _page(False, False), _page(True, False), _page(True, False)]
+    result = _classify(monkeypatch, pages)
+    assert result["type"] == "pdf_digital"
+    assert result["scanned_pages"] == []
+
+
+def test_image_only_and_pre_ocrd_pages_are_scanned(monkeypatch):
+    pages = [_page(True, False), _page(False, True), _page(True, True), _page(True, False)]
+    result = _classify(monkeypatch, pages)
+    assert result["scanned_pages"] == [2, 3]
+
+
+def test_text_pages_not_image_checked_without_sampled_scans(monkeypatch):
+    checked = []
+    pages = [_page(True, False) for _ in range(4)]
+    result = _classify(monkeypatch, pages, checked=checked)
+    assert result["scanned_pages"] == []
+    assert checked == []
+
+
+def test_no_scanned_pages_without_routing(monkeypatch):
+    pages = [_page(True, False), _page(False, True), _page(True, False)]
+    assert "scanned_pages" not in _classify(monkeypatch, pages, routing=False)
+
+
+@pytest.fixture
+def route_pdf():
+    pytest.importorskip("docling")  # utils_processor -> handlers
+    from utils_processor import route_pdf
+    return route_pdf
+
+
+def _routing_config(**page_routing):
+    return {"classification": {"page_routing": page_routing}}
+
+
+def test_route_pdf_is_off_by_default(route_pdf):
+    classification = {"type": "pdf_digital", "total_pages": 10, "scanned_pages": [1, 2, 3]}
+    assert route_pdf(classification, {}) == "pdf_digital"
+
+
+def test_route_pdf_needs_min_pages_on_both_sides(route_pdf):
+    config = _routing_config(enabled=True)
+    one_scanned = {"type": "pdf_digital", "total_pages": 10, "scanned_pages": [4]}
+    two_scanned = {"type": "pdf_digital", "total_pages": 10, "scanned_pages": [4, 5]}
+    one_digital = {"type": "pdf_scanned", "total_pages": 3, "scanned_pages": [1, 2]}
+
+    assert route_pdf(one_scanned, config) == "pdf_digital"
+    assert route_pdf(two_scanned, config) == "pdf_mixed"
+    assert route_pdf(one_digital, config) == "pdf_scanned"
+
+
+def test_merge_chunks_by_page_interleaves_and_renumbers():
+    pytest.importorskip("docling")
+    from handlers.pdf_mixed import merge_chunks_by_page
+
+    def chunk(name, page_span):
+        return {"id": name, "doc_id": "doc", "chunk_index": -1, "text": name, "attrs": {"page_span": page_span}}
+
+    digital = [chunk("d1", [1]), chunk("d2", None), chunk("d4", [4])]
+    scanned = [chunk("s2", [2]), chunk("s3", [3, 4])]
+
+    merged = merge_chunks_by_page(digital, scanned)
+    assert [c["text"] for c in merged] == ["d1", "d2", "s2", "s3", "d4"]
+    assert [c["id"] for c in merged] == [f"doc_{i:04d}" for i in range(5)]
+    assert [c["chunk_index"] for c in merged] == list(range(5))
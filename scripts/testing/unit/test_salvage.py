@@ -0,0 +1,114 @@
+"""Failed OlmOCR batch salvage: bisection and circuit breaker (utils_olmocr)."""
+
+import subprocess
+
+import pytest
+
+import utils_olmocr
+from utils_olmocr import demux_olmocr_results, run_olmocr_batch_with_salvage
+
+
+def _fake_olmocr(monkeypatch, poison=(), broken=False):
+    """OlmOCR stand-in: writes output for every non-poison file, fails if any poison is in the run."""
+    runs = []
+
+    def run(file_paths, output_dir, config, log_file, workers=None, progress=None):
+        runs.append(list(file_paths))
+        if not broken:
+            for path in file_paths:
+                if path not in poison:
+                    record = {"text": path.stem, "metadata": {"Source-File": str(path.resolve())}}
+                    utils_olmocr._write_olmocr_result(path, [record], output_dir)
+        if broken or any(path in poison for path in file_paths):
+            raise subprocess.CalledProcessError(1, ["olmocr"])
+        return {}
+
+    monkeypatch.setattr(utils_olmocr, "run_olmocr_batch", run)
+    return runs
+
+
+@pytest.fixture
+def files(tmp_path):
+    return [tmp_path / f"doc{i}.pdf" for i in range(8)]
+
+
+def _salvage(tmp_path, files, **olmocr):
+    config = {"processors": {"olmocr": {"progress_interval_seconds": 3600, **olmocr}}}
+    return run_olmocr_batch_with_salvage(files, tmp_path / "staging", config, tmp_path / "batch.log")
+
+
+def test_successful_batch_has_no_failures(tmp_path, monkeypatch, files):
+    runs = _fake_olmocr(monkeypatch)
+    failures, metrics = _salvage(tmp_path, files)
+    assert failures == {}
+    assert len(runs) == 1
+
+
+def test_poison_file_is_isolated_and_rest_salvaged(tmp_path, monkeypatch, files):
+    # The first run completes every healthy file, so nothing is retried but the poison file
+    runs = _fake_olmocr(monkeypatch, poison={files[5]})
+    failures, _ = _salvage(tmp_path, files)
+
+    assert list(failures) == [files[5]]
+    assert "in isolation" in failures[files[5]]
+    assert runs[1:] == [[files[5]]]
+
+    records = demux_olmocr_results(files, tmp_path / "staging")
+    assert all(records[path] for path in files if path != files[5])
+
+
+def test_bisection_isolates_each_poison_file(tmp_path, monkeypatch, files):
+    # The batch crashes early; the retry finishes the healthy files and is then bisected
+    runs = []
+
+    def run(file_paths, output_dir, config, log_file, workers=None, progress=None):
+        runs.append(list(file_paths))
+        done = file_paths[:2] if len(runs) == 1 else [p for p in file_paths if p not in (files[5], files[6])]
+        for path in done:
+            record = {"text": path.stem, "metadata": {"Source-File": str(path.resolve())}}
+            utils_olmocr._write_olmocr_result(path, [record], output_dir)
+        if len(done) < len(file_paths):
+            raise subprocess.CalledProcessError(1, ["olmocr"])
+        return {}
+
+    monkeypatch.setattr(utils_olmocr, "run_olmocr_batch", run)
+    failures, _ = _salvage(tmp_path, files)
+
+    assert runs[1] == files[2:]
+    assert runs[2:] == [[files[5]], [files[6]]]
+    assert set(failures) == {files[5], files[6]}
+    assert all("in isolation" in error for error in failures.values())
+
+
+def test_retry_without_progress_fails_remaining_files(tmp_path, monkeypatch, files):
+    runs = _fake_olmocr(monkeypatch, broken=True)
+    failures, _ = _salvage(tmp_path, files)
+
+    # One batch run and one retry: no bisection of a run that can't finish anything
+    assert len(runs) == 2
+    assert set(failures) == set(files)
+    assert all("without completing any file" in error for error in failures.values())
+
+
+def test_retry_limit_fails_pending_files(tmp_path, monkeypatch, files):
+    # Each retry completes one file and fails, so bisection keeps going until the cap
+    def run(file_paths, output_dir, config, log_file, workers=None, progress=None):
+        runs.append(list(file_paths))
+        head = file_paths[0]
+        record = {"text": head.stem, "metadata": {"Source-File": str(head.resolve())}}
+        utils_olmocr._write_olmocr_result(head, [record], output_dir)
+        raise subprocess.CalledProcessError(1, ["olmocr"])
+
+    runs = []
+    monkeypatch.setattr(utils_olmocr, "run_olmocr_batch", run)
+    failures, _ = _salvage(tmp_path, files, max_salvage_retries=2)
+
+    assert len(runs) == 3  # Batch + 2 retries
+    assert failures
+    assert all("retry limit" in error for error in failures.values())
+
+
+def test_salvage_disabled_reraises(tmp_path, monkeypatch, files):
+    _fake_olmocr(monkeypatch, broken=True)
+    with pytest.raises(subprocess.CalledProcessError):
+        _salvage(tmp_path, files, salvage_failed_batches=False)
@@ -0,0 +1,120 @@
+"""FileWatcher seeding, upload stability and failed-batch requeue (utils_watch)."""
+
+import os
+
+import pytest
+
+pytest.importorskip("fitz")  # utils_watch -> utils_discovery -> utils_classify
+
+from utils_watch import FileWatcher, _run_micro_batch, get_watch_filters
+
+
+CONFIG = {"watch": {"stable_polls": 1, "max_batch_size": 10, "max_latency_seconds": 0, "max_batch_attempts": 2}}
+
+
+def _touch(path, content=b"%PDF-1.4"):
+    path.write_bytes(content)
+    return path
+
+
+def test_seed_queues_files_outside_startup_batch(tmp_path):
+    in_batch = _touch(tmp_path / "a.pdf")
+    missed = _touch(tmp_path / "b.pdf")  # e.g. missing from a stale inventory
+
+    watcher = FileWatcher(tmp_path, CONFIG)
+    assert watcher.seed(accounted=[in_batch]) == 1
+    assert watcher.take_batch(force=True) == [missed.resolve()]
+
+
+def test_seed_resolves_only_the_startup_batch(tmp_path, monkeypatch):
+    real = tmp_path / "real"
+    real.mkdir()
+    in_batch = _touch(real / "a.pdf")
+    missed = _touch(real / "b.pdf")
+    link = tmp_path / "input"
+    link.symlink_to(real)  # Startup batch paths come through the link
+
+    resolved = []
+    original = type(tmp_path).resolve
+
+    def resolve(self, *args, **kwargs):
+        resolved.append(self)
+        return original(self, *args, **kwargs)
+
+    watcher = FileWatcher(link, CONFIG)
+    monkeypatch.setattr(type(tmp_path), "resolve", resolve)
+    assert watcher.seed(accounted=[link / in_batch.name]) == 1
+    monkeypatch.undo()
+
+    assert watcher.take_batch(force=True) == [missed.resolve()]
+    assert missed not in resolved and in_batch not in resolved  # Snapshot paths used as-is
+
+
+def test_seed_without_accounted_marks_tree_seen(tmp_path):
+    _touch(tmp_path / "a.pdf")
+    watcher = FileWatcher(tmp_path, CONFIG)
+    assert watcher.seed() == 0
+    assert watcher.take_batch(force=True) == []
+
+
+def test_upload_during_startup_batch_is_picked_up(tmp_path):
+    _touch(tmp_path / "a.pdf")
+    watcher = FileWatcher(tmp_path, CONFIG)
+    watcher.seed(accounted=[tmp_path / "a.pdf"])
+
+    # Arrives after seeding (while the startup batch runs)
+    new = _touch(tmp_path / "new.pdf")
+    assert watcher.poll() == 0  # Not yet stable
+    assert watcher.poll() == 1  # Unchanged for stable_polls polls
+    assert watcher.take_batch() == [new.resolve()]
+
+
+def test_growing_file_waits_until_stable(tmp_path):
+    watcher = FileWatcher(tmp_path, CONFIG)
+    watcher.seed()
+
+    upload = _touch(tmp_path / "upload.pdf", b"x")
+    watcher.poll()
+    _touch(upload, b"xx")  # Still being written
+    assert watcher.poll() == 0
+    assert watcher.poll() == 1
+
+
+def test_requeue_gives_up_after_max_attempts_until_file_changes(tmp_path):
+    path = _touch(tmp_path / "bad.pdf")
+    watcher = FileWatcher(tmp_path, CONFIG)
+    watcher.seed(accounted=[])
+    batch = watcher.take_batch(force=True)
+
+    assert watcher.requeue(batch) == []  # Attempt 1: back in the queue
+    assert watcher.take_batch(force=True) == batch
+    assert watcher.requeue(batch) == batch  # Attempt 2: given up
+    assert watcher.take_batch(force=True) == []
+
+    # A new version of the file gets a fresh set of attempts
+    _touch(path, b"%PDF-1.7 fixed")
+    os.utime(path, ns=(1, 1))
+    watcher.poll()
+    watcher.poll()
+    assert watcher.take_batch(force=True) == batch
+    assert watcher.requeue(batch) == []
+
+
+def test_failing_micro_batch_is_requeued_not_raised(tmp_path):
+    _touch(tmp_path / "a.pdf")
+    watcher = FileWatcher(tmp_path, CONFIG)
+    watcher.seed(accounted=[])
+    batch = watcher.take_batch(force=True)
+
+    def process_fn(files, batch_id):
+        raise RuntimeError("GPU fell over")
+
+    _run_micro_batch(watcher, batch, process_fn)
+    assert watcher.take_batch(force=True) == batch
+
+
+def test_watch_filters_from_cli_args():
+    extensions, file_filter = get_watch_filters("pdf, jpg", None, {})
+    assert extensions == {".pdf", ".jpg", ".jpeg"}
+    assert file_filter is None
+    assert get_watch_filters(None, None, {}) == (None, None)